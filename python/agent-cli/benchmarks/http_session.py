@@ -0,0 +1,128 @@
+"""Benchmark: API calls per second with a new connection per call vs the pooled session.
+
+Starts a local stand-in for the Fordefi API (keep-alive HTTP/1.1, optionally
+over TLS with --tls-cert/--tls-key, optionally with --latency added to every
+response) and times GET /api/v1/vaults/{id}/assets three ways:
+
+- per-call:  module-level requests.get, a new connection for every call
+             (what ApiAuth did before it owned a session)
+- pooled:    ApiAuth's pooled requests.Session
+- http2:     ApiAuth(http2=True), if httpx is installed. The stand-in only
+             speaks HTTP/1.1, so this measures the httpx transport; point a
+             real HTTP/2 server at it to see multiplexing
+
+    uv run python -m benchmarks.http_session [--calls 500] [--threads 4] [--latency 0.02]
+
+The gap grows with the network round trip and with TLS, both of which a
+connection per call pays on every request; localhost without TLS shows the floor.
+"""
+
+import argparse
+import json
+import os
+import ssl
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ecdsa
+import requests
+
+from fordefi_agent._auth import ApiAuth, httpx
+
+VAULT_ID = "652a2334-a673-4851-ad86-627781689592"
+PATH = f"/api/v1/vaults/{VAULT_ID}/assets"
+BODY = json.dumps({"assets": [{"asset": {"symbol": "ETH"}, "balance": "1000000000000000000"}]}).encode()
+
+
+def serve(latency: float, cert: str | None, key: str | None) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    if cert:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(call, calls: int, threads: int) -> float:
+    call()  # warm up (first connection, imports)
+    start = time.perf_counter()
+    if threads == 1:
+        for _ in range(calls):
+            call()
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            list(pool.map(lambda _: call(), range(calls)))
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500, help="calls per mode")
+    parser.add_argument("--threads", type=int, default=1, help="concurrent callers")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the server waits before answering")
+    parser.add_argument("--tls-cert", help="serve over TLS with this certificate (PEM)")
+    parser.add_argument("--tls-key", help="private key for --tls-cert")
+    args = parser.parse_args()
+
+    server = serve(args.latency, args.tls_cert, args.tls_key)
+    scheme = "https" if args.tls_cert else "http"
+    base_url = f"{scheme}://127.0.0.1:{server.server_address[1]}"
+    if args.tls_cert:
+        # Trust the self-signed certificate (requests and httpx both read these).
+        os.environ["REQUESTS_CA_BUNDLE"] = os.environ["SSL_CERT_FILE"] = args.tls_cert
+
+    with tempfile.NamedTemporaryFile("w", suffix=".pem") as pem:
+        pem.write(ecdsa.SigningKey.generate(curve=ecdsa.NIST256p).to_pem().decode())
+        pem.flush()
+
+        def per_call():
+            resp = requests.get(f"{base_url}{PATH}", headers={"Authorization": "Bearer token"})
+            resp.raise_for_status()
+            return resp.json()
+
+        modes = {"per-call": (per_call, None)}
+        pooled = ApiAuth("token", pem.name, base_url, pool_size=max(args.threads, 1))
+        modes["pooled"] = (lambda: pooled.get(PATH), pooled)
+        if httpx is not None:
+            http2 = ApiAuth("token", pem.name, base_url, pool_size=max(args.threads, 1), http2=True)
+            modes["http2"] = (lambda: http2.get(PATH), http2)
+
+        print(f"{base_url}, {args.calls} calls per mode, {args.threads} thread(s), {args.latency * 1000:g} ms latency")
+        baseline = None
+        for name, (call, auth) in modes.items():
+            try:
+                rate = run(call, args.calls, args.threads)
+            except Exception as error:
+                print(f"{name:>9}: failed ({error})")
+                continue
+            finally:
+                if auth is not None:
+                    auth.close()
+            baseline = baseline or rate
+            print(f"{name:>9}: {rate:>8,.0f} calls/s ({1000 / rate * args.threads:,.2f} ms each, {rate / baseline:.1f}x)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """Fordefi Agent CLI - a Python client for AI agents to interact with Fordefi."""
 
+from .async_client import AsyncFordefiClient
 from .client import FordefiClient
 from ._types import FordefiError, FordefiTimeoutError
+from ._webhooks import WebhookListener
 
-__all__ = ["FordefiClient", "FordefiError", "FordefiTimeoutError"]
+__all__ = ["AsyncFordefiClient", "FordefiClient", "FordefiError", "FordefiTimeoutError", "WebhookListener"]
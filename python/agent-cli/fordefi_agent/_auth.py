@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import datetime
 import hashlib
@@ -6,12 +7,27 @@ from typing import Any
 
 import ecdsa
 import requests
+from requests.adapters import HTTPAdapter
 
 from ._types import FordefiError
 
+try:
+    import httpx
+except ImportError:  # optional: `uv sync --extra async` (AsyncFordefiClient) or `--extra http2`
+    httpx = None
 
-class ApiAuth:
-    """Handles Fordefi API authentication, request signing, and HTTP calls."""
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+DEFAULT_MAX_CONCURRENCY = 50
+
+
+def _split_timeout(timeout: float | tuple[float, float]) -> tuple[float, float]:
+    return timeout if isinstance(timeout, tuple) else (timeout, timeout)
+
+
+class _BaseAuth:
+    """Key loading, request signing, and error handling shared by the sync and async transports."""
 
     def __init__(self, api_token: str, pem_path: str, base_url: str):
         self._token = api_token
@@ -31,8 +47,17 @@ class ApiAuth:
             sigencode=ecdsa.util.sigencode_der,
         )
 
-    def _handle_error(self, resp: requests.Response, method: str, path: str) -> None:
-        if resp.ok:
+    def _signature_headers(self, path: str, body_json: str) -> dict[str, bytes]:
+        timestamp = str(int(datetime.datetime.now(datetime.timezone.utc).timestamp()))
+        payload = f"{path}|{timestamp}|{body_json}"
+        signature = self._sign(payload)
+        return {
+            "x-signature": base64.b64encode(signature),
+            "x-timestamp": timestamp.encode(),
+        }
+
+    def _handle_error(self, resp: Any, method: str, path: str) -> None:
+        if resp.status_code < 400:
             return
         request_id = resp.headers.get("x-request-id")
         try:
@@ -46,41 +71,149 @@ class ApiAuth:
             details=details,
         )
 
+
+class ApiAuth(_BaseAuth):
+    """Handles Fordefi API authentication, request signing, and HTTP calls.
+
+    All calls share one pooled session, so consecutive requests reuse an open
+    keep-alive connection instead of paying a new TCP + TLS handshake each time.
+    Call close() (or close the owning FordefiClient) to release the connections.
+
+    Args:
+        api_token: Fordefi API user token.
+        pem_path: Path to the API signer private key PEM file.
+        base_url: Fordefi API base URL.
+        pool_size: Maximum number of keep-alive connections kept open.
+        timeout: Seconds to wait for the server, as one number or a (connect, read) tuple.
+        http2: Use HTTP/2 (multiplexes concurrent calls over one connection).
+            Requires the optional httpx dependency.
+    """
+
+    def __init__(
+        self,
+        api_token: str,
+        pem_path: str,
+        base_url: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float | tuple[float, float] = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        http2: bool = False,
+    ):
+        super().__init__(api_token, pem_path, base_url)
+        connect_timeout, read_timeout = _split_timeout(timeout)
+        headers = {"Authorization": f"Bearer {self._token}"}
+        if http2:
+            if httpx is None:
+                raise FordefiError("http2=True needs the 'httpx[http2]' package (uv sync --extra http2)")
+            self._session = httpx.Client(
+                http2=True,
+                headers=headers,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+            self._timeout = None  # set on the client
+            self._body_arg = "content"
+            self._transport_errors = (httpx.TransportError,)
+        else:
+            self._session = requests.Session()
+            self._session.headers.update(headers)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+            self._timeout = (connect_timeout, read_timeout)
+            self._body_arg = "data"
+            self._transport_errors = (requests.RequestException,)
+
+    def close(self) -> None:
+        """Close the pooled connections. Further calls open new ones."""
+        self._session.close()
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+        if self._timeout is not None:
+            kwargs["timeout"] = self._timeout
+        try:
+            resp = self._session.request(method, f"{self._base_url}{path}", **kwargs)
+        except self._transport_errors as e:
+            raise FordefiError(f"{method} {path} failed: {e}")
+        self._handle_error(resp, method, path)
+        return resp.json()
+
     def get(self, path: str, params: dict[str, Any] | None = None) -> dict:
         """GET request with Authorization header only."""
-        resp = requests.get(
-            f"{self._base_url}{path}",
-            headers={"Authorization": f"Bearer {self._token}"},
-            params=params,
-        )
-        self._handle_error(resp, "GET", path)
-        return resp.json()
+        return self._request("GET", path, params=params)
 
     def post_signed(self, path: str, body: dict) -> dict:
         """POST request with full signing (Authorization + x-signature + x-timestamp)."""
         body_json = json.dumps(body)
-        timestamp = str(int(datetime.datetime.now(datetime.timezone.utc).timestamp()))
-        payload = f"{path}|{timestamp}|{body_json}"
-        signature = self._sign(payload)
-
-        resp = requests.post(
-            f"{self._base_url}{path}",
-            headers={
-                "Authorization": f"Bearer {self._token}",
-                "x-signature": base64.b64encode(signature),
-                "x-timestamp": timestamp.encode(),
-            },
-            data=body_json,
-        )
-        self._handle_error(resp, "POST", path)
-        return resp.json()
+        headers = self._signature_headers(path, body_json)
+        return self._request("POST", path, headers=headers, **{self._body_arg: body_json})
 
     def post_auth_only(self, path: str, body: dict) -> dict:
         """POST request with Authorization header only (used for swap quotes)."""
-        resp = requests.post(
-            f"{self._base_url}{path}",
+        return self._request("POST", path, json=body)
+
+
+class AsyncApiAuth(_BaseAuth):
+    """Asyncio counterpart of ApiAuth, on one shared httpx.AsyncClient connection pool.
+
+    At most `max_concurrency` requests are in flight at once; further calls wait
+    for a slot rather than opening more connections or overrunning the API.
+
+    Args:
+        api_token: Fordefi API user token.
+        pem_path: Path to the API signer private key PEM file.
+        base_url: Fordefi API base URL.
+        max_concurrency: Maximum number of requests in flight (and open connections).
+        pool_size: Maximum number of idle keep-alive connections kept open.
+        timeout: Seconds to wait for the server, as one number or a (connect, read) tuple.
+        http2: Use HTTP/2 (needs the h2 package, `uv sync --extra http2`).
+    """
+
+    def __init__(
+        self,
+        api_token: str,
+        pem_path: str,
+        base_url: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float | tuple[float, float] = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        http2: bool = False,
+    ):
+        if httpx is None:
+            raise FordefiError("AsyncFordefiClient needs the 'httpx' package (uv sync --extra async)")
+        super().__init__(api_token, pem_path, base_url)
+        connect_timeout, read_timeout = _split_timeout(timeout)
+        self._client = httpx.AsyncClient(
+            http2=http2,
             headers={"Authorization": f"Bearer {self._token}"},
-            json=body,
+            # No pool timeout: the semaphore never admits more requests than there are connections.
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout, pool=None),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=pool_size),
         )
-        self._handle_error(resp, "POST", path)
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self._client.aclose()
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+        async with self._slots:
+            try:
+                resp = await self._client.request(method, f"{self._base_url}{path}", **kwargs)
+            except httpx.TransportError as e:
+                raise FordefiError(f"{method} {path} failed: {e}")
+        self._handle_error(resp, method, path)
         return resp.json()
+
+    async def get(self, path: str, params: dict[str, Any] | None = None) -> dict:
+        """GET request with Authorization header only."""
+        return await self._request("GET", path, params=params)
+
+    async def post_signed(self, path: str, body: dict) -> dict:
+        """POST request with full signing (Authorization + x-signature + x-timestamp)."""
+        body_json = json.dumps(body)
+        headers = self._signature_headers(path, body_json)
+        return await self._request("POST", path, headers=headers, content=body_json)
+
+    async def post_auth_only(self, path: str, body: dict) -> dict:
+        """POST request with Authorization header only (used for swap quotes)."""
+        return await self._request("POST", path, json=body)
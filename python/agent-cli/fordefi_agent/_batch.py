@@ -0,0 +1,93 @@
+"""Validation and pacing for batch transfers (transfer_many), shared by the sync and async clients."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from ._chains import build_transfer_payload
+from ._sanitize import sanitize_amount, sanitize_uuid
+from ._types import FordefiError
+
+DEFAULT_MAX_IN_FLIGHT = 10
+TRANSFER_FIELDS = {"chain", "to", "amount", "token", "vault_id", "note", "memo", "gas_priority"}
+_REQUIRED_FIELDS = ("chain", "to", "amount")
+
+
+def prepare_transfers(
+    items: Iterable[dict[str, Any]],
+    resolve_vault: Callable[[str | None], str],
+) -> list[tuple[str, dict]]:
+    """Validate every transfer and build its (api_path, body), before anything is submitted.
+
+    Raises:
+        FordefiError: Listing every invalid item (by index) in details["invalid_items"].
+    """
+    prepared: list[tuple[str, dict]] = []
+    invalid: dict[int, str] = {}
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise FordefiError("item must be a dict of transfer() arguments")
+            unknown = set(item) - TRANSFER_FIELDS
+            if unknown:
+                raise FordefiError(f"Unknown transfer field(s): {', '.join(sorted(unknown))}")
+            missing = [field for field in _REQUIRED_FIELDS if not item.get(field)]
+            if missing:
+                raise FordefiError(f"Missing transfer field(s): {', '.join(missing)}")
+            if not isinstance(item["amount"], str):
+                raise FordefiError("amount must be a string of the smallest unit")
+            prepared.append(build_transfer_payload(
+                chain=item["chain"],
+                vault_id=sanitize_uuid(resolve_vault(item.get("vault_id")), "vault_id"),
+                to=item["to"],
+                amount=sanitize_amount(item["amount"]),
+                token=item.get("token"),
+                note=item.get("note", ""),
+                memo=item.get("memo"),
+                gas_priority=item.get("gas_priority", "medium"),
+            ))
+        except (FordefiError, TypeError, AttributeError) as e:
+            invalid[index] = e.message if isinstance(e, FordefiError) else str(e)
+    if invalid:
+        raise FordefiError(
+            f"{len(invalid)} of {len(invalid) + len(prepared)} transfers are invalid; nothing was submitted",
+            details={"invalid_items": invalid},
+        )
+    return prepared
+
+
+def transfer_result(index: int, raw: dict | None = None, error: FordefiError | None = None) -> dict:
+    if error is not None:
+        return {"index": index, "transaction_id": "", "state": "", "error": str(error), "raw_response": error.details}
+    return {
+        "index": index,
+        "transaction_id": raw.get("id", ""),
+        "state": raw.get("state", ""),
+        "error": None,
+        "raw_response": raw,
+    }
+
+
+class RateLimiter:
+    """Spaces submissions evenly at no more than `per_second` (unlimited if None).
+
+    reserve() claims the next start slot and returns how long the caller must
+    wait for it; callers sleep outside the lock (time.sleep or asyncio.sleep).
+    """
+
+    def __init__(self, per_second: float | None, clock: Callable[[], float] = time.monotonic):
+        self._interval = 1.0 / per_second if per_second else 0.0
+        self._clock = clock
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if not self._interval:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next)
+            self._next = start + self._interval
+            return start - now
@@ -21,11 +21,22 @@ class FordefiError(Exception):
 
 
 class FordefiTimeoutError(FordefiError):
-    """Raised when wait_for_transaction exceeds the timeout."""
+    """Raised when wait_for_transaction(s) exceeds the timeout.
 
-    def __init__(self, transaction_id: str, timeout: int):
-        super().__init__(
-            f"Transaction {transaction_id} did not reach terminal state within {timeout}s"
-        )
+    `pending_ids` lists every transaction still not final (wait_for_transactions
+    can time out on several); `transaction_id` is the first of them.
+    """
+
+    def __init__(self, transaction_id: str, timeout: int, pending_ids: list[str] | None = None):
+        pending_ids = pending_ids or [transaction_id]
+        if len(pending_ids) == 1:
+            message = f"Transaction {transaction_id} did not reach terminal state within {timeout}s"
+        else:
+            message = (
+                f"{len(pending_ids)} transactions did not reach terminal state within {timeout}s: "
+                + ", ".join(pending_ids[:5]) + (", ..." if len(pending_ids) > 5 else "")
+            )
+        super().__init__(message)
         self.transaction_id = transaction_id
         self.timeout = timeout
+        self.pending_ids = pending_ids
@@ -0,0 +1,115 @@
+"""Polling schedule for waiting on many transactions at once.
+
+Shared by FordefiClient.wait_for_transactions and its async counterpart: the
+schedule decides which transactions to look up when, the clients do the I/O.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Iterable
+
+TERMINAL_STATES = {
+    "completed", "mined", "aborted", "failed", "rejected", "stuck",
+}
+
+# Seconds between polls of a transaction, by the state it was last seen in:
+# quick while it moves through signing and broadcast on its own, slow while
+# it waits on a person (approvers) or a block to include it.
+STATE_POLL_INTERVALS: dict[str, float] = {
+    "created": 2.0,
+    "approved": 1.0,
+    "signed": 1.0,
+    "pushed_to_blockchain": 3.0,
+    "queued": 5.0,
+    "waiting_for_approval": 15.0,
+}
+DEFAULT_POLL_INTERVAL = 3.0
+MAX_POLL_INTERVAL = 30.0
+# Each poll that finds a transaction still in the same state stretches its interval by this factor.
+BACKOFF_FACTOR = 1.5
+# Transactions due within this many seconds of the earliest one ride along in the same list query.
+COALESCE_SECONDS = 0.5
+
+
+class TransactionWaiter:
+    """Tracks when each pending transaction should next be polled.
+
+    A transaction is polled at the interval for its current state, backing off
+    by BACKOFF_FACTOR (up to max_poll_interval) for as long as the state doesn't
+    change. Transactions that come due close together are batched into one
+    list query. All transactions are due for their first poll immediately.
+    With webhooks delivering final states, min_poll_interval turns polling into
+    a slow safety net.
+    """
+
+    def __init__(
+        self,
+        transaction_ids: Iterable[str],
+        timeout_seconds: float,
+        poll_intervals: dict[str, float] | None = None,
+        max_poll_interval: float = MAX_POLL_INTERVAL,
+        min_poll_interval: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self._intervals = {**STATE_POLL_INTERVALS, **(poll_intervals or {})}
+        self._max_interval = max_poll_interval
+        self._min_interval = min_poll_interval
+        self.deadline = clock() + timeout_seconds
+        now = clock()
+        # id -> [next poll time, last seen state, polls without a state change]
+        self._pending: dict[str, list] = {
+            transaction_id: [now, None, 0] for transaction_id in dict.fromkeys(transaction_ids)
+        }
+
+    @property
+    def pending(self) -> list[str]:
+        return list(self._pending)
+
+    def due(self) -> list[str]:
+        """Transactions to poll now (including those due within COALESCE_SECONDS).
+
+        At the deadline every pending transaction is due, for one last look.
+        """
+        if self.expired():
+            return self.pending
+        horizon = self._clock() + COALESCE_SECONDS
+        return [transaction_id for transaction_id, entry in self._pending.items() if entry[0] <= horizon]
+
+    def update(self, transaction: dict) -> bool:
+        """Record a polled transaction; returns True (and stops tracking it) once it is terminal."""
+        entry = self._pending.get(transaction.get("id", ""))
+        if entry is None:
+            return False
+        state = transaction.get("state", "")
+        if state in TERMINAL_STATES:
+            del self._pending[transaction["id"]]
+            return True
+        entry[2] = entry[2] + 1 if state == entry[1] else 0
+        entry[1] = state
+        self._reschedule(entry)
+        return False
+
+    def missed(self, transaction_ids: Iterable[str]) -> None:
+        """Polled transactions the API didn't return (e.g. not listed yet): back off as if unchanged."""
+        for transaction_id in transaction_ids:
+            entry = self._pending.get(transaction_id)
+            if entry is not None:
+                entry[2] += 1
+                self._reschedule(entry)
+
+    def _reschedule(self, entry: list) -> None:
+        base = self._intervals.get(entry[1], DEFAULT_POLL_INTERVAL)
+        interval = min(base * BACKOFF_FACTOR ** entry[2], max(base, self._max_interval))
+        interval = max(interval, self._min_interval)
+        entry[0] = self._clock() + interval
+
+    def seconds_until_due(self) -> float:
+        """How long to sleep before the next poll; 0 if one is due. Never past the deadline."""
+        now = self._clock()
+        next_poll = min((entry[0] for entry in self._pending.values()), default=now)
+        return max(0.0, min(next_poll, self.deadline) - now)
+
+    def expired(self) -> bool:
+        return self._clock() >= self.deadline
@@ -0,0 +1,233 @@
+"""Embedded webhook listener that resolves transaction waits as soon as Fordefi reports a final state."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import Future, InvalidStateError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ecdsa
+from ecdsa.util import sigdecode_der
+
+from ._types import FordefiError
+from ._waiter import TERMINAL_STATES
+
+# Verify with OpenSSL through `cryptography` when it's installed (~20x faster than
+# the pure-Python ecdsa package); fall back to ecdsa otherwise.
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+except ImportError:
+    load_pem_public_key = None
+
+logger = logging.getLogger("fordefi_agent.webhooks")
+
+# Seconds between safety-net polls while waiting on a webhook that hasn't arrived.
+DEFAULT_FALLBACK_POLL_INTERVAL = 30.0
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+
+class WebhookListener:
+    """Receives Fordefi transaction webhooks and hands final states to waiting callers.
+
+    Runs a small HTTP server on a background thread. Every POST must carry a
+    valid X-Signature (ECDSA P-256 / SHA-256 over the raw body, checked against
+    Fordefi's webhook public key, as in webhooks/fordefi_webhooks.py). When a
+    transaction's event reports a terminal state, the futures registered for it
+    with subscribe() are resolved with the event's transaction.
+
+    Point a Fordefi webhook (Settings -> Webhooks) at this listener's public URL.
+    Usually created through FordefiClient.listen_for_webhooks().
+
+    Args:
+        public_key_path: Fordefi's webhook public key (PEM).
+        host: Interface to listen on.
+        port: Port to listen on (0 picks a free one; see `port` once started).
+        path: URL path webhooks are posted to.
+        allowed_ips: If given, only accept webhooks from these source IPs
+            (e.g. Fordefi's NAT IP, 54.243.103.88).
+        trust_forwarded_for: Take the source IP from the last X-Forwarded-For
+            entry instead of the connection. Only enable this behind a reverse
+            proxy that appends that header; otherwise any client can spoof it.
+        fallback_poll_interval: Seconds between polls while waiting for a
+            webhook, in case one is lost.
+    """
+
+    def __init__(
+        self,
+        public_key_path: str = "public_key.pem",
+        host: str = "0.0.0.0",
+        port: int = 8080,
+        path: str = "/",
+        allowed_ips: set[str] | None = None,
+        fallback_poll_interval: float = DEFAULT_FALLBACK_POLL_INTERVAL,
+        trust_forwarded_for: bool = False,
+    ):
+        try:
+            with open(public_key_path, "r") as f:
+                public_key_pem = f.read()
+            self._verifying_key = ecdsa.VerifyingKey.from_pem(public_key_pem)
+        except FileNotFoundError:
+            raise FordefiError(f"Webhook public key not found: {public_key_path}")
+        except Exception as e:
+            raise FordefiError(f"Failed to load webhook public key from {public_key_path}: {e}")
+        self._native_key = load_pem_public_key(public_key_pem.encode()) if load_pem_public_key else None
+        self._address = (host, port)
+        self._path = path
+        self._allowed_ips = set(allowed_ips) if allowed_ips else None
+        self._trust_forwarded_for = trust_forwarded_for
+        self.fallback_poll_interval = fallback_poll_interval
+        self._futures: dict[str, list[Future]] = {}
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1] if self._server else self._address[1]
+
+    def start(self) -> WebhookListener:
+        if self._server is not None:
+            return self
+        listener = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/health":
+                    self._reply(HTTPStatus.OK, {"status": "online"})
+                else:
+                    self._reply(HTTPStatus.NOT_FOUND, {"detail": "Not found"})
+
+            def do_POST(self):
+                if self.path != listener._path:
+                    return self._reply(HTTPStatus.NOT_FOUND, {"detail": "Not found"})
+                source_ip = self.client_address[0]
+                forwarded_for = self.headers.get("x-forwarded-for")
+                if listener._trust_forwarded_for and forwarded_for:
+                    # The proxy appends the address it saw; earlier entries come from the client.
+                    source_ip = forwarded_for.split(",")[-1].strip()
+                if listener._allowed_ips is not None and source_ip not in listener._allowed_ips:
+                    logger.warning("Rejected webhook from unauthorized IP %s", source_ip)
+                    return self._reply(HTTPStatus.FORBIDDEN, {"detail": "Forbidden: IP not whitelisted"})
+                # Validated before reading: a bad length would raise here or block rfile.read().
+                content_length = self.headers.get("Content-Length")
+                if content_length is None:
+                    return self._reply(HTTPStatus.LENGTH_REQUIRED, {"detail": "Content-Length required"})
+                try:
+                    length = int(content_length)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    return self._reply(HTTPStatus.BAD_REQUEST, {"detail": "Invalid Content-Length"})
+                if length > MAX_BODY_BYTES:
+                    return self._reply(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"detail": "Body too large"})
+                body = self.rfile.read(length)
+                status, detail = listener.handle(self.headers.get("X-Signature"), body)
+                self._reply(status, {"status": "ok"} if status == HTTPStatus.OK else {"detail": detail})
+
+            def _reply(self, status: HTTPStatus, payload: dict) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug("%s - %s", self.address_string(), format % args)
+
+        self._server = ThreadingHTTPServer(self._address, Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fordefi-webhooks", daemon=True).start()
+        logger.info("Listening for Fordefi webhooks on %s:%d%s", self._address[0], self.port, self._path)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> WebhookListener:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def verify_signature(self, signature: str, body: bytes) -> bool:
+        try:
+            signature_bytes = base64.b64decode(signature)
+        except Exception:
+            return False
+        if self._native_key is not None:
+            try:
+                self._native_key.verify(signature_bytes, body, ec.ECDSA(hashes.SHA256()))
+                return True
+            except InvalidSignature:
+                return False
+            except Exception as e:
+                logger.warning("Signature verification error: %s", e)
+                return False
+        try:
+            return self._verifying_key.verify(
+                signature=signature_bytes,
+                data=body,
+                hashfunc=hashlib.sha256,
+                sigdecode=sigdecode_der,
+            )
+        except Exception as e:
+            logger.warning("Signature verification error: %s", e)
+            return False
+
+    def handle(self, signature: str | None, body: bytes) -> tuple[HTTPStatus, str]:
+        """Verify and dispatch one webhook body; returns the HTTP status (and error detail) to answer with."""
+        if not signature:
+            return HTTPStatus.UNAUTHORIZED, "Missing signature"
+        if not self.verify_signature(signature, body):
+            logger.warning("Rejected webhook with an invalid signature")
+            return HTTPStatus.UNAUTHORIZED, "Invalid signature"
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return HTTPStatus.BAD_REQUEST, "Invalid JSON"
+        event = payload.get("event") if isinstance(payload, dict) else None
+        if isinstance(event, dict) and event.get("id") and event.get("state") in TERMINAL_STATES:
+            self._resolve(event)
+        return HTTPStatus.OK, ""
+
+    def subscribe(self, transaction_id: str) -> Future:
+        """A future resolved with the transaction once a webhook reports it in a terminal state."""
+        future: Future = Future()
+        with self._lock:
+            self._futures.setdefault(transaction_id, []).append(future)
+        return future
+
+    def unsubscribe(self, transaction_id: str, future: Future) -> None:
+        with self._lock:
+            futures = self._futures.get(transaction_id, [])
+            if future in futures:
+                futures.remove(future)
+            if not futures:
+                self._futures.pop(transaction_id, None)
+
+    def subscribe_many(self, transaction_ids: list[str]) -> dict[str, Future]:
+        return {transaction_id: self.subscribe(transaction_id) for transaction_id in transaction_ids}
+
+    def unsubscribe_many(self, futures: dict[str, Future]) -> None:
+        for transaction_id, future in futures.items():
+            self.unsubscribe(transaction_id, future)
+
+    def _resolve(self, transaction: dict) -> None:
+        with self._lock:
+            futures = self._futures.pop(transaction["id"], [])
+        for future in futures:
+            try:
+                future.set_result(transaction)
+            except InvalidStateError:
+                pass  # the waiter gave up (e.g. an async wait was cancelled)
@@ -0,0 +1,470 @@
+"""AsyncFordefiClient - the asyncio counterpart of FordefiClient."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Iterable
+
+from ._auth import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    AsyncApiAuth,
+)
+from ._batch import DEFAULT_MAX_IN_FLIGHT, RateLimiter, prepare_transfers, transfer_result
+from ._chains import (
+    build_evm_contract_call_payload,
+    build_personal_message_payload,
+    build_swap_quote_payload,
+    build_swap_submit_payload,
+    build_transfer_payload,
+    build_typed_data_payload,
+    resolve_chain,
+)
+from ._sanitize import sanitize_amount, sanitize_uuid
+from ._types import FordefiError, FordefiTimeoutError
+from ._waiter import MAX_POLL_INTERVAL, TransactionWaiter
+from ._webhooks import DEFAULT_FALLBACK_POLL_INTERVAL, WebhookListener
+from .client import (
+    TERMINAL_STATES,
+    WAIT_BATCH_SIZE,
+    FordefiClient,
+    _batches,
+    _collect_quotes,
+    _items,
+    _list_transactions_params,
+    _submission,
+    _transactions_by_id_params,
+)
+
+
+class AsyncFordefiClient:
+    """Asyncio Fordefi API client with the same methods as FordefiClient.
+
+    Every method is a coroutine taking the same arguments and returning the
+    same values as its FordefiClient counterpart, so many operations (balances
+    across vaults, batches of transfers, waits) can run concurrently:
+
+        async with AsyncFordefiClient() as client:
+            balances = await asyncio.gather(*(client.get_balance(v) for v in vault_ids))
+
+    All calls share one connection pool, and at most `max_concurrency` API
+    requests are in flight at a time; the rest wait their turn.
+
+    Credentials are read as for FordefiClient. Requires `uv sync --extra async`.
+
+    Args:
+        vault_id: Default vault ID used when not specified per-call.
+        pem_path: Path to the API signer private key PEM file.
+        base_url: Fordefi API base URL (default: https://api.fordefi.com).
+        max_concurrency: Maximum number of API requests in flight (default: 50).
+        pool_size: Maximum number of idle keep-alive connections (default: 10).
+        timeout: Seconds to wait for the API, as one number or a (connect, read)
+            tuple (default: 5s to connect, 30s to read).
+        http2: Talk HTTP/2 to the API (requires `uv sync --extra http2`).
+    """
+
+    def __init__(
+        self,
+        vault_id: str | None = None,
+        pem_path: str = "secret/private.pem",
+        base_url: str = "https://api.fordefi.com",
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float | tuple[float, float] = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        http2: bool = False,
+    ):
+        api_token = os.environ.get("FORDEFI_API_USER_TOKEN")
+        if not api_token:
+            raise FordefiError("FORDEFI_API_USER_TOKEN environment variable is not set")
+        self._vault_id = vault_id or ""
+        self._api = AsyncApiAuth(
+            api_token, pem_path, base_url,
+            max_concurrency=max_concurrency, pool_size=pool_size, timeout=timeout, http2=http2,
+        )
+        self._webhooks: WebhookListener | None = None
+
+    async def aclose(self) -> None:
+        """Close the client's pooled HTTP connections (and stop its webhook listener)."""
+        await self._api.aclose()
+        if self._webhooks is not None:
+            self._webhooks.stop()
+            self._webhooks = None
+
+    def listen_for_webhooks(
+        self,
+        port: int = 8080,
+        host: str = "0.0.0.0",
+        public_key_path: str = "public_key.pem",
+        *,
+        path: str = "/",
+        allowed_ips: set[str] | None = None,
+        fallback_poll_interval: float = DEFAULT_FALLBACK_POLL_INTERVAL,
+        trust_forwarded_for: bool = False,
+    ) -> WebhookListener:
+        """Start an embedded webhook listener for waits. See FordefiClient.listen_for_webhooks."""
+        if self._webhooks is not None:
+            self._webhooks.stop()
+        self._webhooks = WebhookListener(
+            public_key_path, host, port, path=path, allowed_ips=allowed_ips,
+            fallback_poll_interval=fallback_poll_interval, trust_forwarded_for=trust_forwarded_for,
+        ).start()
+        return self._webhooks
+
+    async def __aenter__(self) -> AsyncFordefiClient:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    def _resolve_vault(self, vault_id: str | None) -> str:
+        return vault_id or self._vault_id
+
+    # ------------------------------------------------------------------
+    # Read operations
+    # ------------------------------------------------------------------
+
+    async def list_vaults(self) -> list[dict]:
+        """List all vaults accessible to this API user."""
+        resp = await self._api.get("/api/v1/vaults")
+        return _items(resp, "vaults")
+
+    async def get_balance(self, vault_id: str | None = None) -> list[dict]:
+        """Get asset balances for a vault."""
+        vid = self._resolve_vault(vault_id)
+        resp = await self._api.get(f"/api/v1/vaults/{vid}/assets")
+        return _items(resp, "assets")
+
+    async def get_transaction(self, transaction_id: str) -> dict:
+        """Get full details of a transaction by ID."""
+        return await self._api.get(f"/api/v1/transactions/{transaction_id}")
+
+    async def list_transactions(
+        self,
+        vault_id: str | None = None,
+        state: str | None = None,
+        limit: int = 20,
+    ) -> list[dict]:
+        """List transactions with optional filters."""
+        params = _list_transactions_params(vault_id, state, limit)
+        resp = await self._api.get("/api/v1/transactions", params=params)
+        return _items(resp, "transactions")
+
+    # ------------------------------------------------------------------
+    # Transfers (all chains)
+    # ------------------------------------------------------------------
+
+    async def transfer(
+        self,
+        chain: str,
+        to: str,
+        amount: str,
+        token: str | None = None,
+        vault_id: str | None = None,
+        note: str = "",
+        *,
+        memo: str | None = None,
+        gas_priority: str = "medium",
+    ) -> dict:
+        """Transfer native assets or tokens on any supported chain. See FordefiClient.transfer."""
+        vid = sanitize_uuid(self._resolve_vault(vault_id), "vault_id")
+        amount = sanitize_amount(amount)
+        api_path, body = build_transfer_payload(
+            chain=chain,
+            vault_id=vid,
+            to=to,
+            amount=amount,
+            token=token,
+            note=note,
+            memo=memo,
+            gas_priority=gas_priority,
+        )
+        raw = await self._api.post_signed(api_path, body)
+        return _submission(raw)
+
+    async def transfer_many(
+        self,
+        items: Iterable[dict[str, Any]],
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        rate_limit: float | None = None,
+    ) -> AsyncIterator[dict]:
+        """Submit many transfers concurrently, yielding a result per transfer as each finishes.
+
+        Use with `async for`. See FordefiClient.transfer_many.
+
+        Raises:
+            FordefiError: If any item is invalid, before anything is submitted.
+        """
+        prepared = prepare_transfers(items, self._resolve_vault)
+        limiter = RateLimiter(rate_limit)
+        slots = asyncio.Semaphore(max_in_flight)
+        sent: set[int] = set()
+
+        async def submit(index: int, api_path: str, body: dict) -> dict:
+            async with slots:
+                await asyncio.sleep(limiter.reserve())
+                sent.add(index)
+                try:
+                    return transfer_result(index, await self._api.post_signed(api_path, body))
+                except FordefiError as e:
+                    return transfer_result(index, error=e)
+
+        tasks = [asyncio.create_task(submit(index, api_path, body)) for index, (api_path, body) in enumerate(prepared)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # If the caller stops early, transfers not yet sent are dropped; those in flight finish,
+            # since cancelling a sent request would leave its outcome unknown.
+            for index, task in enumerate(tasks):
+                if index not in sent:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # EVM contract calls
+    # ------------------------------------------------------------------
+
+    async def evm_contract_call(
+        self,
+        chain: str,
+        contract: str,
+        call_data: str,
+        value: str = "0",
+        vault_id: str | None = None,
+        note: str = "",
+        *,
+        gas_limit: str | None = None,
+        gas_priority: str = "medium",
+        fail_on_prediction_failure: bool = True,
+    ) -> dict:
+        """Execute a raw EVM contract call. See FordefiClient.evm_contract_call."""
+        vid = sanitize_uuid(self._resolve_vault(vault_id), "vault_id")
+        api_path, body = build_evm_contract_call_payload(
+            chain=chain,
+            vault_id=vid,
+            contract=contract,
+            call_data=call_data,
+            value=value,
+            note=note,
+            gas_limit=gas_limit,
+            gas_priority=gas_priority,
+            fail_on_prediction_failure=fail_on_prediction_failure,
+        )
+        raw = await self._api.post_signed(api_path, body)
+        return _submission(raw)
+
+    # ------------------------------------------------------------------
+    # EVM message signing
+    # ------------------------------------------------------------------
+
+    async def sign_personal_message(
+        self,
+        chain: str,
+        message: str,
+        vault_id: str | None = None,
+    ) -> dict:
+        """Sign a personal message (EIP-191) with an EVM vault. See FordefiClient.sign_personal_message."""
+        vid = sanitize_uuid(self._resolve_vault(vault_id), "vault_id")
+        api_path, body = build_personal_message_payload(
+            chain=chain,
+            vault_id=vid,
+            message=message,
+        )
+        raw = await self._api.post_signed(api_path, body)
+        return FordefiClient._decode_signature(raw)
+
+    async def sign_typed_data(
+        self,
+        chain: str,
+        typed_data: dict,
+        vault_id: str | None = None,
+    ) -> dict:
+        """Sign EIP-712 typed data with an EVM vault. See FordefiClient.sign_typed_data."""
+        vid = sanitize_uuid(self._resolve_vault(vault_id), "vault_id")
+        api_path, body = build_typed_data_payload(
+            chain=chain,
+            vault_id=vid,
+            typed_data=typed_data,
+        )
+        raw = await self._api.post_signed(api_path, body)
+        return FordefiClient._decode_signature(raw)
+
+    # ------------------------------------------------------------------
+    # Swaps
+    # ------------------------------------------------------------------
+
+    async def get_swap_quote(
+        self,
+        chain: str,
+        sell_token: str,
+        buy_token: str,
+        amount: str,
+        vault_id: str | None = None,
+        *,
+        slippage_bps: str = "500",
+    ) -> dict:
+        """Get swap quotes without executing. See FordefiClient.get_swap_quote."""
+        vid = sanitize_uuid(self._resolve_vault(vault_id), "vault_id")
+        amount = sanitize_amount(amount)
+        cfg = resolve_chain(chain)
+
+        if not cfg.swap_chain_type:
+            raise FordefiError(f"Swaps are not supported on '{chain}'")
+
+        providers_resp = await self._api.get(
+            f"/api/v1/swaps/providers/{cfg.swap_chain_type}"
+        )
+        provider_ids = [
+            p["provider_id"] for p in providers_resp.get("providers", [])
+        ]
+        if not provider_ids:
+            raise FordefiError(f"No swap providers available for {chain}")
+
+        quote_body = build_swap_quote_payload(
+            cfg=cfg,
+            vault_id=vid,
+            sell_token=sell_token,
+            buy_token=buy_token,
+            amount=amount,
+            slippage_bps=slippage_bps,
+            providers=provider_ids,
+        )
+        quotes_resp = await self._api.post_auth_only("/api/v1/swaps/quotes", quote_body)
+        return _collect_quotes(quotes_resp)
+
+    async def swap(
+        self,
+        chain: str,
+        sell_token: str,
+        buy_token: str,
+        amount: str,
+        vault_id: str | None = None,
+        *,
+        slippage_bps: str = "500",
+    ) -> dict:
+        """Execute a token swap (providers -> quotes -> submit). See FordefiClient.swap."""
+        vid = sanitize_uuid(self._resolve_vault(vault_id), "vault_id")
+        amount = sanitize_amount(amount)
+        cfg = resolve_chain(chain)
+
+        quote_result = await self.get_swap_quote(
+            chain=chain,
+            sell_token=sell_token,
+            buy_token=buy_token,
+            amount=amount,
+            vault_id=vid,
+            slippage_bps=slippage_bps,
+        )
+
+        best = quote_result["best_quote"]
+        if not best:
+            raise FordefiError("No valid swap quotes available from any provider")
+
+        submit_body = build_swap_submit_payload(
+            cfg=cfg,
+            vault_id=vid,
+            quote_id=best["quote_id"],
+            sell_token=sell_token,
+            buy_token=buy_token,
+            amount=amount,
+            slippage_bps=slippage_bps,
+        )
+        raw = await self._api.post_signed("/api/v1/swaps", submit_body)
+
+        return {**_submission(raw), "quote": best}
+
+    # ------------------------------------------------------------------
+    # Polling
+    # ------------------------------------------------------------------
+
+    async def wait_for_transaction(
+        self,
+        transaction_id: str,
+        timeout_seconds: int = 120,
+        poll_interval: int = 3,
+    ) -> dict:
+        """Poll a transaction until it reaches a terminal state. See FordefiClient.wait_for_transaction.
+
+        Raises:
+            FordefiTimeoutError: If the timeout is exceeded.
+        """
+        if self._webhooks is not None:
+            results = self.wait_for_transactions([transaction_id], timeout_seconds)
+            try:
+                return await anext(results)
+            finally:
+                await results.aclose()
+        start = time.monotonic()
+        while True:
+            tx = await self.get_transaction(transaction_id)
+            state = tx.get("state", "")
+            if state in TERMINAL_STATES:
+                return tx
+            elapsed = time.monotonic() - start
+            if elapsed + poll_interval > timeout_seconds:
+                raise FordefiTimeoutError(transaction_id, timeout_seconds)
+            await asyncio.sleep(poll_interval)
+
+    async def wait_for_transactions(
+        self,
+        transaction_ids: Iterable[str],
+        timeout_seconds: int = 300,
+        *,
+        poll_intervals: dict[str, float] | None = None,
+        max_poll_interval: float = MAX_POLL_INTERVAL,
+    ) -> AsyncIterator[dict]:
+        """Wait on many transactions at once, yielding each as it reaches a terminal state.
+
+        Use with `async for`. The list queries for one round of polls run
+        concurrently. See FordefiClient.wait_for_transactions.
+
+        Raises:
+            FordefiTimeoutError: If some are still pending at the timeout
+                (its `pending_ids` lists them).
+        """
+        webhooks = self._webhooks
+        waiter = TransactionWaiter(
+            transaction_ids, timeout_seconds, poll_intervals, max_poll_interval,
+            min_poll_interval=webhooks.fallback_poll_interval if webhooks else 0.0,
+        )
+        # Subscribed before the first poll, so a webhook arriving in between isn't missed.
+        futures = webhooks.subscribe_many(waiter.pending) if webhooks else {}
+        waiting = {transaction_id: asyncio.wrap_future(future) for transaction_id, future in futures.items()}
+        try:
+            while waiter.pending:
+                batches = list(_batches(waiter.due(), WAIT_BATCH_SIZE))
+                responses = await asyncio.gather(*(
+                    self._api.get("/api/v1/transactions", params=_transactions_by_id_params(batch))
+                    for batch in batches
+                ))
+                for batch, resp in zip(batches, responses):
+                    transactions = _items(resp, "transactions")
+                    for tx in transactions:
+                        if waiter.update(tx):
+                            yield tx
+                    waiter.missed(set(batch) - {tx.get("id") for tx in transactions})
+                if not waiter.pending:
+                    return
+                if waiter.expired():
+                    pending = waiter.pending
+                    raise FordefiTimeoutError(pending[0], timeout_seconds, pending)
+                if not waiting:
+                    await asyncio.sleep(waiter.seconds_until_due())
+                    continue
+                await asyncio.wait(
+                    waiting.values(), timeout=waiter.seconds_until_due(), return_when=asyncio.FIRST_COMPLETED,
+                )
+                for transaction_id, future in list(waiting.items()):
+                    if future.done():
+                        del waiting[transaction_id]
+                        if waiter.update(future.result()):
+                            yield future.result()
+        finally:
+            for future in waiting.values():
+                future.cancel()
+            if webhooks:
+                webhooks.unsubscribe_many(futures)
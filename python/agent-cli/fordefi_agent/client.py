@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 import base64
+import concurrent.futures
+import contextlib
 import os
+import threading
 import time
-from typing import Any
+from typing import Any, Iterable, Iterator
 
-from ._auth import ApiAuth
+from ._auth import DEFAULT_CONNECT_TIMEOUT, DEFAULT_POOL_SIZE, DEFAULT_READ_TIMEOUT, ApiAuth
+from ._batch import DEFAULT_MAX_IN_FLIGHT, RateLimiter, prepare_transfers, transfer_result
 from ._sanitize import sanitize_amount, sanitize_uuid
 from ._chains import (
     CHAINS,
@@ -20,10 +24,62 @@ from ._chains import (
     resolve_chain,
 )
 from ._types import FordefiError, FordefiTimeoutError
+from ._waiter import MAX_POLL_INTERVAL, TERMINAL_STATES, TransactionWaiter
+from ._webhooks import DEFAULT_FALLBACK_POLL_INTERVAL, WebhookListener
 
-TERMINAL_STATES = {
-    "completed", "mined", "aborted", "failed", "rejected", "stuck",
-}
+# Transactions looked up per list query while waiting on many (the API's page size limit).
+WAIT_BATCH_SIZE = 100
+
+
+# Response shaping shared with AsyncFordefiClient.
+
+def _items(resp: Any, key: str) -> list[dict]:
+    return resp.get(key, resp if isinstance(resp, list) else [resp])
+
+
+def _list_transactions_params(vault_id: str | None, state: str | None, limit: int) -> dict[str, Any]:
+    params: dict[str, Any] = {"page_size": limit}
+    if vault_id:
+        params["vault_id"] = vault_id
+    if state:
+        params["state"] = state
+    return params
+
+
+def _batches(items: list[str], size: int) -> Iterator[list[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _transactions_by_id_params(transaction_ids: list[str]) -> dict[str, Any]:
+    return {"transaction_ids": transaction_ids, "size": len(transaction_ids)}
+
+
+def _submission(raw: dict) -> dict:
+    return {
+        "transaction_id": raw.get("id", ""),
+        "state": raw.get("state", ""),
+        "raw_response": raw,
+    }
+
+
+def _collect_quotes(quotes_resp: dict) -> dict:
+    """Keep the providers that returned a quote and pick the one with the highest output."""
+    best_quote = None
+    all_quotes = []
+    for provider in quotes_resp.get("providers_with_quote", []):
+        quote = provider.get("quote")
+        if quote and not provider.get("api_error"):
+            entry = {
+                **quote,
+                "provider_info": provider.get("provider_info", {}),
+            }
+            all_quotes.append(entry)
+
+    if all_quotes:
+        best_quote = max(all_quotes, key=lambda q: int(q.get("output_amount", "0")))
+
+    return {"best_quote": best_quote, "all_quotes": all_quotes}
 
 
 class FordefiClient:
@@ -37,6 +93,16 @@ class FordefiClient:
         vault_id: Default vault ID used when not specified per-call.
         pem_path: Path to the API signer private key PEM file.
         base_url: Fordefi API base URL (default: https://api.fordefi.com).
+        pool_size: Maximum number of keep-alive connections to the API (default: 10).
+        timeout: Seconds to wait for the API, as one number or a (connect, read)
+            tuple (default: 5s to connect, 30s to read).
+        http2: Talk HTTP/2 to the API (requires `uv sync --extra http2`).
+
+    The client keeps its connections open between calls. Use it as a context
+    manager, or call close(), to release them when done:
+
+        with FordefiClient() as client:
+            client.get_balance()
     """
 
     def __init__(
@@ -44,12 +110,70 @@ class FordefiClient:
         vault_id: str | None = None,
         pem_path: str = "secret/private.pem",
         base_url: str = "https://api.fordefi.com",
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float | tuple[float, float] = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        http2: bool = False,
     ):
         api_token = os.environ.get("FORDEFI_API_USER_TOKEN")
         if not api_token:
             raise FordefiError("FORDEFI_API_USER_TOKEN environment variable is not set")
         self._vault_id = vault_id or ""
-        self._api = ApiAuth(api_token, pem_path, base_url)
+        self._api = ApiAuth(api_token, pem_path, base_url, pool_size=pool_size, timeout=timeout, http2=http2)
+        self._webhooks: WebhookListener | None = None
+
+    def close(self) -> None:
+        """Close the client's pooled HTTP connections (and stop its webhook listener)."""
+        self._api.close()
+        if self._webhooks is not None:
+            self._webhooks.stop()
+            self._webhooks = None
+
+    def listen_for_webhooks(
+        self,
+        port: int = 8080,
+        host: str = "0.0.0.0",
+        public_key_path: str = "public_key.pem",
+        *,
+        path: str = "/",
+        allowed_ips: set[str] | None = None,
+        fallback_poll_interval: float = DEFAULT_FALLBACK_POLL_INTERVAL,
+        trust_forwarded_for: bool = False,
+    ) -> WebhookListener:
+        """Start an embedded webhook listener so waits finish the moment Fordefi reports a final state.
+
+        Once listening, wait_for_transaction(s) polls once up front, then waits
+        for the transaction's webhook, polling only every fallback_poll_interval
+        seconds in case a webhook is lost. Configure a Fordefi webhook pointing
+        at this host and port; every request's X-Signature is verified against
+        Fordefi's webhook public key. The listener stops on close().
+
+        Args:
+            port: Port to listen on.
+            host: Interface to listen on.
+            public_key_path: Path to Fordefi's webhook public key PEM.
+            path: URL path the webhook posts to.
+            allowed_ips: Only accept webhooks from these IPs (e.g. {"54.243.103.88"}).
+            fallback_poll_interval: Seconds between safety-net polls (default 30s).
+            trust_forwarded_for: Check allowed_ips against the X-Forwarded-For
+                header set by a reverse proxy in front of the listener, rather
+                than the connecting address. Leave off without such a proxy.
+
+        Returns:
+            The running WebhookListener.
+        """
+        if self._webhooks is not None:
+            self._webhooks.stop()
+        self._webhooks = WebhookListener(
+            public_key_path, host, port, path=path, allowed_ips=allowed_ips,
+            fallback_poll_interval=fallback_poll_interval, trust_forwarded_for=trust_forwarded_for,
+        ).start()
+        return self._webhooks
+
+    def __enter__(self) -> FordefiClient:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def _resolve_vault(self, vault_id: str | None) -> str:
         return vault_id or self._vault_id
@@ -61,13 +185,13 @@ class FordefiClient:
     def list_vaults(self) -> list[dict]:
         """List all vaults accessible to this API user."""
         resp = self._api.get("/api/v1/vaults")
-        return resp.get("vaults", resp if isinstance(resp, list) else [resp])
+        return _items(resp, "vaults")
 
     def get_balance(self, vault_id: str | None = None) -> list[dict]:
         """Get asset balances for a vault."""
         vid = self._resolve_vault(vault_id)
         resp = self._api.get(f"/api/v1/vaults/{vid}/assets")
-        return resp.get("assets", resp if isinstance(resp, list) else [resp])
+        return _items(resp, "assets")
 
     def get_transaction(self, transaction_id: str) -> dict:
         """Get full details of a transaction by ID."""
@@ -80,13 +204,9 @@ class FordefiClient:
         limit: int = 20,
     ) -> list[dict]:
         """List transactions with optional filters."""
-        params: dict[str, Any] = {"page_size": limit}
-        if vault_id:
-            params["vault_id"] = vault_id
-        if state:
-            params["state"] = state
+        params = _list_transactions_params(vault_id, state, limit)
         resp = self._api.get("/api/v1/transactions", params=params)
-        return resp.get("transactions", resp if isinstance(resp, list) else [resp])
+        return _items(resp, "transactions")
 
     # ------------------------------------------------------------------
     # Transfers (all chains)
@@ -132,11 +252,62 @@ class FordefiClient:
             gas_priority=gas_priority,
         )
         raw = self._api.post_signed(api_path, body)
-        return {
-            "transaction_id": raw.get("id", ""),
-            "state": raw.get("state", ""),
-            "raw_response": raw,
-        }
+        return _submission(raw)
+
+    def transfer_many(
+        self,
+        items: Iterable[dict[str, Any]],
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        rate_limit: float | None = None,
+    ) -> Iterator[dict]:
+        """Submit many transfers in parallel, yielding a result per transfer as each finishes.
+
+        Every item is validated and its payload built before anything is
+        submitted; if any item is invalid, nothing is sent. Items are then
+        signed and submitted by a pool of max_in_flight worker threads,
+        started no faster than rate_limit per second. A failed submission
+        doesn't stop the batch: it is reported in that item's result.
+
+        Args:
+            items: Transfers as dicts of transfer() arguments: "chain", "to",
+                "amount" (required) and optionally "token", "vault_id", "note",
+                "memo", "gas_priority".
+            max_in_flight: Maximum submissions in progress at once (default 10).
+                Raise pool_size on the client to match if you go higher.
+            rate_limit: Maximum submissions started per second (default: no limit).
+
+        Yields:
+            dict with "index" (position in items), "transaction_id", "state",
+            "error" (None, or the error message if submission failed), and
+            "raw_response", in completion order.
+
+        Raises:
+            FordefiError: If any item is invalid, before anything is submitted
+                (details["invalid_items"] maps each bad index to its problem).
+        """
+        prepared = prepare_transfers(items, self._resolve_vault)
+        limiter = RateLimiter(rate_limit)
+        stopped = threading.Event()
+
+        def submit(index: int, api_path: str, body: dict) -> dict:
+            time.sleep(limiter.reserve())
+            if stopped.is_set():
+                return transfer_result(index, error=FordefiError("Not submitted: the batch was stopped"))
+            try:
+                # Signed here, right before sending, so the signature's timestamp is fresh.
+                return transfer_result(index, self._api.post_signed(api_path, body))
+            except FordefiError as e:
+                return transfer_result(index, error=e)
+
+        pool = concurrent.futures.ThreadPoolExecutor(max_in_flight, thread_name_prefix="fordefi-transfer")
+        try:
+            futures = [pool.submit(submit, index, api_path, body) for index, (api_path, body) in enumerate(prepared)]
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+        finally:
+            # If the caller stops early, transfers not yet sent are dropped; those in flight finish.
+            stopped.set()
+            pool.shutdown(wait=True, cancel_futures=True)
 
     # ------------------------------------------------------------------
     # EVM contract calls
@@ -185,11 +356,7 @@ class FordefiClient:
             fail_on_prediction_failure=fail_on_prediction_failure,
         )
         raw = self._api.post_signed(api_path, body)
-        return {
-            "transaction_id": raw.get("id", ""),
-            "state": raw.get("state", ""),
-            "raw_response": raw,
-        }
+        return _submission(raw)
 
     # ------------------------------------------------------------------
     # EVM message signing
@@ -325,23 +492,7 @@ class FordefiClient:
             providers=provider_ids,
         )
         quotes_resp = self._api.post_auth_only("/api/v1/swaps/quotes", quote_body)
-
-        # Find best quote
-        best_quote = None
-        all_quotes = []
-        for provider in quotes_resp.get("providers_with_quote", []):
-            quote = provider.get("quote")
-            if quote and not provider.get("api_error"):
-                entry = {
-                    **quote,
-                    "provider_info": provider.get("provider_info", {}),
-                }
-                all_quotes.append(entry)
-
-        if all_quotes:
-            best_quote = max(all_quotes, key=lambda q: int(q.get("output_amount", "0")))
-
-        return {"best_quote": best_quote, "all_quotes": all_quotes}
+        return _collect_quotes(quotes_resp)
 
     def swap(
         self,
@@ -416,6 +567,8 @@ class FordefiClient:
         """Poll a transaction until it reaches a terminal state.
 
         Terminal states: completed, mined, aborted, failed, rejected, stuck.
+        With listen_for_webhooks() active, the webhook ends the wait instead
+        and poll_interval is not used.
 
         Args:
             transaction_id: The transaction ID to poll.
@@ -428,6 +581,9 @@ class FordefiClient:
         Raises:
             FordefiTimeoutError: If the timeout is exceeded.
         """
+        if self._webhooks is not None:
+            with contextlib.closing(self.wait_for_transactions([transaction_id], timeout_seconds)) as results:
+                return next(results)
         start = time.monotonic()
         while True:
             tx = self.get_transaction(transaction_id)
@@ -438,3 +594,71 @@ class FordefiClient:
             if elapsed + poll_interval > timeout_seconds:
                 raise FordefiTimeoutError(transaction_id, timeout_seconds)
             time.sleep(poll_interval)
+
+    def wait_for_transactions(
+        self,
+        transaction_ids: Iterable[str],
+        timeout_seconds: int = 300,
+        *,
+        poll_intervals: dict[str, float] | None = None,
+        max_poll_interval: float = MAX_POLL_INTERVAL,
+    ) -> Iterator[dict]:
+        """Wait on many transactions at once, yielding each as it reaches a terminal state.
+
+        Rather than one polling loop per transaction, all pending transactions
+        share one schedule: those due for a poll are fetched together with one
+        list query per 100 ids. Each is polled at a pace set by its current state
+        (every second while "signed", every 15s while "waiting_for_approval") and
+        backs off further while its state doesn't change. With
+        listen_for_webhooks() active, webhooks deliver the final states and
+        polling slows to the listener's fallback_poll_interval.
+
+        Args:
+            transaction_ids: The transaction IDs to wait for.
+            timeout_seconds: Maximum time to wait for all of them (default 300s).
+            poll_intervals: Override the poll interval (seconds) for given states,
+                e.g. {"waiting_for_approval": 60}.
+            max_poll_interval: Upper bound for backed-off poll intervals (default 30s).
+
+        Yields:
+            The full transaction dict of each transaction, in completion order.
+
+        Raises:
+            FordefiTimeoutError: If some are still pending at the timeout
+                (its `pending_ids` lists them).
+        """
+        webhooks = self._webhooks
+        waiter = TransactionWaiter(
+            transaction_ids, timeout_seconds, poll_intervals, max_poll_interval,
+            min_poll_interval=webhooks.fallback_poll_interval if webhooks else 0.0,
+        )
+        # Subscribed before the first poll, so a webhook arriving in between isn't missed.
+        futures = webhooks.subscribe_many(waiter.pending) if webhooks else {}
+        try:
+            while waiter.pending:
+                for batch in _batches(waiter.due(), WAIT_BATCH_SIZE):
+                    resp = self._api.get("/api/v1/transactions", params=_transactions_by_id_params(batch))
+                    transactions = _items(resp, "transactions")
+                    for tx in transactions:
+                        if waiter.update(tx):
+                            yield tx
+                    waiter.missed(set(batch) - {tx.get("id") for tx in transactions})
+                if not waiter.pending:
+                    return
+                if waiter.expired():
+                    pending = waiter.pending
+                    raise FordefiTimeoutError(pending[0], timeout_seconds, pending)
+                if not futures:
+                    time.sleep(waiter.seconds_until_due())
+                    continue
+                concurrent.futures.wait(
+                    futures.values(), waiter.seconds_until_due(), concurrent.futures.FIRST_COMPLETED,
+                )
+                for transaction_id, future in list(futures.items()):
+                    if future.done():
+                        del futures[transaction_id]
+                        if waiter.update(future.result()):
+                            yield future.result()
+        finally:
+            if webhooks:
+                webhooks.unsubscribe_many(futures)
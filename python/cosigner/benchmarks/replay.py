@@ -0,0 +1,255 @@
+"""Replay captured transactions through the rules offline and report verdicts and latency.
+
+Runs each transaction through the same pipeline as the service — TransactionView,
+decode_calldata, run_rules over the rule index — without any network calls, then
+prints the overall decision split, each rule's verdict distribution and p50/p99
+latency, and transactions/sec. Use it to regression-test a new rule set against
+real traffic before deploying it.
+
+Input is a directory of *.json files (one transaction each, as returned by
+GET /api/v1/transactions/{id}), a single .json file, or a JSONL file with one
+transaction per line.
+
+    uv run python -m benchmarks.replay captured/ --origin-vault 0x... [--workers 4] [--repeat 10]
+
+Pass --rules (or set RULES_PATH) to add declarative rules, exactly as the
+service does. Rules behave as in production: dispatch skips rules that don't apply (counted
+as "not_applicable") and the first ABORT stops the remaining rules (counted as
+"not_run").
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from fordefi import Config
+from rules import (
+    ABI_REGISTRY,
+    ALL_RULES,
+    RULE_INDEX,
+    SOLANA_REGISTRY,
+    RuleContext,
+    RuleIndex,
+    RuleOutcome,
+    TransactionView,
+    Verdict,
+    decode_calldata,
+    load_rules,
+    run_rules,
+)
+
+# The rules being replayed: the built-in ones, plus declarative rules once _init_worker loads them.
+_rule_index = RULE_INDEX
+
+
+@dataclass
+class ReplayStats:
+    transactions: int = 0
+    decisions: Counter = field(default_factory=Counter)                          # approved / aborted
+    verdicts: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))  # rule -> verdict -> count
+    rule_durations: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    transaction_durations: List[float] = field(default_factory=list)
+
+    def merge(self, other: "ReplayStats") -> None:
+        self.transactions += other.transactions
+        self.decisions.update(other.decisions)
+        for rule, counts in other.verdicts.items():
+            self.verdicts[rule].update(counts)
+        for rule, durations in other.rule_durations.items():
+            self.rule_durations[rule].extend(durations)
+        self.transaction_durations.extend(other.transaction_durations)
+
+
+def load_transactions(path: Path) -> List[Dict]:
+    """Transactions from a directory of *.json files, a single .json file, or a JSONL file."""
+    if path.is_dir():
+        return [_unwrap(json.loads(file.read_text())) for file in sorted(path.glob("*.json"))]
+    if path.suffix == ".json":
+        return [_unwrap(json.loads(path.read_text()))]
+    with open(path) as file:
+        return [_unwrap(json.loads(line)) for line in file if line.strip()]
+
+
+def _unwrap(document: Dict) -> Dict:
+    # Also accept captured webhook bodies, whose transaction sits under "event".
+    return document["event"] if isinstance(document.get("event"), dict) and "id" in document["event"] else document
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    # Rounding first keeps float noise (0.99 * 100 == 99.00000000000001) from bumping the rank.
+    rank = max(1, min(len(sorted_values), math.ceil(round(fraction * len(sorted_values), 9))))
+    return sorted_values[rank - 1]
+
+
+def _replay_config(origin_vault: str) -> SimpleNamespace:
+    return SimpleNamespace(origin_vault=origin_vault, ZERO_ADDRESS=Config.ZERO_ADDRESS)
+
+
+def evaluate(transactions: Sequence[Dict], origin_vault: str) -> ReplayStats:
+    """Run every transaction through decode_calldata + run_rules and collect per-rule stats."""
+    config = _replay_config(origin_vault)
+    rule_names = [rule.__name__ for rule in _rule_index.rules]
+    stats = ReplayStats()
+    for transaction in transactions:
+        trace: List[RuleOutcome] = []
+        start = time.perf_counter()
+        view = TransactionView(transaction, origin_vault)
+        decoded_call, decode_error = decode_calldata(view.calldata or b"")
+        context = RuleContext(transaction, config, decoded_call, decode_error, view)
+        result = run_rules(_rule_index, context, trace)
+        stats.transaction_durations.append(time.perf_counter() - start)
+
+        stats.transactions += 1
+        stats.decisions["aborted" if result.verdict is Verdict.ABORT else "approved"] += 1
+        for outcome in trace:
+            if not outcome.applicable:
+                stats.verdicts[outcome.rule]["not_applicable"] += 1
+                continue
+            stats.verdicts[outcome.rule][outcome.result.verdict.value] += 1
+            stats.rule_durations[outcome.rule].append(outcome.duration)
+        # Applicable rules after the first ABORT are the only ones missing from the trace.
+        if len(trace) < len(rule_names):
+            traced = {outcome.rule for outcome in trace}
+            for name in rule_names:
+                if name not in traced:
+                    stats.verdicts[name]["not_run"] += 1
+    return stats
+
+
+def _init_worker(
+    abi_dir: Optional[str], rules_path: Optional[str] = None, origin_vault: str = "", idl_dir: Optional[str] = None,
+) -> None:
+    global _rule_index
+    logging.getLogger("cosigner.rules").setLevel(logging.WARNING)
+    if abi_dir:
+        ABI_REGISTRY.load_abi_directory(abi_dir)
+    if idl_dir:
+        SOLANA_REGISTRY.load_idl_directory(idl_dir)
+    _rule_index = (
+        RuleIndex(ALL_RULES + load_rules(rules_path, _replay_config(origin_vault))) if rules_path else RULE_INDEX
+    )
+
+
+def _chunks(items: Sequence[Dict], count: int) -> Iterator[Sequence[Dict]]:
+    size = max(1, -(-len(items) // count))
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def replay(
+    transactions: Sequence[Dict],
+    origin_vault: str,
+    workers: int = 1,
+    abi_dir: Optional[str] = None,
+    rules_path: Optional[str] = None,
+    idl_dir: Optional[str] = None,
+) -> ReplayStats:
+    """Evaluate in-process (workers=1) or split across a process pool."""
+    if workers <= 1:
+        _init_worker(abi_dir, rules_path, origin_vault, idl_dir)
+        return evaluate(transactions, origin_vault)
+    stats = ReplayStats()
+    # Several chunks per worker so a slow chunk doesn't leave the others idle.
+    initargs = (abi_dir, rules_path, origin_vault, idl_dir)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        futures = [
+            pool.submit(evaluate, chunk, origin_vault) for chunk in _chunks(transactions, workers * 4)
+        ]
+        for future in futures:
+            stats.merge(future.result())
+    return stats
+
+
+def report(stats: ReplayStats, elapsed: float) -> Dict:
+    rules = {}
+    for rule, counts in stats.verdicts.items():
+        durations = sorted(stats.rule_durations.get(rule, ()))
+        rules[rule] = {
+            "verdicts": dict(counts),
+            # None when the rule never ran
+            "p50_us": percentile(durations, 0.50) * 1e6 if durations else None,
+            "p99_us": percentile(durations, 0.99) * 1e6 if durations else None,
+        }
+    durations = sorted(stats.transaction_durations)
+    return {
+        "transactions": stats.transactions,
+        "elapsed_seconds": elapsed,
+        "transactions_per_second": stats.transactions / elapsed if elapsed else 0.0,
+        "decisions": dict(stats.decisions),
+        "transaction_p50_us": percentile(durations, 0.50) * 1e6,
+        "transaction_p99_us": percentile(durations, 0.99) * 1e6,
+        "rules": rules,
+    }
+
+
+def print_report(summary: Dict) -> None:
+    print(
+        f"{summary['transactions']:,} transactions in {summary['elapsed_seconds']:.2f}s "
+        f"({summary['transactions_per_second']:,.0f} tx/s), "
+        f"p50 {summary['transaction_p50_us']:,.0f} µs, p99 {summary['transaction_p99_us']:,.0f} µs per transaction"
+    )
+    print("decisions: " + ", ".join(f"{name}={count:,}" for name, count in sorted(summary["decisions"].items())))
+    print()
+    verdict_names = ["passed", "skipped", "abort", "not_run", "not_applicable"]
+    width = max([len(rule) for rule in summary["rules"]] + [4])
+    print(f"{'rule':<{width}}  " + "".join(f"{name:>15}" for name in verdict_names) + f"{'p50 µs':>10}{'p99 µs':>10}")
+    for rule, entry in summary["rules"].items():
+        counts = "".join(f"{entry['verdicts'].get(name, 0):>15,}" for name in verdict_names)
+        latency = "".join(
+            f"{value:>10,.1f}" if value is not None else f"{'-':>10}" for value in (entry["p50_us"], entry["p99_us"])
+        )
+        print(f"{rule:<{width}}  {counts}{latency}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path, help="directory of *.json transactions, a .json file, or a JSONL file")
+    parser.add_argument(
+        "--origin-vault", default=os.environ.get("ORIGIN_VAULT"),
+        help="vault address the rules validate against (defaults to $ORIGIN_VAULT)",
+    )
+    parser.add_argument("--abi-dir", default=os.environ.get("ABI_DIR"), help="extra ABI JSON files (defaults to $ABI_DIR)")
+    parser.add_argument(
+        "--idl-dir", default=os.environ.get("IDL_DIR"), help="extra Anchor IDL JSON files (defaults to $IDL_DIR)",
+    )
+    parser.add_argument(
+        "--rules", default=os.environ.get("RULES_PATH"),
+        help="declarative rule file or directory to add (defaults to $RULES_PATH)",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="processes to evaluate in (default: 1, in-process)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the input this many times, for stable timings")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON (e.g. to diff in CI)")
+    args = parser.parse_args()
+    if not args.origin_vault:
+        parser.error("--origin-vault (or ORIGIN_VAULT) is required")
+
+    transactions = load_transactions(args.path) * args.repeat
+    if not transactions:
+        parser.error(f"no transactions found in {args.path}")
+
+    start = time.perf_counter()
+    stats = replay(
+        transactions, args.origin_vault, workers=args.workers, abi_dir=args.abi_dir, rules_path=args.rules,
+        idl_dir=args.idl_dir,
+    )
+    summary = report(stats, time.perf_counter() - start)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Micro-benchmark: webhook signature verifications per second for each backend.
+
+Signs a realistic webhook body (the transaction fixture) with a throwaway P-256
+key and times SignatureVerifier.is_valid_signature with every available backend.
+
+    uv run python -m benchmarks.signature_verification [--iterations 2000]
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import ecdsa
+from ecdsa.util import sigencode_der
+
+from fordefi.signature import BACKENDS, SignatureVerifier
+
+FIXTURE = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "transaction_contract_call.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="verifications per backend")
+    args = parser.parse_args()
+
+    signing_key = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
+    public_key_pem = signing_key.get_verifying_key().to_pem().decode()
+    body = json.dumps({"event": json.loads(FIXTURE.read_text())}).encode()
+    signature = base64.b64encode(
+        signing_key.sign(body, hashfunc=hashlib.sha256, sigencode=sigencode_der)
+    ).decode()
+
+    print(f"body: {len(body)} bytes, {args.iterations} verifications per backend")
+    for backend in BACKENDS:
+        try:
+            verifier = SignatureVerifier(public_key_pem, backend=backend)
+        except RuntimeError as error:
+            print(f"{backend:>14}: unavailable ({error})")
+            continue
+        assert verifier.is_valid_signature(signature, body)
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            verifier.is_valid_signature(signature, body)
+        elapsed = time.perf_counter() - start
+        print(
+            f"{backend:>14}: {args.iterations / elapsed:>10,.0f} verifications/s "
+            f"({elapsed / args.iterations * 1e6:,.0f} µs each)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,24 +10,75 @@ Response semantics: any 2xx tells Fordefi the event is handled (decision made or
 nothing to do); any other status makes Fordefi retry the webhook with backoff.
 """
 
+import hmac
 import json
 import logging
 import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
 from http import HTTPStatus
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import TimedRotatingFileHandler, WatchedFileHandler
 from pathlib import Path
+from typing import Optional
 from fastapi import FastAPI, Request, HTTPException
-from fordefi import Config, FordefiAPI, FordefiAPIError, SignatureVerifier
-from rules import ALL_RULES, RuleContext, Verdict, decode_calldata, run_rules
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fordefi import (
+    AsyncFordefiAPI,
+    CircuitBreaker,
+    Config,
+    FordefiAPIError,
+    FordefiLookups,
+    RetryPolicy,
+    SignatureVerifier,
+)
+from rules import (
+    ABI_REGISTRY,
+    ALL_RULES,
+    SOLANA_REGISTRY,
+    RuleContext,
+    RuleOutcome,
+    RuleReloader,
+    TransactionView,
+    Verdict,
+    decode_calldata,
+    run_rules_async,
+)
+from service import (
+    DecisionJournal,
+    DecisionWorkerPool,
+    InMemoryDecisionStore,
+    JsonLinesFormatter,
+    MetricsRegistry,
+    QueueFullError,
+    QueueLogHandler,
+    RedisDecisionStore,
+    SqliteDecisionStore,
+    TransactionSweeper,
+    WebhookDeduplicator,
+)
+from service.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 
-def configure_logging() -> None:
+def configure_logging() -> Optional[QueueLogHandler]:
     # Named loggers ("cosigner", "cosigner.api", "cosigner.rules") sit under the
     # "cosigner" hierarchy and propagate to the root handler set up here, so the
     # whole service shares one timestamped format. This is separate from uvicorn's
     # own loggers, so access logs are unaffected. Set LOG_LEVEL=DEBUG for more detail.
     level = os.environ.get("LOG_LEVEL", "INFO").upper()
-    formatter = logging.Formatter("%(asctime)s %(levelname)-7s %(name)s  %(message)s")
+    log_format = os.environ.get("LOG_FORMAT", "text").lower()
+    log_mode = os.environ.get("LOG_MODE", "sync").lower()
+    log_rotation = os.environ.get("LOG_ROTATION", "daily").lower()
+    if log_format not in ("text", "json"):
+        raise ValueError(f"LOG_FORMAT must be 'text' or 'json', got {log_format!r}")
+    if log_mode not in ("sync", "queue"):
+        raise ValueError(f"LOG_MODE must be 'sync' or 'queue', got {log_mode!r}")
+    if log_rotation not in ("daily", "external"):
+        raise ValueError(f"LOG_ROTATION must be 'daily' or 'external', got {log_rotation!r}")
+    if log_format == "json":
+        formatter = JsonLinesFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s %(levelname)-7s %(name)s  %(message)s")
 
     console = logging.StreamHandler()
     console.setFormatter(formatter)
@@ -38,29 +89,205 @@ def configure_logging() -> None:
     # ...); LOG_RETENTION_DAYS old files are pruned. LOG_DIR defaults to a
     # project-relative ./live-logs (writing to filesystem-root /live-logs would need
     # elevated permissions); point it at an absolute path in production.
+    # Each process rotates its own handler, so with several workers the built-in
+    # rotation races (one worker renames the file under the others and lines are
+    # lost). LOG_ROTATION=external leaves rotation to logrotate: every worker
+    # appends to the same file and reopens it once it has been moved away.
     log_dir = Path(os.environ.get("LOG_DIR", "./live-logs"))
     log_dir.mkdir(parents=True, exist_ok=True)
-    file_handler = TimedRotatingFileHandler(
-        log_dir / "cosigner.log",
-        when="midnight",
-        utc=True,
-        backupCount=int(os.environ.get("LOG_RETENTION_DAYS", "90")),
-    )
+    if log_rotation == "external":
+        file_handler = WatchedFileHandler(log_dir / "cosigner.log")
+    else:
+        file_handler = TimedRotatingFileHandler(
+            log_dir / "cosigner.log",
+            when="midnight",
+            utc=True,
+            backupCount=int(os.environ.get("LOG_RETENTION_DAYS", "90")),
+        )
     file_handler.setFormatter(formatter)
     handlers.append(file_handler)
 
+    # In queue mode the request path only enqueues records; a background thread does
+    # the console/file writes, and shutdown flushes whatever is still buffered.
+    queue_handler = None
+    if log_mode == "queue":
+        queue_handler = QueueLogHandler(handlers, max_records=int(os.environ.get("LOG_QUEUE_SIZE", "10000")))
+        queue_handler.start()
+        handlers = [queue_handler]
+
     logging.basicConfig(level=level, handlers=handlers)
-    logging.getLogger("cosigner").info("Writing audit logs to %s", log_dir.resolve())
+    logging.getLogger("cosigner").info(
+        "Writing audit logs to %s (mode=%s, rotation=%s)", log_dir.resolve(), log_mode, log_rotation
+    )
+    return queue_handler
 
 
-configure_logging()
+log_queue_handler = configure_logging()
 logger = logging.getLogger("cosigner")
 
 config = Config()
-fordefi_api = FordefiAPI(Config.FORDEFI_API_BASE_URL, config.api_user_token)
-signature_verifier = SignatureVerifier(config.fordefi_public_key)
+if config.abi_dir:
+    ABI_REGISTRY.load_abi_directory(config.abi_dir)
+if config.idl_dir:
+    SOLANA_REGISTRY.load_idl_directory(config.idl_dir)
+# Declarative allowlist rules (RULES_PATH) run after the built-in ones; an invalid file fails startup.
+# Edits to the files are picked up without a restart (see lifespan).
+rule_reloader = RuleReloader(ALL_RULES, config, config.rules_path)
+if config.api_base_url != Config.FORDEFI_API_BASE_URL:
+    logger.warning("Using a non-production Fordefi API at %s", config.api_base_url)
+fordefi_api = AsyncFordefiAPI(
+    config.api_base_url,
+    config.api_user_token,
+    pool_size=config.api_pool_size,
+    http2=config.api_http2,
+    retry=RetryPolicy(
+        max_attempts=config.api_max_attempts,
+        base_delay=config.api_retry_base_delay,
+        max_delay=config.api_retry_max_delay,
+    ),
+    breaker=CircuitBreaker(
+        failure_threshold=config.circuit_failure_threshold,
+        reset_timeout=config.circuit_reset_seconds,
+    ),
+)
+# Vault and address-book lookups for I/O-bound rules, cached across transactions.
+lookups = FordefiLookups(
+    fordefi_api,
+    ttl=config.lookup_ttl_seconds,
+    negative_ttl=config.lookup_negative_ttl_seconds,
+    max_entries=config.lookup_max_entries,
+)
+signature_verifier = SignatureVerifier(config.fordefi_public_keys, backend=config.signature_backend)
+# With several worker processes (uvicorn --workers / gunicorn), webhook retries can
+# land on different workers; a shared store lets them share decisions and leases.
+if config.decision_store == "sqlite":
+    decision_store = SqliteDecisionStore(config.decision_store_path)
+elif config.decision_store == "redis":
+    decision_store = RedisDecisionStore(config.redis_url)
+else:
+    decision_store = InMemoryDecisionStore(max_entries=config.dedupe_max_entries)
+deduplicator = WebhookDeduplicator(
+    decision_store,
+    ttl=config.dedupe_ttl_seconds,
+    lease=config.dedupe_lease_seconds,
+)
+# Structured record of every decision, queryable at GET /decisions. Off unless DECISION_JOURNAL_DIR is set.
+decision_journal = (
+    DecisionJournal(config.journal_dir, rollup=config.journal_rollup, flush_interval=config.journal_flush_seconds)
+    if config.journal_dir
+    else None
+)
+
+
+async def decide_queued_transaction(transaction_id: str) -> None:
+    try:
+        await deduplicator.run(transaction_id, lambda: decide_transaction(transaction_id))
+    except HTTPException as error:
+        # Already logged by decide_transaction. The webhook was acknowledged, so
+        # Fordefi won't retry it; the transaction stays waiting_for_approval.
+        logger.error("Queued decision for transaction %s failed: %s", transaction_id, error.detail)
+
+
+# In "queue" mode the webhook is acknowledged as soon as it is verified and
+# enqueued; a pool of workers makes the decisions. "inline" (the default) holds
+# the response open until the decision is submitted.
+decision_pool = (
+    DecisionWorkerPool(
+        decide_queued_transaction,
+        workers=config.decision_workers,
+        max_queue_depth=config.decision_queue_depth,
+    )
+    if config.decision_mode == "queue"
+    else None
+)
+
+
+async def decide_swept_transaction(transaction: dict) -> dict:
+    # Shares the dedupe lease with webhooks, so a transaction both swept and
+    # announced by a webhook (on any worker) is decided once.
+    transaction_id = transaction["id"]
+    return await deduplicator.run(transaction_id, lambda: decide_transaction(transaction_id, transaction))
+
+
+# Periodically decides everything still waiting for approval, reconciling webhooks
+# that were missed while the service was down. Off unless SWEEP_INTERVAL_SECONDS > 0.
+sweeper = TransactionSweeper(
+    fordefi_api,
+    decide_swept_transaction,
+    concurrency=config.sweep_concurrency,
+    page_size=config.sweep_page_size,
+)
+
+
+async def preflight() -> None:
+    """Per-worker warm-up before accepting webhooks, so the first ones don't pay setup costs."""
+    started = time.perf_counter()
+    signature_verifier.warm_up()
+    decoders = ABI_REGISTRY.warm_up()
+    if hasattr(decision_store, "ping"):
+        await decision_store.ping()  # fail startup rather than every webhook if the store is unreachable
+    logger.info(
+        "Preflight done in %.0f ms (pid %d): %d signature key(s), %d ABI decoders, %s decision store",
+        (time.perf_counter() - started) * 1000, os.getpid(), len(config.fordefi_public_keys), decoders,
+        config.decision_store,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await preflight()
+    if decision_journal is not None:
+        decision_journal.start()
+    if decision_pool is not None:
+        decision_pool.start()
+    if config.sweep_interval_seconds > 0:
+        sweeper.start(config.sweep_interval_seconds)
+    if config.rules_path and config.rules_reload_seconds > 0:
+        rule_reloader.start(config.rules_reload_seconds)
+    yield
+    await rule_reloader.stop()
+    await sweeper.stop()
+    if decision_pool is not None:
+        await decision_pool.drain(config.drain_timeout_seconds)
+    if decision_journal is not None:
+        await decision_journal.stop()  # after the drain, so the drained decisions are journaled
+    await fordefi_api.aclose()
+    if hasattr(decision_store, "close"):
+        await decision_store.close()
+    if log_queue_handler is not None:
+        # Last step, so the drain's own log lines are written out too.
+        log_queue_handler.close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Prometheus metrics, served at GET /metrics. Stage histograms cover each step of
+# a decision so time-to-decision SLOs can be broken down and slow rules spotted.
+metrics = MetricsRegistry()
+webhooks_received = metrics.counter("cosigner_webhooks_received", "Webhook deliveries received")
+webhooks_rejected = metrics.counter(
+    "cosigner_webhooks_rejected", "Webhook deliveries rejected, by reason", ["reason"],
+)
+decisions = metrics.counter(
+    "cosigner_decisions",
+    "Transaction evaluations by outcome (approved, aborted, already_decided, fetch_failed, submit_failed)",
+    ["decision"],
+)
+rule_verdicts = metrics.counter("cosigner_rule_verdicts", "Verdicts returned by each rule", ["rule", "verdict"])
+stage_duration = metrics.histogram(
+    "cosigner_stage_duration_seconds",
+    "Duration of each decision stage (signature_verification, fetch_transaction, decode_calldata, "
+    "run_rules, approve, abort)",
+    ["stage"],
+)
+rule_duration = metrics.histogram("cosigner_rule_duration_seconds", "Duration of each rule", ["rule"])
+time_to_decision = metrics.histogram(
+    "cosigner_time_to_decision_seconds", "From fetching the transaction to the approve/abort call completing",
+)
+queue_depth = metrics.gauge("cosigner_decision_queue_depth", "Transactions waiting for a decision worker")
+circuit_open = metrics.gauge(
+    "cosigner_fordefi_api_circuit_open", "1 while the Fordefi API circuit breaker is open or half-open",
+)
 
 
 def get_source_ip(request: Request) -> str:
@@ -74,23 +301,82 @@ def get_source_ip(request: Request) -> str:
 
 @app.get("/health")
 async def health_check():
-    return {"status": "online"}
+    # Stays 200 while the Fordefi API is down: restarting the CoSigner wouldn't help.
+    circuit = fordefi_api.breaker.state
+    return {
+        "status": "online" if circuit == "closed" else "degraded",
+        "fordefi_api": {"circuit": circuit, "retry_in_seconds": round(fordefi_api.breaker.retry_in(), 1)},
+        "rules": {"version": rule_reloader.current.version, "count": len(rule_reloader.current.index.rules)},
+    }
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    if decision_pool is not None:
+        queue_depth.set(decision_pool.depth)
+    circuit_open.set(0 if fordefi_api.breaker.state == "closed" else 1)
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _query_time(name: str, value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=f"{name} must be an ISO 8601 date or time")
+
+
+@app.get("/decisions")
+async def query_decisions(
+    request: Request,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    transaction_id: Optional[str] = None,
+    decision: Optional[str] = None,
+    rules_version: Optional[str] = None,
+    rule: Optional[str] = None,
+    verdict: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    # Decisions name vaults and counterparties, so unlike /health and /metrics this needs a token.
+    if decision_journal is None or not config.journal_query_token:
+        raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="Decision journal queries are not enabled")
+    expected = f"Bearer {config.journal_query_token}"
+    if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected.encode()):
+        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="Invalid or missing token")
+    lines = decision_journal.query_lines(
+        since=_query_time("since", since),
+        until=_query_time("until", until),
+        transaction_id=transaction_id,
+        decision=decision,
+        rules_version=rules_version,
+        rule=rule,
+        verdict=verdict,
+        limit=limit,
+    )
+    # A plain iterator: Starlette reads it in a thread pool, so scanning months of files never blocks webhooks.
+    return StreamingResponse(lines, media_type="application/x-ndjson")
 
 
 @app.post("/")
 async def handle_webhook(request: Request):
     raw_body = await request.body()
+    webhooks_received.inc()
 
     source_ip = get_source_ip(request)
     if source_ip not in Config.ALLOWED_SOURCE_IPS:
         logger.warning("Rejected webhook from unauthorized IP: %s", source_ip)
+        webhooks_rejected.inc(reason="forbidden_ip")
         raise HTTPException(status_code=HTTPStatus.FORBIDDEN, detail="Forbidden: IP not allowed")
 
     signature = request.headers.get("X-Signature")
     if not signature:
+        webhooks_rejected.inc(reason="missing_signature")
         raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="Missing signature")
-    if not signature_verifier.is_valid_signature(signature, raw_body):
+    with stage_duration.time(stage="signature_verification"):
+        valid_signature = signature_verifier.is_valid_signature(signature, raw_body)
+    if not valid_signature:
         logger.warning("Rejected webhook with invalid signature from %s", source_ip)
+        webhooks_rejected.inc(reason="invalid_signature")
         raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="Invalid signature")
 
     try:
@@ -101,6 +387,7 @@ async def handle_webhook(request: Request):
         )
     except json.JSONDecodeError as error:
         logger.warning("Invalid webhook JSON: %s", error)
+        webhooks_rejected.inc(reason="invalid_json")
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail="Invalid JSON")
 
     event = webhook_payload.get("event", {})
@@ -113,38 +400,128 @@ async def handle_webhook(request: Request):
         logger.info("Skipping transaction %s in state: %s", transaction_id, event.get("state"))
         return {"message": f"Skipping transaction in state: {event.get('state')}"}
 
+    if decision_pool is not None:
+        try:
+            decision_pool.submit(transaction_id)
+        except QueueFullError as error:
+            logger.warning("Rejected webhook for transaction %s: %s", transaction_id, error)
+            webhooks_rejected.inc(reason="queue_full")
+            raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail=str(error))
+        logger.info("Queued transaction %s (queue depth %d)", transaction_id, decision_pool.depth)
+        return JSONResponse(
+            status_code=HTTPStatus.ACCEPTED,
+            content={"message": "Transaction queued for validation"},
+        )
+
+    # Retries of this webhook (and concurrent duplicates) share one evaluation.
+    return await deduplicator.run(transaction_id, lambda: decide_transaction(transaction_id))
+
+
+async def decide_transaction(transaction_id: str, transaction: Optional[dict] = None) -> dict:
+    """Fetch, validate and approve/abort a transaction; returns the webhook response body.
+
+    The sweep passes the transaction it just listed from the Fordefi API, which
+    saves the fetch.
+    """
     # The webhook body only triggers the flow — validate against the transaction as
     # the Fordefi API reports it right now, not the (possibly stale) event snapshot.
-    try:
-        transaction = fordefi_api.fetch_transaction(transaction_id)
-    except FordefiAPIError as error:
-        logger.error("Failed to fetch transaction %s: %s", transaction_id, error)
-        raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail="Failed to fetch transaction")
+    started = time.perf_counter()
+    if transaction is None:
+        try:
+            with stage_duration.time(stage="fetch_transaction"):
+                transaction = await fordefi_api.fetch_transaction(transaction_id)
+        except FordefiAPIError as error:
+            logger.error("Failed to fetch transaction %s: %s", transaction_id, error)
+            decisions.inc(decision="fetch_failed")
+            raise HTTPException(status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail="Failed to fetch transaction")
 
     current_state = transaction.get("state")
     if current_state != "waiting_for_approval":
         logger.info("Transaction %s already decided, current state: %s", transaction_id, current_state)
+        decisions.inc(decision="already_decided")
         return {"message": f"Transaction already decided, current state: {current_state}"}
 
-    logger.info("Validating transaction %s", transaction_id)
-    decoded_call, decode_error = decode_calldata(transaction.get("hex_data") or "")
+    # One snapshot for the whole evaluation, even if the rule files are reloaded meanwhile.
+    rules = rule_reloader.current
+    logger.info("Validating transaction %s with rules version %s", transaction_id, rules.version)
+    # Parse everything rules share exactly once for this evaluation.
+    view = TransactionView(transaction, rules.config.origin_vault)
+    with stage_duration.time(stage="decode_calldata"):
+        decoded_call, decode_error = decode_calldata(view.calldata or b"")
     context = RuleContext(
         transaction=transaction,
-        config=config,
+        config=rules.config,
         decoded_call=decoded_call,
         decode_error=decode_error,
+        view=view,
+        lookups=lookups,
     )
-    result = run_rules(ALL_RULES, context)
+    trace: list[RuleOutcome] = []
+    evaluation_started = time.perf_counter()
+    with stage_duration.time(stage="run_rules"):
+        result = await run_rules_async(rules.index, context, trace, deadline=config.rules_deadline_seconds)
+    evaluation_seconds = time.perf_counter() - evaluation_started
+    for outcome in trace:
+        rule_verdicts.inc(rule=outcome.rule, verdict=outcome.result.verdict.value)
+        if outcome.applicable:
+            rule_duration.observe(outcome.duration, rule=outcome.rule)
 
     try:
         if result.verdict is Verdict.ABORT:
-            fordefi_api.abort_transaction(transaction_id, result.reason)
-            logger.info("Decision tx=%s decision=aborted reason=%s", transaction_id, result.reason)
+            with stage_duration.time(stage="abort"):
+                await fordefi_api.abort_transaction(transaction_id, result.reason)
+            logger.info(
+                "Decision tx=%s decision=aborted reason=%s rules=%s", transaction_id, result.reason, rules.version,
+            )
+            journal_decision(view, "aborted", result.reason, rules.version, trace, evaluation_seconds)
+            decisions.inc(decision="aborted")
+            time_to_decision.observe(time.perf_counter() - started)
             return {"decision": "aborted", "reason": result.reason}
-        fordefi_api.approve_transaction(transaction_id)
-        logger.info("Decision tx=%s decision=approved reason=%s", transaction_id, result.reason)
+        with stage_duration.time(stage="approve"):
+            await fordefi_api.approve_transaction(transaction_id)
+        logger.info(
+            "Decision tx=%s decision=approved reason=%s rules=%s", transaction_id, result.reason, rules.version,
+        )
+        journal_decision(view, "approved", result.reason, rules.version, trace, evaluation_seconds)
+        decisions.inc(decision="approved")
+        time_to_decision.observe(time.perf_counter() - started)
         return {"decision": "approved"}
     except FordefiAPIError as error:
         # Let Fordefi retry the webhook; the fresh-state check above makes retries safe.
         logger.error("Failed to submit decision for transaction %s: %s", transaction_id, error)
+        journal_decision(view, "submit_failed", f"{result.reason} ({error})", rules.version, trace, evaluation_seconds)
+        decisions.inc(decision="submit_failed")
         raise HTTPException(status_code=HTTPStatus.INTERNAL_SERVER_ERROR, detail=str(error))
+
+
+def journal_decision(
+    view: TransactionView,
+    decision: str,
+    reason: str,
+    rules_version: str,
+    trace: list[RuleOutcome],
+    evaluation_seconds: float,
+) -> None:
+    if decision_journal is None:
+        return
+    transaction = view.transaction
+    decision_journal.record({
+        "transaction_id": transaction.get("id"),
+        "decision": decision,
+        "reason": reason,
+        "rules_version": rules_version,
+        "transaction_type": transaction.get("type"),
+        "chain": (transaction.get("chain") or {}).get("unique_id"),
+        "vault": view.vault_address or None,
+        "evaluation_ms": round(evaluation_seconds * 1000, 3),
+        "rules": [
+            {
+                "rule": outcome.rule,
+                "verdict": outcome.result.verdict.value,
+                "reason": outcome.result.reason,
+                "duration_ms": round(outcome.duration * 1000, 3),
+            }
+            for outcome in trace
+            if outcome.applicable  # only the rules that ran; the rest are counted in cosigner_rule_verdicts
+        ],
+    })
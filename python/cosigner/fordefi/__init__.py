@@ -1,3 +1,5 @@
 from .config import Config
-from .api import FordefiAPI, FordefiAPIError
+from .api import AsyncFordefiAPI, CircuitOpenError, FordefiAPI, FordefiAPIError
+from .lookups import FordefiLookups, LookupCache
+from .resilience import CircuitBreaker, RetryPolicy
 from .signature import SignatureVerifier
@@ -1,8 +1,14 @@
+import asyncio
 import logging
+import httpx
 import requests
-from typing import Dict
+from typing import Dict, Optional, Sequence
+from urllib.parse import urlencode
+
+from .resilience import CircuitBreaker, RetryPolicy
 
 REQUEST_TIMEOUT = (5, 15)  # (connect, read) seconds
+DEFAULT_POOL_SIZE = 20
 
 logger = logging.getLogger("cosigner.api")
 
@@ -11,6 +17,59 @@ class FordefiAPIError(Exception):
     pass
 
 
+class CircuitOpenError(FordefiAPIError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+# Responses that say the API is struggling rather than that the request is wrong.
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def _extract_error_details(error: Exception) -> str:
+    # Works for both requests and httpx errors: each exposes the HTTP response (if
+    # one was received) as `error.response`.
+    response = getattr(error, "response", None)
+    if response is None:
+        return ""
+
+    details = [f"Status: {response.status_code}"]
+
+    request_id = response.headers.get("x-request-id")
+    if request_id:
+        details.append(f"Request ID: {request_id}")
+
+    if response.text:
+        details.append(f"Response: {response.text}")
+
+    return ", ".join(details)
+
+
+def _is_bad_request_error(error: Exception) -> bool:
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == 400
+
+
+def _is_retryable(error: httpx.HTTPError) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TransportError)  # connect/read timeouts, resets, ...
+
+
+def _describe(error: httpx.HTTPError) -> str:
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"status {error.response.status_code}"
+    return f"{type(error).__name__}: {error}"
+
+
+def _retry_after(error: httpx.HTTPError) -> Optional[float]:
+    if not isinstance(error, httpx.HTTPStatusError):
+        return None
+    try:
+        return float(error.response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None  # absent, or an HTTP date — fall back to our own backoff
+
+
 class FordefiAPI:
     def __init__(self, base_url: str, access_token: str):
         self.base_url = base_url
@@ -19,22 +78,6 @@ class FordefiAPI:
     def _authorization_headers(self) -> Dict[str, str]:
         return {"Authorization": f"Bearer {self.access_token}"}
 
-    def _extract_error_details(self, error: requests.exceptions.RequestException) -> str:
-        response = getattr(error, "response", None)
-        if response is None:
-            return ""
-
-        details = [f"Status: {response.status_code}"]
-
-        request_id = response.headers.get("x-request-id")
-        if request_id:
-            details.append(f"Request ID: {request_id}")
-
-        if response.text:
-            details.append(f"Response: {response.text}")
-
-        return ", ".join(details)
-
     def fetch_transaction(self, transaction_id: str) -> Dict:
         url = f"{self.base_url}/transactions/{transaction_id}"
 
@@ -44,7 +87,7 @@ class FordefiAPI:
             return response.json()
         except requests.exceptions.RequestException as error:
             raise FordefiAPIError(
-                f"Failed to fetch transaction {transaction_id}: {error} ({self._extract_error_details(error)})"
+                f"Failed to fetch transaction {transaction_id}: {error} ({_extract_error_details(error)})"
             ) from error
 
     def approve_transaction(self, transaction_id: str) -> None:
@@ -63,10 +106,10 @@ class FordefiAPI:
             response.raise_for_status()
             logger.info("Transaction %s %s succeeded", transaction_id, action)
         except requests.exceptions.RequestException as error:
-            error_details = self._extract_error_details(error)
+            error_details = _extract_error_details(error)
             # 400 means the transaction already left waiting_for_approval — a benign
             # race with another approver or a webhook retry, so treat it as a no-op.
-            if self._is_bad_request_error(error):
+            if _is_bad_request_error(error):
                 logger.info(
                     "Transaction %s %s skipped, state already changed (%s)",
                     transaction_id, action, error_details,
@@ -76,6 +119,156 @@ class FordefiAPI:
                 f"Failed to {action} transaction {transaction_id}: {error} ({error_details})"
             ) from error
 
-    def _is_bad_request_error(self, error: requests.exceptions.RequestException) -> bool:
-        response = getattr(error, "response", None)
-        return response is not None and response.status_code == 400
+
+class AsyncFordefiAPI:
+    """Non-blocking FordefiAPI for the webhook handler.
+
+    All calls share one pooled httpx.AsyncClient, so connections (and their TLS
+    sessions) are kept alive and reused across webhooks instead of being opened
+    per call, and concurrent webhooks no longer stall the event loop. HTTP/2 is
+    negotiated when the server supports it. Call aclose() on shutdown.
+
+    Transient failures (connection errors, timeouts, 429/5xx) are retried in
+    process with jittered backoff, so a blip costs milliseconds rather than a
+    Fordefi webhook redelivery. Every call is safe to retry: fetches are reads,
+    and repeating a decision that already went through gets a 400, which is a
+    no-op. A circuit breaker shared by all calls fails fast with
+    CircuitOpenError while the API is down.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        access_token: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        retry: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        connect_timeout, read_timeout = REQUEST_TIMEOUT
+        self.base_url = base_url
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self._client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {access_token}"},
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            http2=http2,
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _request(self, method: str, url: str) -> httpx.Response:
+        """Send with retries; returns a 2xx response or raises httpx.HTTPError / CircuitOpenError."""
+        for attempt in range(self.retry.max_attempts):
+            if not self.breaker.allows_calls():
+                raise CircuitOpenError(
+                    f"Fordefi API circuit is open, not calling {method} {url} "
+                    f"(retrying in {self.breaker.retry_in():.0f}s)"
+                )
+            try:
+                response = await self._client.request(method, url)
+                response.raise_for_status()
+            except httpx.HTTPError as error:
+                if not _is_retryable(error):
+                    self.breaker.record_success()  # the API answered; a 4xx says nothing about its health
+                    raise
+                self.breaker.record_failure()
+                if attempt + 1 >= self.retry.max_attempts or not self.breaker.allows_calls():
+                    raise
+                delay = self.retry.delay(attempt, _retry_after(error))
+                logger.warning(
+                    "%s %s failed (%s), retrying in %.0f ms (attempt %d of %d)",
+                    method, url, _describe(error), delay * 1000, attempt + 2, self.retry.max_attempts,
+                )
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return response
+        raise AssertionError("unreachable: the last attempt returns or raises")
+
+    async def fetch_transaction(self, transaction_id: str) -> Dict:
+        url = f"{self.base_url}/transactions/{transaction_id}"
+
+        try:
+            response = await self._request("GET", url)
+            return response.json()
+        except httpx.HTTPError as error:
+            raise FordefiAPIError(
+                f"Failed to fetch transaction {transaction_id}: {error} ({_extract_error_details(error)})"
+            ) from error
+        except ValueError as error:  # a 2xx whose body isn't JSON, e.g. a proxy's error page
+            raise FordefiAPIError(
+                f"Failed to fetch transaction {transaction_id}: response is not JSON ({error})"
+            ) from error
+
+    async def list_transactions(self, states: Sequence[str] = (), page: int = 1, size: int = 100) -> Dict:
+        """One page of GET /transactions: {"total", "page", "size", "transactions": [...]}."""
+        query = [("page", page), ("size", size)] + [("states", state) for state in states]
+        url = f"{self.base_url}/transactions?{urlencode(query)}"
+
+        try:
+            response = await self._request("GET", url)
+            return response.json()
+        except httpx.HTTPError as error:
+            raise FordefiAPIError(
+                f"Failed to list transactions (page {page}): {error} ({_extract_error_details(error)})"
+            ) from error
+        except ValueError as error:  # a 2xx whose body isn't JSON, e.g. a proxy's error page
+            raise FordefiAPIError(
+                f"Failed to list transactions (page {page}): response is not JSON ({error})"
+            ) from error
+
+    async def list_vaults(self, page: int = 1, size: int = 100) -> Dict:
+        """One page of GET /vaults: {"total", "page", "size", "vaults": [...]}."""
+        return await self._list_page("vaults", page, size)
+
+    async def list_contacts(self, page: int = 1, size: int = 100) -> Dict:
+        """One page of GET /addressbook/contacts: {"total", "page", "size", "contacts": [...]}."""
+        return await self._list_page("addressbook/contacts", page, size)
+
+    async def _list_page(self, path: str, page: int, size: int) -> Dict:
+        url = f"{self.base_url}/{path}?{urlencode({'page': page, 'size': size})}"
+
+        try:
+            response = await self._request("GET", url)
+            return response.json()
+        except httpx.HTTPError as error:
+            raise FordefiAPIError(
+                f"Failed to list {path} (page {page}): {error} ({_extract_error_details(error)})"
+            ) from error
+        except ValueError as error:  # a 2xx whose body isn't JSON, e.g. a proxy's error page
+            raise FordefiAPIError(
+                f"Failed to list {path} (page {page}): response is not JSON ({error})"
+            ) from error
+
+    async def approve_transaction(self, transaction_id: str) -> None:
+        await self._decide_transaction(transaction_id, "approve")
+
+    async def abort_transaction(self, transaction_id: str, reason: str) -> None:
+        # The abort endpoint takes no request body, so the reason is only logged here.
+        logger.info("Aborting transaction %s: %s", transaction_id, reason)
+        await self._decide_transaction(transaction_id, "abort")
+
+    async def _decide_transaction(self, transaction_id: str, action: str) -> None:
+        url = f"{self.base_url}/transactions/{transaction_id}/{action}"
+
+        try:
+            await self._request("POST", url)
+            logger.info("Transaction %s %s succeeded", transaction_id, action)
+        except httpx.HTTPError as error:
+            error_details = _extract_error_details(error)
+            # 400 means the transaction already left waiting_for_approval — a benign
+            # race with another approver or a webhook retry, so treat it as a no-op.
+            if _is_bad_request_error(error):
+                logger.info(
+                    "Transaction %s %s skipped, state already changed (%s)",
+                    transaction_id, action, error_details,
+                )
+                return
+            raise FordefiAPIError(
+                f"Failed to {action} transaction {transaction_id}: {error} ({error_details})"
+            ) from error
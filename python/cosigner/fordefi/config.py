@@ -17,9 +17,57 @@ class Config:
         load_dotenv()
         self.api_user_token = os.environ["FORDEFI_API_USER_TOKEN"]
         self.origin_vault = os.environ["ORIGIN_VAULT"]
+        # Override only to point at a local mock API for load tests (see loadtest/).
+        self.api_base_url = os.environ.get("FORDEFI_API_BASE_URL") or self.FORDEFI_API_BASE_URL
+        self.api_pool_size = int(os.environ.get("FORDEFI_API_POOL_SIZE", "20"))
+        self.api_http2 = os.environ.get("FORDEFI_API_HTTP2", "true").lower() == "true"
+        self.api_max_attempts = int(os.environ.get("FORDEFI_API_MAX_ATTEMPTS", "3"))
+        self.api_retry_base_delay = float(os.environ.get("FORDEFI_API_RETRY_BASE_DELAY", "0.1"))
+        self.api_retry_max_delay = float(os.environ.get("FORDEFI_API_RETRY_MAX_DELAY", "2"))
+        self.circuit_failure_threshold = int(os.environ.get("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5"))
+        self.circuit_reset_seconds = float(os.environ.get("CIRCUIT_BREAKER_RESET_SECONDS", "30"))
+        self.dedupe_ttl_seconds = float(os.environ.get("DEDUPE_TTL_SECONDS", "300"))
+        self.dedupe_max_entries = int(os.environ.get("DEDUPE_MAX_ENTRIES", "10000"))
+        self.dedupe_lease_seconds = float(os.environ.get("DEDUPE_LEASE_SECONDS", "60"))
+        self.decision_store = os.environ.get("DECISION_STORE", "memory").lower()
+        if self.decision_store not in ("memory", "sqlite", "redis"):
+            raise ValueError(f"DECISION_STORE must be 'memory', 'sqlite' or 'redis', got {self.decision_store!r}")
+        self.decision_store_path = os.environ.get("DECISION_STORE_PATH", "./cosigner-state.db")
+        self.redis_url = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+        self.abi_dir = os.environ.get("ABI_DIR")
+        self.idl_dir = os.environ.get("IDL_DIR")
+        self.rules_path = os.environ.get("RULES_PATH")  # declarative rule file or directory
+        self.lookup_ttl_seconds = float(os.environ.get("LOOKUP_TTL_SECONDS", "300"))
+        self.lookup_negative_ttl_seconds = float(os.environ.get("LOOKUP_NEGATIVE_TTL_SECONDS", "30"))
+        self.lookup_max_entries = int(os.environ.get("LOOKUP_MAX_ENTRIES", "10000"))
+        self.rules_deadline_seconds = float(os.environ.get("RULES_DEADLINE_SECONDS", "5"))
+        self.rules_reload_seconds = float(os.environ.get("RULES_RELOAD_SECONDS", "5"))  # 0 disables reloads
+        self.decision_mode = os.environ.get("DECISION_MODE", "inline").lower()
+        if self.decision_mode not in ("inline", "queue"):
+            raise ValueError(f"DECISION_MODE must be 'inline' or 'queue', got {self.decision_mode!r}")
+        self.decision_workers = int(os.environ.get("DECISION_WORKERS", "8"))
+        self.decision_queue_depth = int(os.environ.get("DECISION_QUEUE_DEPTH", "1000"))
+        self.drain_timeout_seconds = float(os.environ.get("DRAIN_TIMEOUT_SECONDS", "30"))
+        self.sweep_interval_seconds = float(os.environ.get("SWEEP_INTERVAL_SECONDS", "0"))  # 0 disables sweeps
+        self.sweep_concurrency = int(os.environ.get("SWEEP_CONCURRENCY", "16"))
+        self.sweep_page_size = int(os.environ.get("SWEEP_PAGE_SIZE", "100"))
+        self.journal_dir = os.environ.get("DECISION_JOURNAL_DIR")  # unset disables the journal
+        self.journal_rollup = os.environ.get("DECISION_JOURNAL_ROLLUP", "csv").lower()
+        if self.journal_rollup not in ("csv", "parquet", "none"):
+            raise ValueError(
+                f"DECISION_JOURNAL_ROLLUP must be 'csv', 'parquet' or 'none', got {self.journal_rollup!r}"
+            )
+        self.journal_flush_seconds = float(os.environ.get("DECISION_JOURNAL_FLUSH_SECONDS", "1"))
+        self.journal_query_token = os.environ.get("DECISION_QUERY_TOKEN")
         self._load_public_key()
 
     def _load_public_key(self):
-        public_key_path = os.environ.get("FORDEFI_PUBLIC_KEY_PATH", "./public_key.pem")
-        with open(public_key_path, "r") as key_file:
-            self.fordefi_public_key = key_file.read()
+        # A comma-separated list of paths supports key rotation: webhooks signed by
+        # any of the keys are accepted.
+        public_key_paths = os.environ.get("FORDEFI_PUBLIC_KEY_PATH", "./public_key.pem").split(",")
+        self.fordefi_public_keys = []
+        for public_key_path in public_key_paths:
+            with open(public_key_path.strip(), "r") as key_file:
+                self.fordefi_public_keys.append(key_file.read())
+        self.fordefi_public_key = self.fordefi_public_keys[0]
+        self.signature_backend = os.environ.get("SIGNATURE_BACKEND") or None
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger("cosigner.lookups")
+
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_NEGATIVE_TTL_SECONDS = 30.0
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_REFRESH_AHEAD = 0.8    # reload in the background once an entry is 80% through its TTL
+DEFAULT_PAGE_SIZE = 100
+MAX_DIRECTORY_ITEMS = 100_000  # stop paging a directory after this many items
+
+Loader = Callable[[Hashable], Awaitable[Any]]
+
+
+class LookupCache:
+    """Async read-through cache for slow lookups, e.g. Fordefi API calls made by rules.
+
+    get(key) returns a fresh cached value without any I/O. On a miss the loader
+    runs once, however many callers ask at the same time; they all await that
+    one load. A None result ("not found") is cached too, for `negative_ttl`, so
+    unknown keys don't hit the API on every transaction. Once an entry is older
+    than `refresh_ahead` × its TTL, get() still returns it but reloads it in the
+    background, so keys in steady use never expire on the hot path. At most
+    `max_entries` keys are kept, least recently used evicted first.
+
+    Loader errors are not cached: the caller gets the exception (a rule that
+    raises fails closed), and a failed background refresh keeps serving the old
+    value until it expires.
+    """
+
+    def __init__(
+        self,
+        loader: Loader,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        refresh_ahead: float = DEFAULT_REFRESH_AHEAD,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = "lookup",
+    ):
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._loader = loader
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._max_entries = max_entries
+        self._refresh_ahead = refresh_ahead
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()  # key -> (loaded_at, value)
+        self._loads: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            loaded_at, value = entry
+            age = self._clock() - loaded_at
+            ttl = self._ttl if value is not None else self._negative_ttl
+            if age < ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                if age >= ttl * self._refresh_ahead and key not in self._loads:
+                    self._start_load(key)
+                return value
+        self.misses += 1
+        task = self._loads.get(key) or self._start_load(key)
+        # Shielded: a caller cancelled mid-load (e.g. by the rule deadline) doesn't cancel it for the others.
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _start_load(self, key: Hashable) -> "asyncio.Task[Any]":
+        task = asyncio.create_task(self._load(key), name=f"{self.name}-load")
+        self._loads[key] = task
+        task.add_done_callback(lambda done: self._finish_load(key, done))
+        return task
+
+    async def _load(self, key: Hashable) -> Any:
+        value = await self._loader(key)
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def _finish_load(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._loads.get(key) is task:
+            del self._loads[key]
+        # Retrieving the exception also keeps asyncio from reporting it as unhandled after a background refresh.
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("%s lookup for %r failed: %s", self.name, key, task.exception())
+
+
+def normalize_address(address: str) -> str:
+    # EVM addresses compare case-insensitively; base58 (Solana) addresses are case-sensitive.
+    return address.lower() if address[:2] in ("0x", "0X") else address
+
+
+def _item_address(item: Dict) -> Optional[str]:
+    address = item.get("address")
+    if isinstance(address, dict):  # some contact types nest it as {"address": ..., "chain": ...}
+        address = address.get("address")
+    return address if isinstance(address, str) and address else None
+
+
+class FordefiLookups:
+    """Cached views of the organization's vaults and address book, for I/O-bound rules.
+
+    Each view is loaded in full (all pages of GET /vaults or GET
+    /addressbook/contacts), indexed by address, and cached as a single
+    LookupCache entry. After the first load, vault() and contact() are dict
+    lookups; the index is reloaded in the background as it nears `ttl`, so
+    changes in Fordefi show up within that time.
+
+    Use cache() to add caches for other lookups (token metadata, ...) with
+    the same defaults.
+    """
+
+    def __init__(
+        self,
+        api,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ):
+        self._api = api
+        self._ttl = ttl
+        self._negative_ttl = negative_ttl
+        self._max_entries = max_entries
+        self._page_size = page_size
+        self._directories = LookupCache(self._load_directory, ttl=ttl, name="directory")
+        self.caches: Dict[str, LookupCache] = {"directory": self._directories}
+
+    async def vault(self, address: str) -> Optional[Dict]:
+        """The organization's vault with this address, or None."""
+        return (await self._directories.get("vaults")).get(normalize_address(address))
+
+    async def contact(self, address: str) -> Optional[Dict]:
+        """The address-book contact with this address, or None."""
+        return (await self._directories.get("contacts")).get(normalize_address(address))
+
+    def cache(self, name: str, loader: Loader, **options) -> LookupCache:
+        """Create (or return the existing) named LookupCache, with this instance's TTLs and size as defaults."""
+        if name not in self.caches:
+            options = {"ttl": self._ttl, "negative_ttl": self._negative_ttl, "max_entries": self._max_entries, **options}
+            self.caches[name] = LookupCache(loader, name=name, **options)
+        return self.caches[name]
+
+    async def _load_directory(self, kind: str) -> Dict[str, Dict]:
+        list_page = self._api.list_vaults if kind == "vaults" else self._api.list_contacts
+        items: List[Dict] = []
+        page = 1
+        while len(items) < MAX_DIRECTORY_ITEMS:
+            body = await list_page(page=page, size=self._page_size)
+            batch = body.get(kind) or []
+            items.extend(batch)
+            total = body.get("total")
+            if len(batch) < self._page_size or (total is not None and page * self._page_size >= total):
+                break
+            page += 1
+        index = {}
+        for item in items:
+            address = _item_address(item)
+            if address:
+                index[normalize_address(address)] = item
+        logger.info("Loaded %d %s (%d addresses)", len(items), kind, len(index))
+        return index
@@ -0,0 +1,87 @@
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+logger = logging.getLogger("cosigner.api")
+
+CLOSED = "closed"        # calls go through
+OPEN = "open"            # calls fail fast until reset_timeout has passed
+HALF_OPEN = "half_open"  # trial calls go through; the first result closes or reopens the circuit
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff.
+
+    Attempt n (0-based) waits a random time in [0, min(max_delay, base_delay * 2**n)],
+    so concurrent webhooks that failed together don't retry in lockstep.
+    """
+    max_attempts: int = 3       # total attempts, the first one included
+    base_delay: float = 0.1     # seconds
+    max_delay: float = 2.0      # seconds; also caps a server-sent Retry-After
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {self.max_attempts}")
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """Fails calls fast while the Fordefi API looks down, instead of piling retries onto it.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are
+    rejected for `reset_timeout` seconds. It then half-opens: calls go through
+    again, and the first one to finish closes the circuit on success or reopens
+    it on failure.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allows_calls(self) -> bool:
+        return self.state != OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until the circuit half-opens (0 unless open)."""
+        if self.state != OPEN:
+            return 0.0
+        return self.reset_timeout - (self._clock() - self._opened_at)
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("Fordefi API circuit closed")
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == HALF_OPEN or (self._opened_at is None and self._failures >= self.failure_threshold):
+            self._opened_at = self._clock()
+            logger.warning(
+                "Fordefi API circuit open after %d consecutive failures; failing fast for %.0fs",
+                self._failures, self.reset_timeout,
+            )
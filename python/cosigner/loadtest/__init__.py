@@ -0,0 +1,4 @@
+"""Local load-testing kit: a mock Fordefi API, a signed-webhook generator and a load driver.
+
+See the "Load testing" section of the README for how the pieces fit together.
+"""
@@ -0,0 +1,157 @@
+"""Fire signed webhooks at a running CoSigner at a fixed rate and report latency and errors.
+
+Each webhook is for a fresh transaction id, so every request goes through the full
+fetch → rules → approve/abort pipeline (against the mock API, see loadtest.mock_api).
+Requests are sent on schedule whether or not earlier ones have answered (open
+loop), and latency is measured from the scheduled send time, so a stalled service
+shows up as latency rather than as a silently lower request rate.
+
+    uv run python -m loadtest.driver --url http://127.0.0.1:8080/ \\
+        --key loadtest-keys/test_private_key.pem --rate 200 --duration 30
+
+In the default inline decision mode the response is sent after the decision, so
+the latency reported is time-to-decision; in queue mode it is only the time to
+verify and enqueue the webhook.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.replay import percentile
+from loadtest.webhooks import WebhookSigner
+
+# Fordefi's webhook source IP; the CoSigner trusts X-Forwarded-For for its allowlist.
+FORDEFI_SOURCE_IP = "54.243.103.88"
+
+
+@dataclass
+class LoadResult:
+    latencies: List[float] = field(default_factory=list)   # seconds, successful (2xx) responses only
+    statuses: Counter = field(default_factory=Counter)     # HTTP status (or "transport_error")
+    decisions: Counter = field(default_factory=Counter)    # "decision" field of 2xx responses, "queued" for 202
+    sent: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.latencies)
+        errors = sum(count for status, count in self.statuses.items() if not str(status).startswith("2"))
+        return {
+            "sent": self.sent,
+            "elapsed_seconds": self.elapsed,
+            "achieved_rate": self.sent / self.elapsed if self.elapsed else 0.0,
+            "error_rate": errors / self.sent if self.sent else 0.0,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "decisions": dict(self.decisions),
+            "latency_ms": {
+                name: percentile(latencies, fraction) * 1000
+                for name, fraction in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("max", 1.0))
+            },
+        }
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    url: str,
+    body: bytes,
+    signature: str,
+    source_ip: Optional[str],
+    scheduled: float,
+    result: LoadResult,
+) -> None:
+    headers = {"Content-Type": "application/json", "X-Signature": signature}
+    if source_ip:
+        headers["X-Forwarded-For"] = source_ip
+    try:
+        response = await client.post(url, content=body, headers=headers)
+    except httpx.HTTPError:
+        result.statuses["transport_error"] += 1
+        return
+    result.statuses[response.status_code] += 1
+    if response.is_success:
+        result.latencies.append(time.perf_counter() - scheduled)
+        if response.status_code == 202:
+            result.decisions["queued"] += 1
+        else:
+            try:
+                result.decisions[response.json().get("decision") or "no_decision"] += 1
+            except ValueError:
+                result.decisions["no_decision"] += 1
+
+
+async def run_load(
+    url: str,
+    signer: WebhookSigner,
+    rate: float,
+    duration: float,
+    connections: int = 100,
+    source_ip: Optional[str] = FORDEFI_SOURCE_IP,
+    timeout: float = 30.0,
+) -> LoadResult:
+    """Send `rate` webhooks/sec for `duration` seconds and wait for all of them to answer."""
+    result = LoadResult()
+    run_id = uuid.uuid4().hex[:8]
+    # Sign everything up front: signing costs about a millisecond, which would
+    # otherwise throttle the send loop at high rates.
+    webhooks = [signer.signed_webhook(f"loadtest-{run_id}-{index}") for index in range(int(rate * duration))]
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        tasks = []
+        start = time.perf_counter()
+        for index, (body, signature) in enumerate(webhooks):
+            scheduled = start + index / rate
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(
+                _send(client, url, body, signature, source_ip, scheduled, result)
+            ))
+            result.sent += 1
+        await asyncio.gather(*tasks)
+        result.elapsed = time.perf_counter() - start
+    return result
+
+
+def print_summary(summary: Dict) -> None:
+    print(
+        f"sent {summary['sent']:,} webhooks in {summary['elapsed_seconds']:.1f}s "
+        f"({summary['achieved_rate']:,.1f}/s), error rate {summary['error_rate']:.2%}"
+    )
+    print("statuses:  " + ", ".join(f"{status}={count:,}" for status, count in sorted(summary["statuses"].items())))
+    print("decisions: " + ", ".join(f"{name}={count:,}" for name, count in sorted(summary["decisions"].items())))
+    print("latency:   " + ", ".join(f"{name} {value:,.1f} ms" for name, value in summary["latency_ms"].items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8080/", help="CoSigner webhook endpoint")
+    parser.add_argument("--key", type=Path, required=True, help="test private key from `loadtest.webhooks keygen`")
+    parser.add_argument("--rate", type=float, default=50, help="webhooks per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds to send for")
+    parser.add_argument("--connections", type=int, default=100, help="max concurrent connections")
+    parser.add_argument(
+        "--source-ip", default=FORDEFI_SOURCE_IP,
+        help="X-Forwarded-For value (Fordefi's IP passes the allowlist); pass '' to omit the header",
+    )
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    signer = WebhookSigner.from_file(args.key)
+    result = asyncio.run(run_load(args.url, signer, args.rate, args.duration, args.connections, args.source_ip or None))
+    summary = result.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == "__main__":
+    main()
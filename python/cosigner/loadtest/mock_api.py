@@ -0,0 +1,182 @@
+"""A local stand-in for the Fordefi API endpoints the CoSigner calls, for load tests.
+
+Serves GET /api/v1/transactions/{id}, POST /api/v1/transactions/{id}/approve|abort,
+the paged GET /api/v1/transactions list (filtered by ?states=), and empty vault
+and address-book lists (for rules using context.lookups). Any transaction id is
+accepted: the first fetch materializes it from a template transaction (the test
+fixture by default, or captured traffic) in state waiting_for_approval, and
+approve/abort move it to approved/aborted — deciding twice returns 400 like the
+real API. Latency and errors can be injected to see how the CoSigner behaves
+when Fordefi is slow or failing.
+
+    uv run python -m loadtest.mock_api --port 8081 --latency-ms 40 --jitter-ms 15 --error-rate 0.01
+    FORDEFI_API_BASE_URL=http://127.0.0.1:8081/api/v1 FORDEFI_API_USER_TOKEN=test ... uvicorn cosigner:app
+
+GET /stats reports request counts and the decisions received. --pending N seeds a
+backlog of N waiting transactions for the CoSigner's sweep to clear (SWEEP_INTERVAL_SECONDS).
+"""
+
+import argparse
+import asyncio
+import random
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.replay import load_transactions
+
+DEFAULT_TEMPLATE = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "transaction_contract_call.json"
+API_PREFIX = "/api/v1"
+
+
+class MockFordefiAPI:
+    """Transaction state plus the latency/error injection settings."""
+
+    def __init__(
+        self,
+        templates: Sequence[Dict],
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        if not templates:
+            raise ValueError("at least one template transaction is required")
+        self.templates: List[Dict] = list(templates)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.transactions: Dict[str, Dict] = {}
+        self.requests: Counter = Counter()
+        self._random = random.Random(seed)
+
+    def transaction(self, transaction_id: str) -> Dict:
+        if transaction_id not in self.transactions:
+            template = self.templates[len(self.transactions) % len(self.templates)]
+            # A shallow copy is enough: only the top-level id and state ever change.
+            self.transactions[transaction_id] = {**template, "id": transaction_id, "state": "waiting_for_approval"}
+        return self.transactions[transaction_id]
+
+    async def simulate(self, endpoint: str) -> None:
+        """Sleep for the configured latency, then maybe fail with an injected 503."""
+        self.requests[endpoint] += 1
+        delay_ms = max(0.0, self._random.gauss(self.latency_ms, self.jitter_ms)) if self.jitter_ms else self.latency_ms
+        if delay_ms:
+            await asyncio.sleep(delay_ms / 1000)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.requests["injected_errors"] += 1
+            raise HTTPException(status_code=503, detail="injected error")
+
+    def seed(self, count: int, prefix: str = "pending") -> None:
+        """Create `count` transactions waiting for approval, as a backlog to sweep."""
+        for index in range(count):
+            self.transaction(f"{prefix}-{index}")
+
+    def list(self, states: Sequence[str], page: int, size: int) -> Dict:
+        matching = [
+            transaction for transaction in self.transactions.values()
+            if not states or transaction["state"] in states
+        ]
+        start = (page - 1) * size
+        return {"total": len(matching), "page": page, "size": size, "transactions": matching[start:start + size]}
+
+    def decide(self, transaction_id: str, state: str) -> None:
+        transaction = self.transaction(transaction_id)
+        if transaction["state"] != "waiting_for_approval":
+            raise HTTPException(
+                status_code=400,
+                detail=f"Transaction is in state {transaction['state']}, not waiting_for_approval",
+            )
+        transaction["state"] = state
+
+    def stats(self) -> Dict:
+        return {
+            "requests": dict(self.requests),
+            "transactions": len(self.transactions),
+            "states": dict(Counter(transaction["state"] for transaction in self.transactions.values())),
+        }
+
+
+def create_app(mock: MockFordefiAPI) -> FastAPI:
+    app = FastAPI(title="Mock Fordefi API")
+    app.state.mock = mock
+
+    @app.middleware("http")
+    async def require_bearer_token(request: Request, call_next):
+        if request.url.path.startswith(API_PREFIX) and not request.headers.get("authorization", "").startswith("Bearer "):
+            return JSONResponse({"title": "Missing bearer token"}, status_code=401)
+        return await call_next(request)
+
+    @app.exception_handler(HTTPException)
+    async def fordefi_error(request: Request, error: HTTPException):
+        # The real API reports errors as {"title": ..., "detail": ...}.
+        return JSONResponse({"title": error.detail, "detail": error.detail}, status_code=error.status_code)
+
+    @app.get(f"{API_PREFIX}/transactions")
+    async def list_transactions(request: Request, page: int = 1, size: int = 100):
+        await mock.simulate("list_transactions")
+        if page < 1 or size < 1:
+            raise HTTPException(status_code=422, detail="page and size must be positive")
+        return JSONResponse(mock.list(request.query_params.getlist("states"), page, size))
+
+    @app.get(f"{API_PREFIX}/vaults")
+    async def list_vaults(page: int = 1, size: int = 100):
+        await mock.simulate("list_vaults")
+        return {"total": 0, "page": page, "size": size, "vaults": []}
+
+    @app.get(f"{API_PREFIX}/addressbook/contacts")
+    async def list_contacts(page: int = 1, size: int = 100):
+        await mock.simulate("list_contacts")
+        return {"total": 0, "page": page, "size": size, "contacts": []}
+
+    @app.get(f"{API_PREFIX}/transactions/{{transaction_id}}")
+    async def get_transaction(transaction_id: str):
+        await mock.simulate("get_transaction")
+        # Skip FastAPI's response-model encoding, which costs milliseconds on a large transaction.
+        return JSONResponse(mock.transaction(transaction_id))
+
+    @app.post(f"{API_PREFIX}/transactions/{{transaction_id}}/approve")
+    async def approve_transaction(transaction_id: str):
+        await mock.simulate("approve")
+        mock.decide(transaction_id, "approved")
+        return {}
+
+    @app.post(f"{API_PREFIX}/transactions/{{transaction_id}}/abort")
+    async def abort_transaction(transaction_id: str):
+        await mock.simulate("abort")
+        mock.decide(transaction_id, "aborted")
+        return {}
+
+    @app.get("/stats")
+    async def stats():
+        return mock.stats()
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument(
+        "--templates", type=Path, default=DEFAULT_TEMPLATE,
+        help="transaction JSON file, directory of them, or JSONL to serve (round-robin)",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="mean latency added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="standard deviation of the added latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failed with 503 (0-1)")
+    parser.add_argument("--seed", type=int, help="random seed, for reproducible runs")
+    parser.add_argument("--pending", type=int, default=0, help="transactions waiting for approval at startup")
+    args = parser.parse_args()
+
+    mock = MockFordefiAPI(load_transactions(args.templates), args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    mock.seed(args.pending)
+    uvicorn.run(create_app(mock), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Generate a throwaway webhook signing key and sign webhook bodies with it.
+
+The CoSigner only accepts webhooks signed by a key listed in FORDEFI_PUBLIC_KEY_PATH.
+For load tests, generate a test key pair and point the CoSigner at its public half:
+
+    uv run python -m loadtest.webhooks keygen --out loadtest-keys
+    FORDEFI_PUBLIC_KEY_PATH=loadtest-keys/test_public_key.pem ...
+
+    uv run python -m loadtest.webhooks sign --key loadtest-keys/test_private_key.pem --transaction-id tx_1
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+from pathlib import Path
+from typing import Tuple, Union
+
+import ecdsa
+from ecdsa.util import sigencode_der
+
+PRIVATE_KEY_FILE = "test_private_key.pem"
+PUBLIC_KEY_FILE = "test_public_key.pem"
+
+
+def generate_key_pair(directory: Union[str, Path]) -> Tuple[Path, Path]:
+    """Write a new P-256 key pair to `directory`; returns (private_key_path, public_key_path)."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    signing_key = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
+    private_key_path = directory / PRIVATE_KEY_FILE
+    public_key_path = directory / PUBLIC_KEY_FILE
+    private_key_path.write_bytes(signing_key.to_pem())
+    private_key_path.chmod(0o600)
+    public_key_path.write_bytes(signing_key.get_verifying_key().to_pem())
+    return private_key_path, public_key_path
+
+
+class WebhookSigner:
+    """Signs webhook bodies the way Fordefi does: base64 DER ECDSA P-256/SHA-256 in X-Signature."""
+
+    def __init__(self, private_key_pem: Union[str, bytes]):
+        self._key = ecdsa.SigningKey.from_pem(private_key_pem)
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> "WebhookSigner":
+        return cls(Path(path).read_text())
+
+    def sign(self, body: bytes) -> str:
+        return base64.b64encode(self._key.sign(body, hashfunc=hashlib.sha256, sigencode=sigencode_der)).decode()
+
+    def signed_webhook(self, transaction_id: str, state: str = "waiting_for_approval") -> Tuple[bytes, str]:
+        """A transaction webhook body for `transaction_id` and its X-Signature value."""
+        body = webhook_body(transaction_id, state)
+        return body, self.sign(body)
+
+
+def webhook_body(transaction_id: str, state: str = "waiting_for_approval") -> bytes:
+    # Only the fields the CoSigner reads; it fetches the full transaction from the API.
+    return json.dumps({
+        "webhook_id": "loadtest",
+        "event_id": f"event-{transaction_id}",
+        "event": {"id": transaction_id, "state": state},
+    }).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    keygen = commands.add_parser("keygen", help="write a test key pair")
+    keygen.add_argument("--out", type=Path, default=Path("loadtest-keys"), help="output directory")
+    sign = commands.add_parser("sign", help="print a signed webhook body and its X-Signature")
+    sign.add_argument("--key", type=Path, required=True, help="test private key (PEM)")
+    sign.add_argument("--transaction-id", required=True)
+    sign.add_argument("--state", default="waiting_for_approval")
+    args = parser.parse_args()
+
+    if args.command == "keygen":
+        private_key_path, public_key_path = generate_key_pair(args.out)
+        print(f"private key: {private_key_path}\npublic key:  {public_key_path}")
+        print(f"start the CoSigner with FORDEFI_PUBLIC_KEY_PATH={public_key_path}")
+    else:
+        body, signature = WebhookSigner.from_file(args.key).signed_webhook(args.transaction_id, args.state)
+        print(json.dumps({"X-Signature": signature, "body": body.decode()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,28 @@
-from .base import Rule, RuleContext, RuleResult, Verdict, get_vault_address, run_rules
-from .calldata import ABI_REGISTRY, DecodedCall, decode_calldata
+from .base import (
+    Rule,
+    RuleContext,
+    RuleOutcome,
+    RuleResult,
+    Verdict,
+    get_vault_address,
+    is_io_bound,
+    run_rules,
+    run_rules_async,
+)
+from .calldata import ABI_REGISTRY, AbiRegistry, DecodedCall, FunctionAbi, decode_calldata
+from .dispatch import Applicability, RuleIndex, applies_to
+from .solana import (
+    SOLANA_REGISTRY,
+    DecodedInstruction,
+    IdlError,
+    InstructionLayout,
+    SolanaRegistry,
+    anchor_discriminator,
+    b58encode,
+)
+from .view import SolanaInstruction, TransactionView
+from .declarative import Allowlist, RuleDefinitionError, compile_rules, load_rules
+from .snapshot import RuleReloader, RuleSnapshot, build_snapshot
 from .calldata_contains_vault import validate_calldata_contains_vault
 from .cctp_bridge_recipient import validate_cctp_bridge_recipient
 from .eip712_receiver import validate_eip712_receiver
@@ -7,10 +30,15 @@ from .oneinch_swap_receiver import validate_oneinch_swap_receiver
 
 # The rules the CoSigner runs on every transaction awaiting approval.
 # To add your own check: write a function taking a RuleContext and returning a
-# RuleResult (see any rule module for an example), then append it here.
+# RuleResult (see any rule module for an example), then append it here. Make it
+# `async def` if it has to wait on I/O; such rules run concurrently. Decorate
+# it with @applies_to(...) to have it called only for matching transactions.
 ALL_RULES: list[Rule] = [
     validate_eip712_receiver,
     validate_calldata_contains_vault,
     validate_oneinch_swap_receiver,
     validate_cctp_bridge_recipient,
 ]
+
+# Dispatch index over ALL_RULES, built once at import.
+RULE_INDEX = RuleIndex(ALL_RULES)
@@ -1,11 +1,16 @@
-import json
+import asyncio
+import inspect
 import logging
+import time
 from dataclasses import dataclass
 from enum import Enum
-from typing import Callable, Dict, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from fordefi import Config
+from fordefi import Config, FordefiLookups
 from .calldata import DecodedCall
+from .dispatch import RuleIndex
+from .solana import DecodedInstruction
+from .view import TransactionView, get_vault_address
 
 logger = logging.getLogger("cosigner.rules")
 
@@ -40,48 +45,158 @@ class RuleContext:
     config: Config
     decoded_call: Optional[DecodedCall]  # decoded once, shared by all rules (None = no calldata or unknown selector)
     decode_error: Optional[str]          # set when the selector is registered but decoding failed
+    view: Optional[TransactionView] = None  # parse-once derived values; built from transaction if omitted
+    lookups: Optional[FordefiLookups] = None  # cached vault / address-book lookups, for I/O-bound rules
+
+    def __post_init__(self):
+        if self.view is None:
+            self.view = TransactionView(self.transaction, self.config.origin_vault)
 
     def parsed_raw_data(self) -> Optional[Dict]:
-        """The transaction's raw_data parsed as JSON (EIP-712 payloads), or None.
-
-        raw_data also carries non-JSON personal_sign messages, so unparseable
-        content is not an error — it just means no EIP-712 payload.
-        """
-        raw_data = self.transaction.get("raw_data")
-        if not raw_data:
-            return None
-        try:
-            parsed = json.loads(raw_data)
-        except (json.JSONDecodeError, TypeError):
-            return None
-        return parsed if isinstance(parsed, dict) else None
-
-
-Rule = Callable[[RuleContext], RuleResult]
-
-
-def get_vault_address(transaction: Dict) -> str:
-    """Resolve the address of the vault that signs this transaction."""
-    from_field = transaction.get("from") or {}
-    vault = from_field.get("vault") or {}
-    if vault.get("address"):
-        return vault["address"]
-    managed = transaction.get("managed_transaction_data") or {}
-    managed_vault = managed.get("vault") or {}
-    if managed_vault.get("address"):
-        return managed_vault["address"]
-    return from_field.get("address") or ""
-
-
-def run_rules(rules: List[Rule], context: RuleContext) -> RuleResult:
-    """Run every rule; the first ABORT wins. A rule that raises is treated as ABORT (fail closed)."""
+        """The transaction's raw_data parsed as JSON (EIP-712 payloads), or None."""
+        return self.view.typed_message
+
+    @property
+    def decoded_instructions(self) -> Tuple[DecodedInstruction, ...]:
+        """The transaction's Solana instructions decoded against SOLANA_REGISTRY (see TransactionView)."""
+        return self.view.decoded_instructions
+
+
+# Pure rules return a RuleResult; I/O-bound rules are `async def` and return an
+# awaitable one (see run_rules_async).
+Rule = Callable[[RuleContext], Union[RuleResult, Awaitable[RuleResult]]]
+
+
+def is_io_bound(rule: Rule) -> bool:
+    """Whether a rule is I/O-bound, i.e. declared with `async def`."""
+    return inspect.iscoroutinefunction(rule)
+
+
+@dataclass(frozen=True)
+class RuleOutcome:
+    """What one rule returned for a transaction and how long it took."""
+    rule: str
+    result: RuleResult
+    duration: float  # seconds
+    applicable: bool = True  # False: ruled out by its declared applicability and never called
+
+
+_NOT_APPLICABLE = RuleResult.skipped("not applicable to this transaction")
+
+
+def _select(
+    rules: Union[Sequence[Rule], RuleIndex], context: RuleContext, trace: Optional[List[RuleOutcome]] = None,
+) -> List[Rule]:
+    index = rules if isinstance(rules, RuleIndex) else RuleIndex(rules)
+    applicable = index.select(context)
+    if len(applicable) < len(index.rules) and (trace is not None or logger.isEnabledFor(logging.DEBUG)):
+        selected = set(map(id, applicable))
+        skipped = [rule.__name__ for rule in index.rules if id(rule) not in selected]
+        if trace is not None:
+            trace.extend(RuleOutcome(name, _NOT_APPLICABLE, 0.0, applicable=False) for name in skipped)
+        logger.debug("Skipped rules not applicable to this transaction: %s", ", ".join(skipped))
+    return applicable
+
+
+def _record(rule: Rule, result: RuleResult, duration: float, trace: Optional[List[RuleOutcome]]) -> None:
+    if trace is not None:
+        trace.append(RuleOutcome(rule.__name__, result, duration))
+    logger.info("[%s] %s: %s", rule.__name__, result.verdict.value, result.reason or "n/a")
+
+
+def _run_pure(rules: Sequence[Rule], context: RuleContext, trace: Optional[List[RuleOutcome]]) -> RuleResult:
     for rule in rules:
-        try:
-            result = rule(context)
-        except Exception as error:
-            result = RuleResult.abort(f"rule {rule.__name__} raised: {error}")
-            logger.exception("Rule %s raised an exception (failing closed)", rule.__name__)
-        logger.info("[%s] %s: %s", rule.__name__, result.verdict.value, result.reason or "n/a")
+        start = time.perf_counter()
+        if is_io_bound(rule):
+            result = RuleResult.abort(f"rule {rule.__name__} is I/O-bound and needs run_rules_async")
+        else:
+            try:
+                result = rule(context)
+            except Exception as error:
+                result = RuleResult.abort(f"rule {rule.__name__} raised: {error}")
+                logger.exception("Rule %s raised an exception (failing closed)", rule.__name__)
+        _record(rule, result, time.perf_counter() - start, trace)
         if result.verdict is Verdict.ABORT:
             return result
     return RuleResult.passed("all rules passed")
+
+
+def run_rules(
+    rules: Union[Sequence[Rule], RuleIndex],
+    context: RuleContext,
+    trace: Optional[List[RuleOutcome]] = None,
+) -> RuleResult:
+    """Run every applicable rule; the first ABORT wins. A rule that raises is treated as ABORT (fail closed).
+
+    Pass a prebuilt RuleIndex to avoid re-indexing the rules on every call. Rules
+    whose declared applicability (see rules/dispatch.py) rules them out are
+    skipped without being called. If `trace` is given, a RuleOutcome is appended
+    to it for every rule: first the skipped ones (SKIPPED, applicable=False),
+    then each rule that ran. I/O-bound rules can't run here and abort;
+    use run_rules_async for rule sets that have them.
+    """
+    return _run_pure(_select(rules, context, trace), context, trace)
+
+
+async def _run_io_bound(rule: Rule, context: RuleContext) -> Tuple[RuleResult, float]:
+    start = time.perf_counter()
+    try:
+        result = await rule(context)
+    except Exception as error:
+        result = RuleResult.abort(f"rule {rule.__name__} raised: {error}")
+        logger.exception("Rule %s raised an exception (failing closed)", rule.__name__)
+    return result, time.perf_counter() - start
+
+
+async def run_rules_async(
+    rules: Union[Sequence[Rule], RuleIndex],
+    context: RuleContext,
+    trace: Optional[List[RuleOutcome]] = None,
+    deadline: Optional[float] = None,
+) -> RuleResult:
+    """run_rules, plus I/O-bound rules run concurrently within a time budget.
+
+    Pure rules run first, in order, exactly as in run_rules; if one aborts, no
+    I/O is started. The I/O-bound rules then all run at once as tasks, and the
+    first ABORT cancels the rest. `deadline` (seconds from the call) bounds
+    the whole evaluation: rules still running then are cancelled and the
+    transaction is aborted (fail closed), so a hung lookup can't hold a
+    decision. With no I/O-bound rules this costs the same as run_rules.
+    """
+    started = time.perf_counter()
+    applicable = _select(rules, context, trace)
+    io_bound = [rule for rule in applicable if is_io_bound(rule)]
+    result = _run_pure([rule for rule in applicable if not is_io_bound(rule)], context, trace)
+    if result.verdict is Verdict.ABORT or not io_bound:
+        return result
+
+    tasks = {
+        asyncio.create_task(_run_io_bound(rule, context), name=f"rule-{rule.__name__}"): position
+        for position, rule in enumerate(io_bound)
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - (time.perf_counter() - started))
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                late = [io_bound[tasks[task]] for task in sorted(pending, key=tasks.get)]
+                for rule in late:
+                    _record(rule, RuleResult.abort(f"missed the {deadline}s deadline"), time.perf_counter() - started, trace)
+                logger.warning(
+                    "Rules %s missed the %ss deadline (failing closed)", ", ".join(rule.__name__ for rule in late), deadline,
+                )
+                return RuleResult.abort(
+                    f"rule {late[0].__name__} did not finish within the {deadline}s deadline (failing closed)"
+                )
+            # Settle simultaneous completions in registration order, so the reported ABORT is stable.
+            for task in sorted(done, key=tasks.get):
+                rule_result, duration = task.result()
+                _record(io_bound[tasks[task]], rule_result, duration, trace)
+                if rule_result.verdict is Verdict.ABORT:
+                    return rule_result
+    finally:
+        # Not awaited: a rule that ignores cancellation must not hold the decision past the deadline.
+        for task in pending:
+            task.cancel()
+    return RuleResult.passed("all rules passed")
@@ -1,7 +1,21 @@
+import json
+import logging
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 import eth_abi
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.grammar import ABIType, TupleType, parse
+from eth_abi.registry import registry as eth_abi_registry
+from eth_utils import function_signature_to_4byte_selector
+
+logger = logging.getLogger("cosigner.rules")
+
+# Inner calls nested deeper than this fail the decode, so wrapping a call in one more
+# multicall can't hide it from rules (and pathological payloads stay bounded).
+MAX_NESTING_DEPTH = 4
 
 
 @dataclass(frozen=True)
@@ -9,27 +23,222 @@ class FunctionAbi:
     name: str
     arg_names: Tuple[str, ...]
     arg_types: Tuple[str, ...]  # eth_abi type strings; structs written as "(address,uint256,...)"
+    # Arguments of type bytes / bytes[] that carry calldata of inner calls (multicall,
+    # Safe execTransaction, ...); they are decoded recursively into DecodedCall.inner_calls.
+    nested_calls: Tuple[str, ...] = ()
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}({','.join(self.arg_types)})"
+
+
+Decoder = Callable[[bytes], Tuple[Any, ...]]
+
+
+@lru_cache(maxsize=None)
+def compile_decoder(arg_types: Tuple[str, ...]) -> Decoder:
+    """Build (once per distinct type list) a decoder for ABI-encoded arguments.
+
+    eth_abi.decode() re-resolves the type strings and rebuilds a tuple decoder on
+    every call; compiling it up front leaves only the byte parsing on the hot path.
+    """
+    tuple_decoder = TupleDecoder(decoders=[eth_abi_registry.get_decoder(arg_type) for arg_type in arg_types])
+    return lambda data: tuple_decoder(ContextFramesBytesIO(data))
+
+
+def _zero_value(abi_type: ABIType) -> Any:
+    """The zero value of a parsed ABI type (0, empty bytes, empty dynamic arrays, ...)."""
+    if abi_type.arrlist:
+        dimension = abi_type.arrlist[-1]
+        return [_zero_value(abi_type.item_type)] * dimension[0] if dimension else []
+    if isinstance(abi_type, TupleType):
+        return tuple(_zero_value(component) for component in abi_type.components)
+    if abi_type.base == "address":
+        return "0x" + "00" * 20
+    if abi_type.base == "bool":
+        return False
+    if abi_type.base == "bytes":
+        return bytes(abi_type.sub or 0)
+    if abi_type.base == "string":
+        return ""
+    return 0
+
+
+def _canonical_type(abi_param: Dict) -> str:
+    # ABI JSON writes structs as "tuple" / "tuple[]" with their members in "components".
+    abi_type = abi_param["type"]
+    if abi_type.startswith("tuple"):
+        members = ",".join(_canonical_type(component) for component in abi_param.get("components", []))
+        return f"({members}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+class AbiRegistry:
+    """Function selectors the CoSigner knows how to decode, with their decoders precompiled.
+
+    Behaves like a dict of selector → FunctionAbi. Registering a function compiles
+    its decoder immediately, so decoding cost at request time is only the byte
+    parsing. Load whole contract ABIs with load_abi_file() / load_abi_directory().
+    """
+
+    def __init__(self):
+        self._functions: Dict[str, FunctionAbi] = {}
+        self._decoders: Dict[str, Decoder] = {}
+
+    def register(self, selector: str, abi: FunctionAbi) -> None:
+        selector = selector.lower()
+        self._decoders[selector] = compile_decoder(tuple(abi.arg_types))
+        self._functions[selector] = abi
+
+    __setitem__ = register
+
+    def __getitem__(self, selector: str) -> FunctionAbi:
+        return self._functions[selector.lower()]
+
+    def __contains__(self, selector: object) -> bool:
+        return isinstance(selector, str) and selector.lower() in self._functions
+
+    def __len__(self) -> int:
+        return len(self._functions)
+
+    def get(self, selector: str) -> Optional[FunctionAbi]:
+        return self._functions.get(selector.lower())
+
+    def load_abi(self, abi: List[Dict]) -> int:
+        """Register every function of a contract ABI (the standard JSON list). Returns how many."""
+        count = 0
+        for entry in abi:
+            if entry.get("type", "function") != "function":
+                continue
+            inputs = entry.get("inputs", [])
+            arg_types = tuple(_canonical_type(param) for param in inputs)
+            arg_names = tuple(param.get("name") or f"arg{index}" for index, param in enumerate(inputs))
+            signature = f"{entry['name']}({','.join(arg_types)})"
+            selector = "0x" + function_signature_to_4byte_selector(signature).hex()
+            # Keep nested-call declarations of functions registered in code (e.g. multicall).
+            existing = self._functions.get(selector)
+            self.register(selector, FunctionAbi(
+                name=entry["name"],
+                arg_names=arg_names,
+                arg_types=arg_types,
+                nested_calls=existing.nested_calls if existing else (),
+            ))
+            count += 1
+        return count
+
+    def load_abi_file(self, path: Union[str, Path]) -> int:
+        with open(path) as file:
+            abi = json.load(file)
+        # Accept both a bare ABI list and build artifacts of the form {"abi": [...]}.
+        return self.load_abi(abi["abi"] if isinstance(abi, dict) else abi)
+
+    def load_abi_directory(self, directory: Union[str, Path]) -> int:
+        count = sum(self.load_abi_file(path) for path in sorted(Path(directory).glob("*.json")))
+        logger.info("Loaded %d function ABIs from %s (%d selectors registered)", count, directory, len(self))
+        return count
+
+    def warm_up(self) -> int:
+        """Run every registered decoder once on zero-valued arguments; returns how many decoded.
+
+        Decoders are compiled at registration; this also exercises the decode path
+        itself so nothing is initialised lazily on the first real transaction.
+        """
+        warmed = 0
+        for selector, abi in self._functions.items():
+            try:
+                arguments = eth_abi.encode(list(abi.arg_types), [_zero_value(parse(t)) for t in abi.arg_types])
+                self._decoders[selector](arguments)
+                warmed += 1
+            except Exception as error:  # the decoder is compiled either way
+                logger.debug("Could not warm up decoder for %s (%s): %s", abi.signature, selector, error)
+        return warmed
+
+    def decode(self, calldata: bytes, depth: int = 0) -> Tuple[Optional["DecodedCall"], Optional[str]]:
+        """See decode_calldata()."""
+        if len(calldata) < 4:
+            return None, None
+        selector = "0x" + calldata[:4].hex()
+        abi = self._functions.get(selector)
+        if abi is None:
+            return None, None
+        try:
+            values = self._decoders[selector](calldata[4:])
+        except Exception as error:
+            return None, f"failed to decode {abi.name} ({selector}): {error}"
+        args = dict(zip(abi.arg_names, values))
+
+        inner_calls: List[DecodedCall] = []
+        unknown_inner_selectors: List[str] = []
+        for arg_name in abi.nested_calls:
+            value = args.get(arg_name)
+            for inner_calldata in (value,) if isinstance(value, bytes) else value or ():
+                if depth >= MAX_NESTING_DEPTH and len(inner_calldata) >= 4:
+                    return None, f"calldata nested deeper than {MAX_NESTING_DEPTH} levels"
+                inner, error = self.decode(inner_calldata, depth + 1)
+                if error:
+                    return None, f"{abi.name} ({selector}) inner call: {error}"
+                if inner is not None:
+                    inner_calls.append(inner)
+                elif len(inner_calldata) >= 4:
+                    unknown_inner_selectors.append("0x" + inner_calldata[:4].hex())
+        return DecodedCall(selector, abi.name, args, tuple(inner_calls), tuple(unknown_inner_selectors)), None
 
 
 # Function selectors the CoSigner knows how to decode. To validate a new contract call,
 # add its selector and signature here, then read the decoded arguments from your rule.
-ABI_REGISTRY: Dict[str, FunctionAbi] = {
-    # 1inch AggregationRouterV6.swap
-    # swap(address executor,
-    #      (address srcToken, address dstToken, address srcReceiver, address dstReceiver,
-    #       uint256 amount, uint256 minReturnAmount, uint256 flags) desc,
-    #      bytes data)
-    # V4/V5 routers use selector 0x7c025200 with an extra `bytes permit` member in the struct.
-    "0x07ed2379": FunctionAbi(
-        name="swap",
-        arg_names=("executor", "desc", "data"),
-        arg_types=(
-            "address",
-            "(address,address,address,address,uint256,uint256,uint256)",
-            "bytes",
-        ),
+ABI_REGISTRY = AbiRegistry()
+
+# 1inch AggregationRouterV6.swap
+# swap(address executor,
+#      (address srcToken, address dstToken, address srcReceiver, address dstReceiver,
+#       uint256 amount, uint256 minReturnAmount, uint256 flags) desc,
+#      bytes data)
+# V4/V5 routers use selector 0x7c025200 with an extra `bytes permit` member in the struct.
+ABI_REGISTRY["0x07ed2379"] = FunctionAbi(
+    name="swap",
+    arg_names=("executor", "desc", "data"),
+    arg_types=(
+        "address",
+        "(address,address,address,address,uint256,uint256,uint256)",
+        "bytes",
     ),
-}
+)
+
+# Batching wrappers whose inner calls are decoded recursively.
+# Uniswap V3 / PeripheryPayments-style multicall(bytes[] data)
+ABI_REGISTRY["0xac9650d8"] = FunctionAbi(
+    name="multicall",
+    arg_names=("data",),
+    arg_types=("bytes[]",),
+    nested_calls=("data",),
+)
+# SwapRouter02 multicall(uint256 deadline, bytes[] data)
+ABI_REGISTRY["0x5ae401dc"] = FunctionAbi(
+    name="multicall",
+    arg_names=("deadline", "data"),
+    arg_types=("uint256", "bytes[]"),
+    nested_calls=("data",),
+)
+# SwapRouter02 multicall(bytes32 previousBlockhash, bytes[] data)
+ABI_REGISTRY["0x1f0464d1"] = FunctionAbi(
+    name="multicall",
+    arg_names=("previousBlockhash", "data"),
+    arg_types=("bytes32", "bytes[]"),
+    nested_calls=("data",),
+)
+# Safe (Gnosis Safe) execTransaction — `data` is the call the Safe makes to `to`.
+ABI_REGISTRY["0x6a761202"] = FunctionAbi(
+    name="execTransaction",
+    arg_names=(
+        "to", "value", "data", "operation", "safeTxGas", "baseGas",
+        "gasPrice", "gasToken", "refundReceiver", "signatures",
+    ),
+    arg_types=(
+        "address", "uint256", "bytes", "uint8", "uint256", "uint256",
+        "uint256", "address", "address", "bytes",
+    ),
+    nested_calls=("data",),
+)
 
 ONEINCH_SWAP_V6_SELECTOR = "0x07ed2379"
 
@@ -39,23 +248,36 @@ class DecodedCall:
     selector: str
     function_name: str
     args: Dict[str, Any]  # addresses come back as lowercase "0x…" strings, structs as tuples
+    inner_calls: Tuple["DecodedCall", ...] = ()       # decoded calls nested in multicall/execTransaction args
+    unknown_inner_selectors: Tuple[str, ...] = ()     # nested calls whose selector isn't registered
+
+    def walk(self) -> Iterator["DecodedCall"]:
+        """This call followed by every nested call, depth-first."""
+        yield self
+        for inner in self.inner_calls:
+            yield from inner.walk()
 
 
-def decode_calldata(hex_data: str) -> Tuple[Optional[DecodedCall], Optional[str]]:
-    """Decode calldata against the ABI registry.
+def decode_calldata(calldata: Union[str, bytes]) -> Tuple[Optional[DecodedCall], Optional[str]]:
+    """Decode calldata (a "0x…" hex string, or raw bytes) against the ABI registry.
 
     Returns (decoded, None) on success, (None, None) for empty calldata or an
     unregistered selector, and (None, error) when the selector is registered but
     the calldata does not decode — rules must treat that as a validation failure.
+    Inner calls of registered batching functions are decoded too (see
+    DecodedCall.inner_calls); a registered inner call that fails to decode, or
+    calls nested more than MAX_NESTING_DEPTH levels deep, fail the whole decode. Pass `context.view.calldata` when you already have the
+    bytes, to skip re-parsing the hex.
     """
-    if not hex_data or len(hex_data) < 10:
-        return None, None
-    selector = hex_data[:10].lower()
-    abi = ABI_REGISTRY.get(selector)
-    if abi is None:
-        return None, None
-    try:
-        values = eth_abi.decode(list(abi.arg_types), bytes.fromhex(hex_data[10:]))
-    except Exception as error:
-        return None, f"failed to decode {abi.name} ({selector}): {error}"
-    return DecodedCall(selector, abi.name, dict(zip(abi.arg_names, values))), None
+    if isinstance(calldata, str):
+        if not calldata or len(calldata) < 10:
+            return None, None
+        selector = calldata[:10].lower()
+        abi = ABI_REGISTRY.get(selector)
+        if abi is None:
+            return None, None
+        try:
+            calldata = bytes.fromhex(calldata[2:])
+        except ValueError as error:
+            return None, f"failed to decode {abi.name} ({selector}): {error}"
+    return ABI_REGISTRY.decode(calldata)
@@ -0,0 +1,373 @@
+"""Declarative allowlist rules, written in YAML or JSON and compiled once at startup.
+
+A rule file holds named allowlists and a list of rules:
+
+    allowlists:
+      treasury:
+        - "0x1111111111111111111111111111111111111111"
+        - $origin_vault
+
+    rules:
+      - name: usdc_transfer_recipient
+        description: USDC transfers may only go to the treasury
+        match:                       # same keys as @applies_to; omit to run on every transaction
+          selectors: ["0xa9059cbb"]
+        checks:                      # all must pass
+          - path: calldata.args.to
+            in: ["@treasury"]
+        on_missing: abort            # a path that doesn't resolve aborts (default) or skips the rule
+
+A check reads one value by `path` and compares it with exactly one of:
+
+    in / not_in     a list of values; "@name" pulls in a named allowlist
+    equals          a single value
+    equals_path     another path in the same transaction (e.g. transaction.from.address)
+
+Values (and allowlist entries) are strings: quote numbers and booleans ("1",
+"true"). YAML files may leave "0x" addresses unquoted; they are read as
+strings rather than as hex integers.
+
+Paths start at `transaction` (the transaction from the Fordefi API), `calldata`
+(the decoded call: `function`, `selector`, `args.<name>`) or `eip712` (the typed
+message). Further segments are object keys or list/tuple indexes; `*` means
+every element, and then every element must pass. `$origin_vault` and
+`$zero_address` stand for the configured addresses.
+
+Compilation resolves all of this up front: paths become tuples of keys, and
+allowlists become frozensets, with "0x" hex values lowercased and also kept as
+bytes so decoded bytes arguments compare without re-encoding. Evaluating a rule
+is then a few lookups, and dispatch (rules/dispatch.py) never calls the rules
+whose `match` rules them out, so hundreds of them don't slow down a transaction.
+"""
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .base import Rule, RuleContext, RuleResult
+from .dispatch import applies_to
+
+try:
+    import yaml
+except ImportError:  # optional: `uv sync --extra yaml` for YAML rule files; JSON always works
+    yaml = None
+
+if yaml is not None:
+    class _RuleLoader(yaml.SafeLoader):
+        """safe_load, except that unquoted 0x... scalars stay strings instead of becoming integers."""
+
+        def construct_yaml_int(self, node):
+            value = self.construct_scalar(node)
+            if value.lstrip("+-")[:2].lower() == "0x":
+                return value
+            return super().construct_yaml_int(node)
+
+    _RuleLoader.add_constructor("tag:yaml.org,2002:int", _RuleLoader.construct_yaml_int)
+
+logger = logging.getLogger("cosigner.rules")
+
+RULE_FILE_SUFFIXES = (".json", ".yaml", ".yml")
+MATCH_KEYS = ("transaction_types", "selectors", "programs", "eip712_primary_types", "eip712_domains")
+OPERATORS = ("in", "not_in", "equals", "equals_path")
+PATH_ROOTS = ("transaction", "calldata", "eip712")
+CALLDATA_FIELDS = {"function": "function_name", "selector": "selector", "args": "args"}
+_RULE_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+_MISSING = object()
+
+Check = Callable[[RuleContext], Optional[RuleResult]]  # None = passed
+
+
+class RuleDefinitionError(ValueError):
+    """A declarative rule file is invalid. Raised while loading, so a bad file fails startup."""
+
+
+def _normalize(value: Any) -> Any:
+    """The form values are compared in: "0x" hex lowercased, numbers and booleans as strings.
+
+    Other strings (Solana addresses, names) stay case-sensitive: base58 is.
+    """
+    if isinstance(value, str):
+        return value.lower() if value[:2] in ("0x", "0X") else value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + value.hex()
+    return None  # lists, dicts, ...: never in an allowlist
+
+
+class Allowlist:
+    """A precomputed set of values, matched with the comparison rules of _normalize()."""
+
+    def __init__(self, values: Sequence[Any]):
+        self.values: FrozenSet[Any] = frozenset(_normalize(value) for value in values) - {None}
+        hex_values = []
+        for value in self.values:
+            if value.startswith("0x"):
+                try:
+                    hex_values.append(bytes.fromhex(value[2:]))
+                except ValueError:
+                    pass
+        self.bytes_values: FrozenSet[bytes] = frozenset(hex_values)
+
+    def __contains__(self, value: Any) -> bool:
+        if isinstance(value, (bytes, bytearray)):
+            return bytes(value) in self.bytes_values
+        return _normalize(value) in self.values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _describe(value: Any) -> str:
+    return "0x" + value.hex() if isinstance(value, (bytes, bytearray)) else str(value)
+
+
+class _Compiler:
+    """Compiles rule documents against one config and a shared set of named allowlists."""
+
+    def __init__(self, config, allowlists: Dict[str, Sequence[Any]]):
+        self._placeholders = {
+            "$origin_vault": config.origin_vault,
+            "$zero_address": config.ZERO_ADDRESS,
+        }
+        self._raw_allowlists = allowlists
+
+    def _value(self, value: Any, where: str) -> Any:
+        if isinstance(value, str) and value.startswith("$"):
+            if value not in self._placeholders:
+                raise RuleDefinitionError(
+                    f"{where}: unknown placeholder {value!r} (known: {', '.join(sorted(self._placeholders))})"
+                )
+            return self._placeholders[value]
+        if not isinstance(value, str):
+            # A number would be compared by its decimal form, so e.g. an address YAML
+            # read as a hex integer would silently never match.
+            raise RuleDefinitionError(f"{where}: values must be strings, got {type(value).__name__} {value!r}")
+        return value
+
+    def _values(self, values: Any, where: str) -> List[Any]:
+        if not isinstance(values, list):
+            raise RuleDefinitionError(f"{where}: expected a list of values, got {type(values).__name__}")
+        resolved: List[Any] = []
+        for value in values:
+            if isinstance(value, str) and value.startswith("@"):
+                if value[1:] not in self._raw_allowlists:
+                    raise RuleDefinitionError(f"{where}: unknown allowlist {value!r}")
+                resolved.extend(self._value(item, f"allowlist {value}") for item in self._raw_allowlists[value[1:]])
+            else:
+                resolved.append(self._value(value, where))
+        return resolved
+
+    def compile_path(self, path: Any, where: str) -> Callable[[RuleContext], Union[Tuple[Any, ...], str]]:
+        """A getter returning the values at `path` (several with `*`, empty if missing), or a decode error string."""
+        if not isinstance(path, str) or not path:
+            raise RuleDefinitionError(f"{where}: path must be a non-empty string")
+        root, *segments = path.split(".")
+        if root not in PATH_ROOTS:
+            raise RuleDefinitionError(f"{where}: path {path!r} must start with one of {', '.join(PATH_ROOTS)}")
+        steps = tuple((segment, int(segment) if re.fullmatch(r"-?\d+", segment) else None) for segment in segments)
+
+        if root == "calldata":
+            if not segments or segments[0] not in CALLDATA_FIELDS:
+                raise RuleDefinitionError(
+                    f"{where}: calldata paths continue with one of {', '.join(CALLDATA_FIELDS)}, got {path!r}"
+                )
+            attribute, steps = CALLDATA_FIELDS[segments[0]], steps[1:]
+
+            def get(context: RuleContext):
+                if context.decode_error:
+                    return context.decode_error
+                if context.decoded_call is None:
+                    return ()
+                return tuple(_resolve(getattr(context.decoded_call, attribute), steps))
+        elif root == "eip712":
+            def get(context: RuleContext):
+                typed_message = context.view.typed_message
+                return () if typed_message is None else tuple(_resolve(typed_message, steps))
+        else:
+            def get(context: RuleContext):
+                return tuple(_resolve(context.transaction, steps))
+        return get
+
+    def compile_check(self, check: Any, where: str, on_missing: str) -> Check:
+        if not isinstance(check, dict):
+            raise RuleDefinitionError(f"{where}: a check must be a mapping")
+        unknown = set(check) - {"path", *OPERATORS}
+        if unknown:
+            raise RuleDefinitionError(f"{where}: unknown check keys {sorted(unknown)}")
+        operators = [operator for operator in OPERATORS if operator in check]
+        if len(operators) != 1:
+            raise RuleDefinitionError(f"{where}: a check needs exactly one of {', '.join(OPERATORS)}")
+        operator = operators[0]
+        path = check.get("path")
+        get = self.compile_path(path, where)
+
+        def missing() -> Optional[RuleResult]:
+            if on_missing == "skip":
+                return RuleResult.skipped(f"{path} not present")
+            return RuleResult.abort(f"{path} not present")
+
+        if operator == "equals_path":
+            get_expected = self.compile_path(check["equals_path"], where)
+
+            def evaluate(context: RuleContext) -> Optional[RuleResult]:
+                values, expected = get(context), get_expected(context)
+                for result in (values, expected):
+                    if isinstance(result, str):
+                        return RuleResult.abort(result)
+                if not values or len(expected) != 1:
+                    return missing()
+                expected_value = _normalize(expected[0])
+                for value in values:
+                    if _normalize(value) != expected_value:
+                        return RuleResult.abort(f"{path} {_describe(value)} does not match {check['equals_path']}")
+                return None
+            return evaluate
+
+        if operator == "equals":
+            allowlist = Allowlist([self._value(check["equals"], where)])
+        else:
+            allowlist = Allowlist(self._values(check[operator], where))
+        allowed_when_present = operator != "not_in"
+        message = "is not allowed" if allowed_when_present else "is blocked"
+
+        def evaluate(context: RuleContext) -> Optional[RuleResult]:
+            values = get(context)
+            if isinstance(values, str):
+                return RuleResult.abort(values)
+            if not values:
+                return missing()
+            for value in values:
+                if (value in allowlist) is not allowed_when_present:
+                    return RuleResult.abort(f"{path} {_describe(value)} {message}")
+            return None
+        return evaluate
+
+    def compile_rule(self, definition: Any, where: str) -> Rule:
+        if not isinstance(definition, dict):
+            raise RuleDefinitionError(f"{where}: a rule must be a mapping")
+        name = definition.get("name")
+        if not isinstance(name, str) or not _RULE_NAME.match(name):
+            raise RuleDefinitionError(f"{where}: rule needs a name made of letters, digits, '_', '.' or '-'")
+        where = f"{where} ({name})"
+        unknown = set(definition) - {"name", "description", "match", "checks", "on_missing"}
+        if unknown:
+            raise RuleDefinitionError(f"{where}: unknown keys {sorted(unknown)}")
+
+        match = definition.get("match") or {}
+        if not isinstance(match, dict) or set(match) - set(MATCH_KEYS):
+            raise RuleDefinitionError(f"{where}: match keys must be among {', '.join(MATCH_KEYS)}")
+        for key, values in match.items():
+            if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                raise RuleDefinitionError(f"{where}: match.{key} must be a list of strings")
+
+        on_missing = definition.get("on_missing", "abort")
+        if on_missing not in ("abort", "skip"):
+            raise RuleDefinitionError(f"{where}: on_missing must be 'abort' or 'skip', got {on_missing!r}")
+        checks = definition.get("checks")
+        if not isinstance(checks, list) or not checks:
+            raise RuleDefinitionError(f"{where}: checks must be a non-empty list")
+        compiled = tuple(
+            self.compile_check(check, f"{where} check {index}", on_missing) for index, check in enumerate(checks)
+        )
+        passed = f"{name}: all {len(compiled)} checks passed"
+
+        def rule(context: RuleContext) -> RuleResult:
+            for check in compiled:
+                result = check(context)
+                if result is not None:
+                    return result
+            return RuleResult.passed(passed)
+
+        rule.__name__ = rule.__qualname__ = name
+        rule.__doc__ = definition.get("description")
+        return applies_to(**match)(rule)
+
+
+def _resolve(value: Any, steps: Tuple[Tuple[str, Optional[int]], ...]) -> Iterator[Any]:
+    """The values at `steps` below `value`; nothing if the path doesn't exist."""
+    for position, (key, index) in enumerate(steps):
+        if key == "*":
+            if isinstance(value, (list, tuple)):
+                for item in value:
+                    yield from _resolve(item, steps[position + 1:])
+            elif isinstance(value, dict):
+                for item in value.values():
+                    yield from _resolve(item, steps[position + 1:])
+            return
+        if isinstance(value, dict):
+            value = value.get(key, _MISSING)
+        elif index is not None and isinstance(value, (list, tuple)) and -len(value) <= index < len(value):
+            value = value[index]
+        else:
+            return
+        if value is _MISSING:
+            return
+    if value is not None:
+        yield value
+
+
+def compile_rules(documents: Sequence[Dict], config, sources: Optional[Sequence[str]] = None) -> List[Rule]:
+    """Compile parsed rule documents (see the module docstring) into rule functions.
+
+    Allowlists are shared by all documents, so one file can define them and
+    others use them. Raises RuleDefinitionError on any invalid definition.
+    """
+    sources = sources or [f"document {index}" for index in range(len(documents))]
+    allowlists: Dict[str, Sequence[Any]] = {}
+    for document, source in zip(documents, sources):
+        if not isinstance(document, dict) or set(document) - {"allowlists", "rules", "settings"}:
+            raise RuleDefinitionError(f"{source}: expected a mapping with 'allowlists', 'rules' and/or 'settings'")
+        for name, values in (document.get("allowlists") or {}).items():
+            if name in allowlists:
+                raise RuleDefinitionError(f"{source}: allowlist {name!r} is defined twice")
+            if not isinstance(values, list):
+                raise RuleDefinitionError(f"{source}: allowlist {name!r} must be a list")
+            allowlists[name] = values
+
+    compiler = _Compiler(config, allowlists)
+    rules: List[Rule] = []
+    names = set()
+    for document, source in zip(documents, sources):
+        definitions = document.get("rules") or []
+        if not isinstance(definitions, list):
+            raise RuleDefinitionError(f"{source}: 'rules' must be a list")
+        for index, definition in enumerate(definitions):
+            rule = compiler.compile_rule(definition, f"{source} rule {index}")
+            if rule.__name__ in names:
+                raise RuleDefinitionError(f"{source}: rule name {rule.__name__!r} is used twice")
+            names.add(rule.__name__)
+            rules.append(rule)
+    return rules
+
+
+def rule_files(path: Union[str, Path]) -> List[Path]:
+    """The rule file itself, or every *.json/*.yaml/*.yml file of a directory, in name order."""
+    path = Path(path)
+    if path.is_dir():
+        return sorted(file for file in path.iterdir() if file.suffix in RULE_FILE_SUFFIXES)
+    return [path]
+
+
+def parse_rule_document(path: Path, text: Union[str, bytes]) -> Dict:
+    try:
+        if path.suffix == ".json":
+            return json.loads(text)
+        if yaml is None:
+            raise RuleDefinitionError(f"{path}: YAML rule files need the 'pyyaml' package (uv sync --extra yaml)")
+        return yaml.load(text, Loader=_RuleLoader) or {}
+    except (json.JSONDecodeError, getattr(yaml, "YAMLError", json.JSONDecodeError)) as error:
+        raise RuleDefinitionError(f"{path}: {error}") from error
+
+
+def load_rules(path: Union[str, Path], config) -> List[Rule]:
+    """Compile a rule file, or every *.json/*.yaml/*.yml file of a directory (in name order)."""
+    files = rule_files(path)
+    documents = [parse_rule_document(file, file.read_bytes()) for file in files]
+    rules = compile_rules(documents, config, [str(file) for file in files])
+    logger.info("Compiled %d declarative rules from %s", len(rules), path)
+    return rules
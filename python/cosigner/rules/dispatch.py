@@ -0,0 +1,137 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set
+
+if TYPE_CHECKING:
+    from .base import Rule, RuleContext
+
+
+@dataclass(frozen=True)
+class Applicability:
+    """Which transactions a rule applies to. Empty dimensions match anything.
+
+    A rule applies when every dimension it declares matches (AND), where a
+    dimension matches if any of its values does (OR).
+    """
+    transaction_types: FrozenSet[str] = frozenset()     # transaction["type"], e.g. "solana_transaction"
+    selectors: FrozenSet[str] = frozenset()             # lowercase "0x" + 4-byte calldata selector
+    programs: FrozenSet[str] = frozenset()              # Solana program id of any instruction
+    eip712_primary_types: FrozenSet[str] = frozenset()  # typed message primaryType
+    eip712_domains: FrozenSet[str] = frozenset()        # typed message domain name or verifyingContract
+
+    def is_unconditional(self) -> bool:
+        return not any(
+            (self.transaction_types, self.selectors, self.programs, self.eip712_primary_types, self.eip712_domains)
+        )
+
+
+def applies_to(
+    *,
+    transaction_types: Iterable[str] = (),
+    selectors: Iterable[str] = (),
+    programs: Iterable[str] = (),
+    eip712_primary_types: Iterable[str] = (),
+    eip712_domains: Iterable[str] = (),
+) -> Callable[["Rule"], "Rule"]:
+    """Declare which transactions a rule applies to, so the runner only calls it for those.
+
+        @applies_to(selectors=["0x07ed2379"])
+        def validate_oneinch_swap_receiver(context): ...
+
+    Rules without a declaration run on every transaction. The rule should still
+    check its own preconditions — the declaration only lets the runner skip it
+    without calling it.
+    """
+    applicability = Applicability(
+        transaction_types=frozenset(transaction_types),
+        selectors=frozenset(selector.lower() for selector in selectors),
+        programs=frozenset(programs),
+        eip712_primary_types=frozenset(eip712_primary_types),
+        eip712_domains=frozenset(_normalize_domain(domain) for domain in eip712_domains),
+    )
+
+    def decorator(rule: "Rule") -> "Rule":
+        rule.applicability = applicability  # type: ignore[attr-defined]
+        return rule
+
+    return decorator
+
+
+def get_applicability(rule: "Rule") -> Applicability:
+    return getattr(rule, "applicability", None) or Applicability()
+
+
+def _normalize_domain(domain: str) -> str:
+    # Contract addresses compare case-insensitively; domain names are matched as-is.
+    return domain.lower() if domain.startswith("0x") else domain
+
+
+class RuleIndex:
+    """Precomputed dispatch table from transaction features to the rules that apply.
+
+    Built once from the rule list; select() then costs a handful of dict lookups
+    per transaction, however many protocol-specific rules are registered.
+    """
+
+    def __init__(self, rules: Sequence["Rule"]):
+        self.rules: List["Rule"] = list(rules)
+        self._unconditional: List[int] = []
+        self._required_dimensions: Dict[int, int] = {}
+        self._by_type: Dict[str, List[int]] = defaultdict(list)
+        self._by_selector: Dict[str, List[int]] = defaultdict(list)
+        self._by_program: Dict[str, List[int]] = defaultdict(list)
+        self._by_primary_type: Dict[str, List[int]] = defaultdict(list)
+        self._by_domain: Dict[str, List[int]] = defaultdict(list)
+
+        for position, rule in enumerate(self.rules):
+            applicability = get_applicability(rule)
+            if applicability.is_unconditional():
+                self._unconditional.append(position)
+                continue
+            dimensions = (
+                (applicability.transaction_types, self._by_type),
+                (applicability.selectors, self._by_selector),
+                (applicability.programs, self._by_program),
+                (applicability.eip712_primary_types, self._by_primary_type),
+                (applicability.eip712_domains, self._by_domain),
+            )
+            self._required_dimensions[position] = sum(1 for values, _ in dimensions if values)
+            for values, table in dimensions:
+                for value in values:
+                    table[value].append(position)
+
+    def select(self, context: "RuleContext") -> List["Rule"]:
+        """The rules that apply to this transaction, in registration order."""
+        if not self._required_dimensions:
+            return list(self.rules)
+
+        view = context.view
+        hits: Dict[int, int] = defaultdict(int)
+
+        def match(table: Dict[str, List[int]], values: Iterable[Optional[str]]) -> None:
+            if not table:
+                return
+            matched: Set[int] = set()
+            for value in values:
+                if value is not None:
+                    matched.update(table.get(value, ()))
+            for position in matched:
+                hits[position] += 1
+
+        match(self._by_type, (view.transaction.get("type"),))
+        match(self._by_selector, (view.selector,))
+        match(self._by_program, view.program_ids)
+        if self._by_primary_type or self._by_domain:
+            typed_message = view.typed_message or {}
+            domain = typed_message.get("domain")
+            domain = domain if isinstance(domain, dict) else {}
+            match(self._by_primary_type, (typed_message.get("primaryType"),))
+            match(self._by_domain, (
+                domain.get("name"),
+                str(domain.get("verifyingContract") or "").lower() or None,
+            ))
+
+        selected = self._unconditional + [
+            position for position, matched in hits.items() if matched == self._required_dimensions[position]
+        ]
+        return [self.rules[position] for position in sorted(selected)]
@@ -1,19 +1,20 @@
 from .base import RuleContext, RuleResult
 from .calldata import ONEINCH_SWAP_V6_SELECTOR
+from .dispatch import applies_to
 
 # Index of dstReceiver in the swap desc struct:
 # (srcToken, dstToken, srcReceiver, dstReceiver, amount, minReturnAmount, flags)
 DST_RECEIVER_INDEX = 3
 
 
+@applies_to(selectors=[ONEINCH_SWAP_V6_SELECTOR])
 def validate_oneinch_swap_receiver(context: RuleContext) -> RuleResult:
     """1inch swaps must pay out to the transaction initiator, not a third party.
 
     Decodes the swap desc struct from calldata (see rules/calldata.py) and checks the
     nested dstReceiver field — something Fordefi Policy cannot inspect natively.
     """
-    hex_data = (context.transaction.get("hex_data") or "").lower()
-    if not hex_data.startswith(ONEINCH_SWAP_V6_SELECTOR):
+    if context.view.selector != ONEINCH_SWAP_V6_SELECTOR:
         return RuleResult.skipped("not a 1inch swap")
 
     if context.decode_error:
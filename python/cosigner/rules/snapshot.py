@@ -0,0 +1,158 @@
+"""Rule sets as immutable snapshots that can be swapped while the service runs.
+
+A RuleSnapshot bundles everything one evaluation needs: the dispatch index over
+the built-in and declarative rules, and the config the rules see (with any
+`settings` from the rule files applied, e.g. a new `origin_vault`). Nothing in a
+snapshot changes after it is built. A reload builds a complete new snapshot,
+validates it, and only then replaces `RuleReloader.current` with one reference
+assignment. Evaluations take `current` once at the start, so they never see a
+half-updated rule set, and the read path needs no locks.
+"""
+
+import asyncio
+import copy
+import hashlib
+import logging
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+from .base import Rule
+from .declarative import RuleDefinitionError, compile_rules, parse_rule_document, rule_files
+from .dispatch import RuleIndex
+
+logger = logging.getLogger("cosigner.rules")
+
+BUILTIN_VERSION = "builtin"
+SETTINGS_KEYS = ("origin_vault",)
+_EVM_ADDRESS = re.compile(r"^0x[0-9a-fA-F]{40}$")
+
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    version: str                 # content hash of the rule files, or "builtin" without RULES_PATH
+    index: RuleIndex
+    config: Any                  # the Config rules see, with the files' settings applied; treat as read-only
+    sources: Tuple[str, ...]     # rule files this snapshot was compiled from
+    loaded_at: float             # time.time() of the build
+
+
+def _apply_settings(config, documents: Sequence[Dict], sources: Sequence[str]):
+    settings: Dict[str, Any] = {}
+    for document, source in zip(documents, sources):
+        if not isinstance(document, dict):
+            raise RuleDefinitionError(f"{source}: expected a mapping with 'allowlists', 'rules' and/or 'settings'")
+        document_settings = document.get("settings") or {}
+        if not isinstance(document_settings, dict) or set(document_settings) - set(SETTINGS_KEYS):
+            raise RuleDefinitionError(f"{source}: settings keys must be among {', '.join(SETTINGS_KEYS)}")
+        for key, value in document_settings.items():
+            if key in settings:
+                raise RuleDefinitionError(f"{source}: setting {key!r} is defined in more than one file")
+            settings[key] = value
+    if not settings:
+        return config
+    origin_vault = settings.get("origin_vault")
+    if origin_vault is not None and not (isinstance(origin_vault, str) and _EVM_ADDRESS.match(origin_vault)):
+        raise RuleDefinitionError(f"settings.origin_vault {origin_vault!r} is not a hex EVM address")
+    snapshot_config = copy.copy(config)
+    for key, value in settings.items():
+        setattr(snapshot_config, key, value)
+    return snapshot_config
+
+
+def build_snapshot(builtin_rules: Sequence[Rule], config, rules_path: Optional[Union[str, Path]] = None) -> RuleSnapshot:
+    """Compile a complete snapshot; raises RuleDefinitionError (or OSError) if the files are invalid."""
+    if not rules_path:
+        return RuleSnapshot(BUILTIN_VERSION, RuleIndex(builtin_rules), config, (), time.time())
+    files = rule_files(rules_path)
+    # Hash and parse the same bytes, so the version always names what was compiled.
+    contents = [file.read_bytes() for file in files]
+    digest = hashlib.sha256()
+    for file, content in zip(files, contents):
+        digest.update(file.name.encode() + b"\0" + content + b"\0")
+    sources = [str(file) for file in files]
+    documents = [parse_rule_document(file, content) for file, content in zip(files, contents)]
+    snapshot_config = _apply_settings(config, documents, sources)
+    rules = compile_rules(documents, snapshot_config, sources)
+    return RuleSnapshot(
+        digest.hexdigest()[:12], RuleIndex(list(builtin_rules) + rules), snapshot_config, tuple(sources), time.time(),
+    )
+
+
+def _fingerprint(rules_path: Union[str, Path]) -> Fingerprint:
+    try:
+        files = rule_files(rules_path)
+        return tuple((str(file), file.stat().st_mtime_ns, file.stat().st_size) for file in files)
+    except OSError:
+        return ()  # mid-replace or gone; the reload reports it
+
+
+class RuleReloader:
+    """Holds the current RuleSnapshot and swaps in a new one when the rule files change.
+
+    The first snapshot is built in the constructor, so invalid files fail startup.
+    Later, a reload that fails validation is logged and leaves the current
+    snapshot in place; it is retried on every check until the files load.
+    With start(), the files are polled every `interval` seconds (a stat() per
+    file); call reload() to force one.
+    """
+
+    def __init__(self, builtin_rules: Sequence[Rule], config, rules_path: Optional[Union[str, Path]] = None):
+        self._builtin_rules = list(builtin_rules)
+        self._config = config
+        self._rules_path = rules_path
+        self._fingerprint = _fingerprint(rules_path) if rules_path else ()
+        self.current: RuleSnapshot = build_snapshot(self._builtin_rules, config, rules_path)
+        self._task: Optional["asyncio.Task[None]"] = None
+        logger.info(
+            "Loaded rules version %s: %d rules from %d file(s)",
+            self.current.version, len(self.current.index.rules), len(self.current.sources),
+        )
+
+    def reload(self) -> bool:
+        """Rebuild from the rule files; returns True if a new version was swapped in."""
+        # Taken before the build, so an edit made while compiling is picked up by the next check.
+        fingerprint = _fingerprint(self._rules_path) if self._rules_path else ()
+        try:
+            snapshot = build_snapshot(self._builtin_rules, self._config, self._rules_path)
+        except (RuleDefinitionError, OSError) as error:
+            logger.error("Rejected rule reload, keeping version %s: %s", self.current.version, error)
+            return False
+        self._fingerprint = fingerprint
+        if snapshot.version == self.current.version:
+            return False
+        previous, self.current = self.current, snapshot
+        logger.info(
+            "Swapped rules version %s -> %s: %d rules from %d file(s)",
+            previous.version, snapshot.version, len(snapshot.index.rules), len(snapshot.sources),
+        )
+        return True
+
+    def check(self) -> bool:
+        """Reload if any rule file was added, removed or modified since the last load."""
+        if not self._rules_path or _fingerprint(self._rules_path) == self._fingerprint:
+            return False
+        return self.reload()
+
+    def start(self, interval: float) -> None:
+        self._task = asyncio.create_task(self._watch(interval), name="rule-reloader")
+        logger.info("Watching %s for rule changes every %ss", self._rules_path, interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _watch(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # In a thread: compiling a large rule set shouldn't stall webhooks.
+                await asyncio.to_thread(self.check)
+            except Exception:
+                logger.exception("Rule reload check failed")
@@ -0,0 +1,500 @@
+"""Borsh decoding of Solana instructions — the Solana counterpart of rules/calldata.py.
+
+SOLANA_REGISTRY maps a program id and an instruction discriminator (the first
+8 bytes of the data for Anchor programs: sha256("global:<name>")[:8]) to the
+instruction's borsh argument layout and account names. Layouts are compiled
+into decoders when they are registered, either by hand or from an Anchor IDL
+(both the 0.30+ format and the older one with camelCase names).
+
+Decoding reads the instruction data in place through a memoryview: integers
+are unpacked at their offsets, and byte fields (pubkeys, [u8; N] arrays,
+bytes, Vec<u8>) come back as memoryview slices of the data, not copies.
+Compare them with bytes as usual; use b58encode() to turn a pubkey argument
+into an address string.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    from .view import SolanaInstruction
+
+logger = logging.getLogger("cosigner.rules")
+
+ANCHOR_DISCRIMINATOR_LENGTH = 8
+PUBKEY_LENGTH = 32
+_BASE58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+
+class IdlError(ValueError):
+    """An IDL or instruction layout that cannot be compiled into a decoder."""
+
+
+class BorshError(ValueError):
+    """Instruction data that does not match its layout."""
+
+
+# Reads one value at `offset` and returns it with the offset just past it.
+Decoder = Callable[[memoryview, int], Tuple[Any, int]]
+
+
+def b58encode(value: Union[bytes, memoryview]) -> str:
+    """Base58 (Bitcoin alphabet, as used for Solana addresses) of a byte string."""
+    data = bytes(value)
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = _BASE58_ALPHABET[remainder] + encoded
+    return "1" * (len(data) - len(data.lstrip(b"\0"))) + encoded
+
+
+def anchor_discriminator(name: str) -> bytes:
+    """Anchor's instruction discriminator, sha256("global:<snake_case name>")[:8]."""
+    snake_case = re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", name).lower()
+    return hashlib.sha256(f"global:{snake_case}".encode()).digest()[:ANCHOR_DISCRIMINATOR_LENGTH]
+
+
+def _check_length(buffer: memoryview, end: int) -> None:
+    if end > len(buffer):
+        raise BorshError(f"data ends at byte {len(buffer)}, expected at least {end}")
+
+
+# Fixed-size fields: struct format code of each number decoder, and length of each byte-view decoder.
+# A struct made only of these is decoded with a single unpack_from (see _packed_struct).
+_FORMATS: Dict[Decoder, str] = {}
+_VIEW_SIZES: Dict[Decoder, int] = {}
+
+
+def _fixed(fmt: str) -> Decoder:
+    unpack_from = struct.Struct(fmt).unpack_from
+    size = struct.calcsize(fmt)
+
+    def decode(buffer: memoryview, offset: int) -> Tuple[Any, int]:
+        _check_length(buffer, offset + size)
+        return unpack_from(buffer, offset)[0], offset + size
+    _FORMATS[decode] = fmt.lstrip("<")
+    return decode
+
+
+def _int128(signed: bool) -> Decoder:
+    def decode(buffer: memoryview, offset: int) -> Tuple[int, int]:
+        end = offset + 16
+        _check_length(buffer, end)
+        return int.from_bytes(buffer[offset:end], "little", signed=signed), end
+    return decode
+
+
+def _bytes_view(size: int) -> Decoder:
+    def decode(buffer: memoryview, offset: int) -> Tuple[memoryview, int]:
+        end = offset + size
+        _check_length(buffer, end)
+        return buffer[offset:end], end
+    _VIEW_SIZES[decode] = size
+    return decode
+
+
+_read_u8 = _fixed("<B")
+_read_u32 = _fixed("<I")
+
+
+def _read_bool(buffer: memoryview, offset: int) -> Tuple[bool, int]:
+    value, offset = _read_u8(buffer, offset)
+    if value > 1:
+        raise BorshError(f"invalid bool byte {value} at offset {offset - 1}")
+    return bool(value), offset
+
+
+def _read_length(buffer: memoryview, offset: int) -> Tuple[int, int]:
+    length, offset = _read_u32(buffer, offset)
+    # Every element takes at least a byte, so a longer prefix can only be corrupt data.
+    if length > len(buffer) - offset:
+        raise BorshError(f"length prefix {length} at offset {offset - 4} exceeds the remaining data")
+    return length, offset
+
+
+def _read_bytes(buffer: memoryview, offset: int) -> Tuple[memoryview, int]:
+    length, offset = _read_length(buffer, offset)
+    return buffer[offset:offset + length], offset + length
+
+
+def _read_string(buffer: memoryview, offset: int) -> Tuple[str, int]:
+    raw, offset = _read_bytes(buffer, offset)
+    try:
+        return str(raw, "utf-8"), offset
+    except UnicodeDecodeError as error:
+        raise BorshError(f"invalid UTF-8 string: {error}") from None
+
+
+_PRIMITIVES: Dict[str, Decoder] = {
+    "u8": _read_u8, "i8": _fixed("<b"),
+    "u16": _fixed("<H"), "i16": _fixed("<h"),
+    "u32": _read_u32, "i32": _fixed("<i"),
+    "u64": _fixed("<Q"), "i64": _fixed("<q"),
+    "u128": _int128(False), "i128": _int128(True),
+    "f32": _fixed("<f"), "f64": _fixed("<d"),
+    "bool": _read_bool,
+    "pubkey": _bytes_view(PUBKEY_LENGTH),
+    "publicKey": _bytes_view(PUBKEY_LENGTH),  # pre-0.30 IDLs
+    "bytes": _read_bytes,
+    "string": _read_string,
+}
+
+
+def _array(item: Decoder, count: int) -> Decoder:
+    def decode(buffer: memoryview, offset: int) -> Tuple[List[Any], int]:
+        values = []
+        for _ in range(count):
+            value, offset = item(buffer, offset)
+            values.append(value)
+        return values, offset
+    return decode
+
+
+def _vec(item: Decoder) -> Decoder:
+    def decode(buffer: memoryview, offset: int) -> Tuple[List[Any], int]:
+        count, offset = _read_length(buffer, offset)
+        return _array(item, count)(buffer, offset)
+    return decode
+
+
+def _option(item: Decoder, tag: Decoder) -> Decoder:
+    def decode(buffer: memoryview, offset: int) -> Tuple[Any, int]:
+        present, offset = tag(buffer, offset)
+        if present == 0:
+            return None, offset
+        if present != 1:
+            raise BorshError(f"invalid option tag {present} at offset {offset}")
+        return item(buffer, offset)
+    return decode
+
+
+def _packed_struct(fields: Sequence[Tuple[str, Decoder]]) -> Decoder:
+    # (name, index in the unpacked numbers or None for a byte view, start, end) per field
+    plan: List[Tuple[str, Optional[int], int, int]] = []
+    fmt = "<"
+    numbers = 0
+    for name, field in fields:
+        start = struct.calcsize(fmt)
+        if field in _VIEW_SIZES:
+            fmt += f"{_VIEW_SIZES[field]}x"
+            plan.append((name, None, start, struct.calcsize(fmt)))
+        else:
+            fmt += _FORMATS[field]
+            plan.append((name, numbers, start, struct.calcsize(fmt)))
+            numbers += 1
+    unpack_from = struct.Struct(fmt).unpack_from
+    size = struct.calcsize(fmt)
+
+    def decode(buffer: memoryview, offset: int) -> Tuple[Dict[str, Any], int]:
+        _check_length(buffer, offset + size)
+        unpacked = unpack_from(buffer, offset)
+        values = {}
+        for name, number, start, end in plan:
+            values[name] = unpacked[number] if number is not None else buffer[offset + start:offset + end]
+        return values, offset + size
+    return decode
+
+
+def _struct(fields: Sequence[Tuple[str, Decoder]]) -> Decoder:
+    fields = tuple(fields)
+    if fields and all(field in _FORMATS or field in _VIEW_SIZES for _, field in fields):
+        return _packed_struct(fields)
+
+    def decode(buffer: memoryview, offset: int) -> Tuple[Dict[str, Any], int]:
+        values = {}
+        for name, field in fields:
+            values[name], offset = field(buffer, offset)
+        return values, offset
+    return decode
+
+
+def _tuple(items: Sequence[Decoder]) -> Decoder:
+    items = tuple(items)
+
+    def decode(buffer: memoryview, offset: int) -> Tuple[Tuple[Any, ...], int]:
+        values = []
+        for item in items:
+            value, offset = item(buffer, offset)
+            values.append(value)
+        return tuple(values), offset
+    return decode
+
+
+def _enum(variants: Sequence[Tuple[str, Optional[Decoder]]]) -> Decoder:
+    variants = tuple(variants)
+
+    def decode(buffer: memoryview, offset: int) -> Tuple[Any, int]:
+        index, offset = _read_u8(buffer, offset)
+        if index >= len(variants):
+            raise BorshError(f"enum variant {index} out of range ({len(variants)} variants)")
+        name, fields = variants[index]
+        if fields is None:
+            return name, offset  # unit variant
+        value, offset = fields(buffer, offset)
+        return {name: value}, offset
+    return decode
+
+
+class _LayoutCompiler:
+    """Compiles IDL type expressions into decoders, resolving `defined` types from one IDL's `types`."""
+
+    def __init__(self, types: Mapping[str, Dict]):
+        self._types = types
+        self._defined: Dict[str, Decoder] = {}
+        self._compiling: List[str] = []
+
+    def compile(self, type_expr: Any) -> Decoder:
+        if isinstance(type_expr, str):
+            if type_expr in _PRIMITIVES:
+                return _PRIMITIVES[type_expr]
+            raise IdlError(f"unsupported type {type_expr!r}")
+        if not isinstance(type_expr, dict) or len(type_expr) != 1:
+            raise IdlError(f"invalid type {type_expr!r}")
+        (kind, argument), = type_expr.items()
+        if kind == "array":
+            item_type, count = argument
+            if not isinstance(count, int):
+                raise IdlError(f"unsupported array length {count!r} (generic lengths aren't supported)")
+            if item_type == "u8":
+                return _bytes_view(count)
+            return _array(self.compile(item_type), count)
+        if kind == "vec":
+            return _read_bytes if argument == "u8" else _vec(self.compile(argument))
+        if kind == "option":
+            return _option(self.compile(argument), _read_u8)
+        if kind == "coption":
+            return _option(self.compile(argument), _read_u32)
+        if kind == "defined":
+            if isinstance(argument, dict):
+                if argument.get("generics"):
+                    raise IdlError(f"generic type {argument['name']!r} is not supported")
+                argument = argument["name"]
+            return self._compile_defined(argument)
+        raise IdlError(f"unsupported type {type_expr!r}")
+
+    def compile_fields(self, fields: Sequence[Any]) -> Decoder:
+        # Named fields ({"name", "type"}) decode to a dict; tuple-struct fields (bare types) to a tuple.
+        if fields and all(isinstance(field, dict) and "name" in field for field in fields):
+            return _struct([(field["name"], self.compile(field["type"])) for field in fields])
+        return _tuple([self.compile(field) for field in fields])
+
+    def _compile_defined(self, name: str) -> Decoder:
+        if name in self._defined:
+            return self._defined[name]
+        if name not in self._types:
+            raise IdlError(f"type {name!r} is not defined in the IDL")
+        if name in self._compiling:
+            raise IdlError(f"recursive type {' -> '.join(self._compiling + [name])} is not supported")
+        self._compiling.append(name)
+        try:
+            definition = self._types[name]
+            kind = definition.get("kind")
+            if kind == "struct":
+                decoder = self.compile_fields(definition.get("fields") or [])
+            elif kind == "enum":
+                decoder = _enum([
+                    (variant["name"], self.compile_fields(variant["fields"]) if variant.get("fields") else None)
+                    for variant in definition.get("variants") or []
+                ])
+            elif kind == "type":
+                decoder = self.compile(definition["alias"])
+            else:
+                raise IdlError(f"type {name!r} has unsupported kind {kind!r}")
+        finally:
+            self._compiling.pop()
+        self._defined[name] = decoder
+        return decoder
+
+
+def _account_names(accounts: Sequence[Dict], prefix: str = "") -> Tuple[str, ...]:
+    # Composite account groups ({"name", "accounts": [...]}) are flattened in order, as Anchor does.
+    names: List[str] = []
+    for account in accounts:
+        name = prefix + account["name"]
+        if "accounts" in account:
+            names.extend(_account_names(account["accounts"], prefix=f"{name}."))
+        else:
+            names.append(name)
+    return tuple(names)
+
+
+@dataclass(frozen=True)
+class InstructionLayout:
+    name: str
+    discriminator: bytes
+    args: Tuple[Tuple[str, Any], ...] = ()  # (name, IDL type) pairs, e.g. ("amount", "u64")
+    accounts: Tuple[str, ...] = ()          # account names in the order the instruction lists them
+
+
+@dataclass(frozen=True)
+class DecodedInstruction:
+    index: int                       # position of the instruction in the transaction
+    program: str
+    name: str                        # "" when `error` is set
+    args: Dict[str, Any]             # byte fields are memoryview slices of the instruction data
+    accounts: Dict[str, Optional[str]]              # account name -> address, for the accounts present
+    remaining_accounts: Tuple[Optional[str], ...] = ()  # addresses past the named accounts
+    error: Optional[str] = None      # set when the program is registered but the data doesn't decode
+
+
+class SolanaRegistry:
+    """Solana instructions the CoSigner knows how to decode, with their decoders precompiled.
+
+    Register layouts with register(), or whole programs with load_idl() /
+    load_idl_file() / load_idl_directory(). decode() then costs a dict lookup
+    on the discriminator and the reads its layout needs.
+    """
+
+    def __init__(self):
+        # program id -> discriminator -> (layout, decoder)
+        self._programs: Dict[str, Dict[bytes, Tuple[InstructionLayout, Decoder]]] = {}
+        self._discriminator_lengths: Dict[str, Tuple[int, ...]] = {}
+
+    def register(self, program_id: str, layout: InstructionLayout, types: Optional[Mapping[str, Dict]] = None) -> None:
+        """Compile and register one instruction; `types` resolves its `defined` argument types."""
+        self._add(program_id, layout, _LayoutCompiler(types or {}))
+
+    def _add(self, program_id: str, layout: InstructionLayout, compiler: _LayoutCompiler) -> None:
+        decoder = compiler.compile_fields([{"name": name, "type": type_expr} for name, type_expr in layout.args])
+        self._programs.setdefault(program_id, {})[bytes(layout.discriminator)] = (layout, decoder)
+        lengths = {len(discriminator) for discriminator in self._programs[program_id]}
+        self._discriminator_lengths[program_id] = tuple(sorted(lengths, reverse=True))
+
+    def __contains__(self, program_id: object) -> bool:
+        return program_id in self._programs
+
+    def __len__(self) -> int:
+        return sum(len(layouts) for layouts in self._programs.values())
+
+    def get(self, program_id: str, name: str) -> Optional[InstructionLayout]:
+        for layout, _ in self._programs.get(program_id, {}).values():
+            if layout.name == name:
+                return layout
+        return None
+
+    def load_idl(self, idl: Dict, program_id: Optional[str] = None) -> int:
+        """Register every instruction of an Anchor IDL. Returns how many.
+
+        The program id is taken from the IDL ("address", or "metadata.address"
+        in older IDLs) unless given. Instructions without an explicit
+        "discriminator" get Anchor's default one.
+        """
+        program_id = program_id or idl.get("address") or (idl.get("metadata") or {}).get("address")
+        if not program_id:
+            raise IdlError("IDL has no program address; pass program_id")
+        # One compiler for the whole IDL, so types shared by several instructions compile once.
+        compiler = _LayoutCompiler({definition["name"]: definition["type"] for definition in idl.get("types") or []})
+        count = 0
+        for instruction in idl.get("instructions") or []:
+            discriminator = instruction.get("discriminator")
+            try:
+                self._add(program_id, InstructionLayout(
+                    name=instruction["name"],
+                    discriminator=bytes(discriminator) if discriminator else anchor_discriminator(instruction["name"]),
+                    args=tuple((arg["name"], arg["type"]) for arg in instruction.get("args") or []),
+                    accounts=_account_names(instruction.get("accounts") or []),
+                ), compiler)
+            except (KeyError, TypeError, ValueError) as error:
+                raise IdlError(f"instruction {instruction.get('name')!r}: {error}") from error
+            count += 1
+        return count
+
+    def load_idl_file(self, path: Union[str, Path]) -> int:
+        with open(path) as file:
+            return self.load_idl(json.load(file))
+
+    def load_idl_directory(self, directory: Union[str, Path]) -> int:
+        count = sum(self.load_idl_file(path) for path in sorted(Path(directory).glob("*.json")))
+        logger.info(
+            "Loaded %d Solana instruction layouts from %s (%d programs registered)", count, directory, len(self._programs),
+        )
+        return count
+
+    def decode(
+        self, instruction: "SolanaInstruction", account_addresses: Sequence[Optional[str]] = (), index: int = 0,
+    ) -> Optional[DecodedInstruction]:
+        """Decode one instruction; None if its program isn't registered.
+
+        A registered program whose data doesn't decode (unknown discriminator,
+        truncated or trailing data, an out-of-range account index) yields a
+        DecodedInstruction with `error` set — rules must treat it as a failure.
+        """
+        layouts = self._programs.get(instruction.program)
+        if layouts is None:
+            return None
+
+        def failed(error: str) -> DecodedInstruction:
+            return DecodedInstruction(index, instruction.program, "", {}, {}, error=error)
+
+        data = memoryview(instruction.data)
+        for length in self._discriminator_lengths[instruction.program]:
+            # A read-only memoryview hashes and compares like bytes, so the lookup doesn't copy.
+            entry = layouts.get(data[:length])
+            if entry is not None:
+                break
+        else:
+            return failed(f"unknown instruction (discriminator {data[:ANCHOR_DISCRIMINATOR_LENGTH].hex()})")
+        layout, decoder = entry
+        try:
+            args, end = decoder(data, len(layout.discriminator))
+        except (BorshError, struct.error) as error:
+            return failed(f"failed to decode {layout.name}: {error}")
+        if end != len(data):
+            return failed(f"failed to decode {layout.name}: {len(data) - end} trailing bytes")
+
+        account_indexes = instruction.account_indexes
+        if account_indexes and not 0 <= min(account_indexes) <= max(account_indexes) < len(account_addresses):
+            bad = next(i for i in account_indexes if not 0 <= i < len(account_addresses))
+            return failed(f"{layout.name} account index {bad} is out of range")
+        addresses = [account_addresses[account_index] for account_index in account_indexes]
+        accounts = dict(zip(layout.accounts, addresses))
+        return DecodedInstruction(
+            index, instruction.program, layout.name, args, accounts, tuple(addresses[len(layout.accounts):]),
+        )
+
+
+# Solana instructions the CoSigner knows how to decode. To validate a new program,
+# load its Anchor IDL (see IDL_DIR) or register its layouts here, then read the
+# decoded instructions from your rule via context.decoded_instructions.
+SOLANA_REGISTRY = SolanaRegistry()
+
+# Circle CCTP V2 TokenMessengerMinter program on Solana mainnet.
+CCTP_V2_TOKEN_MESSENGER = "CCTPV2vPZJS2u2BBsUoscuikbYjnpFmbFsvVuJdgUMQe"
+
+# Anchor instruction discriminator: sha256(b"global:deposit_for_burn")[:8]
+DEPOSIT_FOR_BURN_DISCRIMINATOR = bytes.fromhex("d73c3d2e723780b0")
+
+# The subset of the program's IDL the CCTP rule needs: depositForBurn, its params
+# struct, and its accounts (DepositForBurnContext order).
+SOLANA_REGISTRY.load_idl({
+    "address": CCTP_V2_TOKEN_MESSENGER,
+    "instructions": [{
+        "name": "deposit_for_burn",
+        "discriminator": list(DEPOSIT_FOR_BURN_DISCRIMINATOR),
+        "accounts": [{"name": name} for name in (
+            "owner", "event_rent_payer", "sender_authority_pda", "burn_token_account", "denylist_account",
+            "message_transmitter", "token_messenger", "remote_token_messenger", "token_minter", "local_token",
+            "burn_token_mint", "message_sent_event_data", "message_transmitter_program",
+            "token_messenger_minter_program", "token_program", "system_program", "event_authority", "program",
+        )],
+        "args": [{"name": "params", "type": {"defined": {"name": "DepositForBurnParams"}}}],
+    }],
+    "types": [{
+        "name": "DepositForBurnParams",
+        "type": {"kind": "struct", "fields": [
+            {"name": "amount", "type": "u64"},
+            {"name": "destination_domain", "type": "u32"},
+            {"name": "mint_recipient", "type": "pubkey"},
+            {"name": "destination_caller", "type": "pubkey"},
+            {"name": "max_fee", "type": "u64"},
+            {"name": "min_finality_threshold", "type": "u32"},
+        ]},
+    }],
+})
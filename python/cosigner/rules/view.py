@@ -0,0 +1,140 @@
+import base64
+import json
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from .solana import SOLANA_REGISTRY, DecodedInstruction
+
+
+@dataclass(frozen=True)
+class SolanaInstruction:
+    program: str                       # program id (base58)
+    data: bytes                        # instruction data, base64-decoded
+    account_indexes: Tuple[int, ...]   # indexes into the transaction's `accounts`
+
+
+def get_vault_address(transaction: Dict) -> str:
+    """Resolve the address of the vault that signs this transaction."""
+    from_field = transaction.get("from") or {}
+    vault = from_field.get("vault") or {}
+    if vault.get("address"):
+        return vault["address"]
+    managed = transaction.get("managed_transaction_data") or {}
+    managed_vault = managed.get("vault") or {}
+    if managed_vault.get("address"):
+        return managed_vault["address"]
+    return from_field.get("address") or ""
+
+
+def _evm_address_bytes(address: str) -> Optional[bytes]:
+    try:
+        return bytes.fromhex(address.removeprefix("0x"))
+    except ValueError:
+        return None  # not a hex address (e.g. a Solana vault)
+
+
+class TransactionView:
+    """Read-only view of one transaction whose derived values are computed at most once.
+
+    Rules share a single view per evaluation (`context.view`), so parsing the
+    EIP-712 payload, decoding multi-hundred-KB calldata from hex, or base64-decoding
+    Solana instructions happens once however many rules read the result.
+    Properties are computed lazily on first access.
+    """
+
+    def __init__(self, transaction: Dict, origin_vault: str):
+        object.__setattr__(self, "transaction", transaction)
+        object.__setattr__(self, "origin_vault", origin_vault)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"TransactionView is read-only (cannot set {name!r})")
+
+    @cached_property
+    def typed_message(self) -> Optional[Dict]:
+        """The transaction's raw_data parsed as JSON (EIP-712 payloads), or None.
+
+        raw_data also carries non-JSON personal_sign messages, so unparseable
+        content is not an error — it just means no EIP-712 payload.
+        """
+        raw_data = self.transaction.get("raw_data")
+        if not raw_data:
+            return None
+        try:
+            parsed = json.loads(raw_data)
+        except (json.JSONDecodeError, TypeError):
+            return None
+        return parsed if isinstance(parsed, dict) else None
+
+    @cached_property
+    def hex_data(self) -> str:
+        return self.transaction.get("hex_data") or ""
+
+    @cached_property
+    def selector(self) -> str:
+        """Lowercase "0x"-prefixed 4-byte selector, or "" when there is no calldata."""
+        return self.hex_data[:10].lower() if len(self.hex_data) >= 10 else ""
+
+    @cached_property
+    def calldata(self) -> Optional[bytes]:
+        """The calldata as bytes (selector included), or None if hex_data is not valid hex."""
+        try:
+            return bytes.fromhex(self.hex_data.removeprefix("0x"))
+        except ValueError:
+            return None
+
+    @cached_property
+    def solana_instructions(self) -> Tuple[SolanaInstruction, ...]:
+        return tuple(
+            SolanaInstruction(
+                program=(instruction.get("program") or {}).get("address") or "",
+                data=base64.b64decode(instruction.get("data") or ""),
+                account_indexes=tuple(instruction.get("account_indexes") or ()),
+            )
+            for instruction in self.transaction.get("instructions") or []
+        )
+
+    @cached_property
+    def decoded_instructions(self) -> Tuple[DecodedInstruction, ...]:
+        """Every instruction of a program in SOLANA_REGISTRY, borsh-decoded, in transaction order.
+
+        Instructions of unregistered programs are left out; ones that don't
+        decode are included with `error` set.
+        """
+        decoded = (
+            SOLANA_REGISTRY.decode(instruction, self.account_addresses, index)
+            for index, instruction in enumerate(self.solana_instructions)
+        )
+        return tuple(instruction for instruction in decoded if instruction is not None)
+
+    @cached_property
+    def program_ids(self) -> FrozenSet[str]:
+        # Read from the raw instructions so dispatch doesn't have to decode instruction data.
+        return frozenset(
+            (instruction.get("program") or {}).get("address")
+            for instruction in self.transaction.get("instructions") or []
+        ) - {None}
+
+    @cached_property
+    def account_addresses(self) -> Tuple[Optional[str], ...]:
+        return tuple(
+            (account.get("address") or {}).get("address")
+            for account in self.transaction.get("accounts") or []
+        )
+
+    @cached_property
+    def vault_address(self) -> str:
+        return get_vault_address(self.transaction)
+
+    @cached_property
+    def vault_address_bytes(self) -> Optional[bytes]:
+        """The signing vault's EVM address as 20 bytes, or None for non-EVM vaults."""
+        return _evm_address_bytes(self.vault_address) if self.vault_address else None
+
+    @cached_property
+    def origin_vault_bytes(self) -> bytes:
+        """The configured ORIGIN_VAULT as 20 bytes."""
+        address = _evm_address_bytes(self.origin_vault)
+        if address is None:
+            raise ValueError(f"ORIGIN_VAULT {self.origin_vault!r} is not a hex EVM address")
+        return address
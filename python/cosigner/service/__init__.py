@@ -0,0 +1,7 @@
+from .audit_log import JsonLinesFormatter, QueueLogHandler
+from .dedupe import DecisionStore, InMemoryDecisionStore, WebhookDeduplicator
+from .journal import DecisionJournal
+from .metrics import Counter, Gauge, Histogram, MetricsRegistry
+from .shared_store import RedisDecisionStore, SharedDecisionStore, SqliteDecisionStore
+from .sweep import SweepResult, TransactionSweeper
+from .workers import DecisionWorkerPool, QueueFullError
@@ -0,0 +1,106 @@
+import json
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Sequence
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`.
+_STANDARD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, plus exc and any `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        return json.dumps(entry, default=str)
+
+
+class _BlockingSentinelListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # The base class uses put_nowait, which raises on a full bounded queue.
+        self.queue.put(self._sentinel)
+
+
+class QueueLogHandler(QueueHandler):
+    """Hands records to a background thread that writes them to the real handlers.
+
+    Callers (the event loop included) only pay for a queue put; file and console
+    I/O happen on the listener thread, so a slow disk never stalls a webhook.
+    The queue holds at most `max_records`: when it is full, callers block until
+    the writer catches up rather than dropping lines, so the audit trail stays
+    complete (`blocked` counts how often that happened). close() — called from
+    the app's shutdown and by logging.shutdown() at exit — writes out everything
+    still queued; records logged afterwards are written synchronously.
+    """
+
+    def __init__(self, handlers: Sequence[logging.Handler], max_records: int = 10000):
+        super().__init__(queue.Queue(maxsize=max_records))
+        self.targets = list(handlers)
+        self.blocked = 0
+        self._running = False
+        self._stop_lock = threading.Lock()
+        self._listener = _BlockingSentinelListener(self.queue, *self.targets, respect_handler_level=True)
+
+    def start(self) -> None:
+        with self._stop_lock:
+            if not self._running:
+                self._listener.start()
+                self._running = True
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args into the message and render the traceback now, on the caller's
+        # thread, but keep the traceback in exc_text so the formatter can place it.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if not self._running:
+            self._write(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.blocked += 1
+            self.queue.put(record)
+
+    def _write(self, record: logging.LogRecord) -> None:
+        for handler in self.targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def flush(self) -> None:
+        if self._running:
+            self.queue.join()
+        for handler in self.targets:
+            handler.flush()
+
+    def close(self) -> None:
+        with self._stop_lock:
+            if self._running:
+                # Under the handler lock, so no emit() is mid-way through enqueueing:
+                # everything already queued precedes the sentinel and gets written.
+                with self.lock:
+                    self._running = False
+                self._listener.stop()
+        for handler in self.targets:
+            handler.flush()
+        super().close()
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Protocol, Tuple
+
+logger = logging.getLogger("cosigner.dedupe")
+
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_LEASE_SECONDS = 60.0
+
+
+class DecisionStore(Protocol):
+    """Where recent decisions are cached. Implement this to share them across processes."""
+
+    async def get(self, key: str) -> Optional[Dict]:
+        ...
+
+    async def set(self, key: str, decision: Dict, ttl: float) -> None:
+        ...
+
+
+class InMemoryDecisionStore:
+    """Process-local decision cache with per-entry expiry and a size bound (oldest evicted first)."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, clock: Callable[[], float] = time.monotonic):
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._clock = clock
+
+    async def get(self, key: str) -> Optional[Dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, decision = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        return decision
+
+    async def set(self, key: str, decision: Dict, ttl: float) -> None:
+        self._entries[key] = (self._clock() + ttl, decision)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+class WebhookDeduplicator:
+    """Collapses repeated webhook deliveries for the same transaction onto one evaluation.
+
+    Fordefi retries webhooks with backoff, so the same transaction can arrive many
+    times, sometimes concurrently. Deliveries that arrive while an evaluation is in
+    flight await that evaluation instead of starting another; once it completes,
+    its decision is cached for `ttl` seconds and returned to later retries without
+    another API round-trip. Failures are never cached, so a retry after an error
+    evaluates again.
+
+    With a store that also hands out leases (service.SharedDecisionStore), this
+    extends across worker processes: the worker holding the lease evaluates, and
+    the others poll the store for its decision instead of evaluating as well. A
+    lease is released when its evaluation fails and otherwise expires after
+    `lease` seconds (so a crashed worker can't block a transaction for longer).
+    """
+
+    def __init__(
+        self,
+        store: Optional[DecisionStore] = None,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        lease: float = DEFAULT_LEASE_SECONDS,
+        poll_interval: float = 0.05,
+    ):
+        self._store = store if store is not None else InMemoryDecisionStore()
+        self._ttl = ttl
+        self._lease = lease
+        self._poll_interval = poll_interval
+        self._shared = hasattr(self._store, "claim")
+        self._owner = uuid.uuid4().hex  # this process, as a lease holder
+        self._in_flight: Dict[str, "asyncio.Task[Dict]"] = {}
+
+    async def run(self, key: str, evaluate: Callable[[], Awaitable[Dict]]) -> Dict:
+        cached = await self._store.get(key)
+        if cached is not None:
+            logger.info("Returning cached decision for %s", key)
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._evaluate_and_cache(key, evaluate))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            logger.info("Joining in-flight evaluation for %s", key)
+        # Shield the shared evaluation so one delivery's disconnect doesn't cancel it for the others.
+        return await asyncio.shield(task)
+
+    async def _evaluate_and_cache(self, key: str, evaluate: Callable[[], Awaitable[Dict]]) -> Dict:
+        if self._shared:
+            decision = await self._wait_for_lease(key)
+            if decision is not None:
+                return decision
+        try:
+            decision = await evaluate()
+        except Exception:
+            if self._shared:
+                await self._store.release(key, self._owner)  # let the next retry, on any worker, evaluate
+            raise
+        await self._store.set(key, decision, self._ttl)
+        if self._shared:
+            await self._store.release(key, self._owner)
+        return decision
+
+    async def _wait_for_lease(self, key: str) -> Optional[Dict]:
+        """Take the lease for `key`, or return the decision another worker made while holding it."""
+        waiting = False
+        while not await self._store.claim(key, self._owner, self._lease):
+            if not waiting:
+                logger.info("Waiting for another worker's evaluation of %s", key)
+                waiting = True
+            await asyncio.sleep(self._poll_interval)
+            decision = await self._store.get(key)
+            if decision is not None:
+                return decision
+        if waiting:
+            # The other evaluation failed or its lease expired; the decision may have landed just before.
+            decision = await self._store.get(key)
+            if decision is not None:
+                await self._store.release(key, self._owner)
+                return decision
+        return None
@@ -0,0 +1,302 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional: `uv sync --extra parquet` for Parquet rollups; CSV always works
+    pyarrow = None
+
+logger = logging.getLogger("cosigner.journal")
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_SECONDS = 1.0
+DEFAULT_ROLLUP_SECONDS = 3600.0
+DEFAULT_MAX_BUFFERED = 100_000
+ROLLUP_FORMATS = ("csv", "parquet", "none")
+# Columns of the rollup files, in order; `rules` holds the per-rule outcomes (JSON text in CSV).
+ROLLUP_COLUMNS = (
+    "ts", "transaction_id", "decision", "reason", "rules_version", "transaction_type", "chain", "vault",
+    "evaluation_ms", "rules",
+)
+# A rollup lock older than this is left over from a worker that died mid-rollup, and is taken over.
+STALE_LOCK_SECONDS = 600.0
+_FILE_PREFIX = "decisions-"
+
+
+def _timestamp(seconds: float) -> str:
+    # Fixed width and always UTC, so timestamps compare correctly as strings.
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="milliseconds")
+
+
+def _file_day(path: Path) -> Optional[date]:
+    try:
+        return date.fromisoformat(path.stem[len(_FILE_PREFIX):])
+    except ValueError:
+        return None
+
+
+class DecisionJournal:
+    """Append-only journal of every decision, one JSON record per evaluation.
+
+    record() only appends to an in-memory buffer; a background task writes the
+    buffer out every `flush_interval` seconds, or as soon as `batch_size`
+    records are waiting. Records go to one JSONL file per UTC day
+    (decisions-2026-07-03.jsonl), each batch in a single append, so several
+    worker processes can share the directory. If a write fails the batch stays
+    buffered and is retried; past `max_buffered` records the oldest are dropped
+    (and counted in `dropped`) rather than exhausting memory.
+
+    Every `rollup_interval` seconds, finished days whose JSONL has no up-to-date
+    rollup are also written as CSV or Parquet (decisions-2026-07-03.csv) for
+    loading into a warehouse or spreadsheet. A lock file per rollup keeps
+    workers sharing the directory from writing the same day at once. The JSONL
+    files stay the source of truth; query() streams from them, reading only the
+    days in range.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        rollup: str = "csv",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_SECONDS,
+        rollup_interval: float = DEFAULT_ROLLUP_SECONDS,
+        max_buffered: int = DEFAULT_MAX_BUFFERED,
+        clock=time.time,
+    ):
+        if rollup not in ROLLUP_FORMATS:
+            raise ValueError(f"rollup must be one of {', '.join(ROLLUP_FORMATS)}, got {rollup!r}")
+        if rollup == "parquet" and pyarrow is None:
+            raise RuntimeError("Parquet rollups need the 'pyarrow' package (uv sync --extra parquet)")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.rollup_format = rollup
+        self.dropped = 0
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._rollup_interval = rollup_interval
+        self._max_buffered = max_buffered
+        self._clock = clock
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Queue one record for writing; a "ts" (UTC, ISO 8601) is added if missing. Never blocks."""
+        if "ts" not in entry:
+            entry = {"ts": _timestamp(self._clock()), **entry}
+        self._buffer.append(entry)
+        if len(self._buffer) > self._max_buffered:
+            excess = len(self._buffer) - self._max_buffered
+            del self._buffer[:excess]
+            self.dropped += excess
+            logger.error("Decision journal buffer full, dropped %d oldest record(s)", excess)
+        if len(self._buffer) >= self._batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """Write out everything buffered; returns how many records were written."""
+        async with self._flush_lock:
+            batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                await asyncio.to_thread(self._append, batch)
+            except OSError as error:
+                self._buffer[:0] = batch  # keep them, in order, for the next flush
+                logger.error("Failed to write %d decision journal record(s), will retry: %s", len(batch), error)
+                return 0
+            return len(batch)
+
+    def _append(self, batch: List[Dict[str, Any]]) -> None:
+        lines_by_day: Dict[str, List[str]] = {}
+        for entry in batch:
+            lines_by_day.setdefault(entry["ts"][:10], []).append(json.dumps(entry, separators=(",", ":"), default=str))
+        for day, lines in lines_by_day.items():
+            data = ("\n".join(lines) + "\n").encode()
+            # One O_APPEND write per batch: lines from other processes can't land inside it.
+            fd = os.open(self.directory / f"{_FILE_PREFIX}{day}.jsonl", os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+            try:
+                written = 0
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+            finally:
+                os.close(fd)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="decision-journal")
+        logger.info(
+            "Writing the decision journal to %s (rollups: %s)", self.directory.resolve(), self.rollup_format,
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._buffer:
+            logger.error("Decision journal closed with %d unwritten record(s)", len(self._buffer))
+
+    async def _run(self) -> None:
+        next_rollup = self._clock()  # right away: catches up on days finished while the service was down
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if self.rollup_format != "none" and self._clock() >= next_rollup:
+                next_rollup = self._clock() + self._rollup_interval
+                try:
+                    await asyncio.to_thread(self.rollup)
+                except Exception:
+                    logger.exception("Decision journal rollup failed")
+
+    def _journal_files(self, since: Optional[date] = None, until: Optional[date] = None) -> List[Tuple[date, Path]]:
+        files = []
+        for path in self.directory.glob(f"{_FILE_PREFIX}*.jsonl"):
+            day = _file_day(path)
+            if day is not None and (since is None or day >= since) and (until is None or day <= until):
+                files.append((day, path))
+        return sorted(files)
+
+    def rollup(self) -> List[Path]:
+        """Write CSV/Parquet rollups of finished days that lack an up-to-date one; returns the files written."""
+        if self.rollup_format == "none":
+            return []
+        today = datetime.fromtimestamp(self._clock(), timezone.utc).date()
+        written = []
+        for day, source in self._journal_files():
+            target = source.with_suffix(f".{self.rollup_format}")
+            # Re-done if records were appended after the last rollup (e.g. a late flush just after midnight).
+            if day >= today or (target.exists() and target.stat().st_mtime >= source.stat().st_mtime):
+                continue
+            if self._rollup_day(day, source, target):
+                written.append(target)
+        return written
+
+    def _rollup_day(self, day: date, source: Path, target: Path) -> bool:
+        """Roll up one day under an exclusive lock file; False if another worker holds it or just did it."""
+        lock = target.with_name(target.name + ".lock")
+        try:
+            os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            try:
+                if time.time() - lock.stat().st_mtime < STALE_LOCK_SECONDS:
+                    return False
+                os.unlink(lock)
+                os.close(os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            except (FileNotFoundError, FileExistsError):
+                return False  # another worker released or took over the lock meanwhile
+        try:
+            if target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+                return False  # finished by another worker between the listing and the lock
+            with open(source) as file:
+                records = [json.loads(line) for line in file if line.strip()]
+            rows = [{column: record.get(column) for column in ROLLUP_COLUMNS} for record in records]
+            partial = target.with_name(f"{target.name}.{os.getpid()}.partial")
+            if self.rollup_format == "parquet":
+                pyarrow.parquet.write_table(pyarrow.Table.from_pylist(rows), partial)
+            else:
+                with open(partial, "w", newline="") as file:
+                    writer = csv.DictWriter(file, fieldnames=ROLLUP_COLUMNS)
+                    writer.writeheader()
+                    for row in rows:
+                        writer.writerow({**row, "rules": json.dumps(row["rules"], separators=(",", ":"))})
+            os.replace(partial, target)  # readers never see a half-written rollup
+            logger.info("Rolled up %d decisions of %s into %s", len(rows), day, target.name)
+            return True
+        finally:
+            try:
+                os.unlink(lock)
+            except FileNotFoundError:
+                pass
+
+    def query(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        transaction_id: Optional[str] = None,
+        decision: Optional[str] = None,
+        rules_version: Optional[str] = None,
+        rule: Optional[str] = None,
+        verdict: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream the matching records, oldest first, reading one line at a time.
+
+        `since` is inclusive and `until` exclusive (naive datetimes are taken as
+        UTC). `rule` and `verdict` together match records where that rule
+        returned that verdict; either alone matches any rule / any verdict.
+        Records still buffered (up to `flush_interval` old) aren't included.
+        """
+        for _, record in self._scan(since, until, transaction_id, decision, rules_version, rule, verdict, limit):
+            yield record
+
+    def query_lines(self, **filters) -> Iterator[str]:
+        """Like query(), but yields the records' JSONL lines as stored, without re-serializing them."""
+        for line, _ in self._scan(**filters):
+            yield line
+
+    def _scan(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        transaction_id: Optional[str] = None,
+        decision: Optional[str] = None,
+        rules_version: Optional[str] = None,
+        rule: Optional[str] = None,
+        verdict: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        since_ts = _timestamp(since.replace(tzinfo=since.tzinfo or timezone.utc).timestamp()) if since else None
+        until_ts = _timestamp(until.replace(tzinfo=until.tzinfo or timezone.utc).timestamp()) if until else None
+        exact = {"transaction_id": transaction_id, "decision": decision, "rules_version": rules_version}
+        exact = {key: value for key, value in exact.items() if value is not None}
+        # Cheap substring checks on the raw line rule out most records before they are parsed.
+        needles = [f'"{key}":{json.dumps(value)}' for key, value in exact.items()]
+        needles += [json.dumps(value) for value in (rule, verdict) if value is not None]
+        files = self._journal_files(
+            since=date.fromisoformat(since_ts[:10]) if since_ts else None,
+            until=date.fromisoformat(until_ts[:10]) if until_ts else None,
+        )
+        matched = 0
+        for _, path in files:
+            with open(path) as file:
+                for line in file:
+                    if limit is not None and matched >= limit:
+                        return
+                    if not all(needle in line for needle in needles):
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # a torn last line after a crash
+                    ts = record.get("ts", "")
+                    if (since_ts and ts < since_ts) or (until_ts and ts >= until_ts):
+                        continue
+                    if any(record.get(key) != value for key, value in exact.items()):
+                        continue
+                    if (rule is not None or verdict is not None) and not any(
+                        (rule is None or outcome.get("rule") == rule)
+                        and (verdict is None or outcome.get("verdict") == verdict)
+                        for outcome in record.get("rules") or ()
+                    ):
+                        continue
+                    matched += 1
+                    yield (line if line.endswith("\n") else line + "\n"), record
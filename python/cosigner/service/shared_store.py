@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Protocol, Union
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # optional: `uv sync --extra redis` installs it
+    redis_asyncio = None
+
+logger = logging.getLogger("cosigner.dedupe")
+
+
+class SharedDecisionStore(Protocol):
+    """A DecisionStore shared by several worker processes.
+
+    On top of the decision cache it hands out short leases, so that when a webhook
+    retry lands on another worker while the first one is still evaluating, only
+    one of them calls the Fordefi API.
+    """
+
+    async def get(self, key: str) -> Optional[Dict]:
+        ...
+
+    async def set(self, key: str, decision: Dict, ttl: float) -> None:
+        ...
+
+    async def claim(self, key: str, owner: str, lease: float) -> bool:
+        """Take the evaluation lease for `key` unless another owner holds an unexpired one."""
+        ...
+
+    async def release(self, key: str, owner: str) -> None:
+        """Give up the lease early (after a failed evaluation) if `owner` still holds it."""
+        ...
+
+    async def ping(self) -> None:
+        """Raise if the store is unreachable (startup preflight)."""
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class SqliteDecisionStore:
+    """Decision cache and leases in one SQLite file, for several workers on one host.
+
+    The database runs in WAL mode so readers never wait for the writer. Calls run
+    in a thread so a contended lock can't stall the event loop. Expired rows are
+    purged every `purge_every` writes.
+    """
+
+    def __init__(self, path: Union[str, Path], purge_every: int = 1000):
+        self.path = str(path)
+        self._purge_every = purge_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily, so a store built before a fork (gunicorn --preload) isn't shared with children.
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS decisions (key TEXT PRIMARY KEY, decision TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    async def _run(self, operation, *args):
+        def locked():
+            with self._lock:
+                return operation(self._connect(), *args)
+        return await asyncio.to_thread(locked)
+
+    async def get(self, key: str) -> Optional[Dict]:
+        def get(connection: sqlite3.Connection) -> Optional[Dict]:
+            row = connection.execute(
+                "SELECT decision FROM decisions WHERE key = ? AND expires_at > ?", (key, time.time()),
+            ).fetchone()
+            return json.loads(row[0]) if row else None
+        return await self._run(get)
+
+    async def set(self, key: str, decision: Dict, ttl: float) -> None:
+        def set_(connection: sqlite3.Connection) -> None:
+            now = time.time()
+            connection.execute(
+                "INSERT OR REPLACE INTO decisions (key, decision, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(decision), now + ttl),
+            )
+            self._writes += 1
+            if self._writes % self._purge_every == 0:
+                connection.execute("DELETE FROM decisions WHERE expires_at <= ?", (now,))
+                connection.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+        await self._run(set_)
+
+    async def claim(self, key: str, owner: str, lease: float) -> bool:
+        def claim(connection: sqlite3.Connection) -> bool:
+            now = time.time()
+            # One statement, so the check-and-take is atomic across processes.
+            cursor = connection.execute(
+                "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.expires_at <= ? OR leases.owner = excluded.owner",
+                (key, owner, now + lease, now),
+            )
+            return cursor.rowcount == 1
+        return await self._run(claim)
+
+    async def release(self, key: str, owner: str) -> None:
+        def release(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+        await self._run(release)
+
+    async def ping(self) -> None:
+        await self._run(lambda connection: connection.execute("SELECT 1").fetchone())
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+# Takes the lease if it is free, or extends it if this owner already holds it
+# (like the SQLite store's ON CONFLICT ... WHERE leases.owner = excluded.owner).
+_CLAIM_SCRIPT = """
+local current = redis.call('get', KEYS[1])
+if current == ARGV[1] then
+    redis.call('pexpire', KEYS[1], ARGV[2])
+    return 1
+end
+if not current then
+    redis.call('set', KEYS[1], ARGV[1], 'PX', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# Deletes the lease only if this owner still holds it (it may have expired and been re-claimed).
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisDecisionStore:
+    """Decision cache and leases in Redis (or a compatible server), for workers on several hosts."""
+
+    def __init__(self, url: str, prefix: str = "cosigner:"):
+        if redis_asyncio is None:
+            raise RuntimeError("the 'redis' package is not installed (uv sync --extra redis)")
+        self._client = redis_asyncio.Redis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[Dict]:
+        value = await self._client.get(f"{self._prefix}decision:{key}")
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, decision: Dict, ttl: float) -> None:
+        await self._client.set(f"{self._prefix}decision:{key}", json.dumps(decision), px=int(ttl * 1000))
+
+    async def claim(self, key: str, owner: str, lease: float) -> bool:
+        claimed = await self._client.eval(_CLAIM_SCRIPT, 1, f"{self._prefix}lease:{key}", owner, int(lease * 1000))
+        return bool(claimed)
+
+    async def release(self, key: str, owner: str) -> None:
+        await self._client.eval(_RELEASE_SCRIPT, 1, f"{self._prefix}lease:{key}", owner)
+
+    async def ping(self) -> None:
+        await self._client.ping()
+
+    async def close(self) -> None:
+        await self._client.aclose()
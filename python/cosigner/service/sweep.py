@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Protocol
+
+logger = logging.getLogger("cosigner.sweep")
+
+PENDING_STATE = "waiting_for_approval"
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_TRANSACTIONS = 10000
+
+
+class TransactionLister(Protocol):
+    async def list_transactions(self, states=(), page: int = 1, size: int = 100) -> Dict:
+        ...
+
+
+@dataclass
+class SweepResult:
+    pending: int = 0                                   # transactions listed as waiting_for_approval
+    outcomes: Counter = field(default_factory=Counter)  # "decision" of each response, or "failed"
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        counts = ", ".join(f"{name}={count}" for name, count in sorted(self.outcomes.items())) or "nothing to do"
+        return f"{self.pending} pending, {counts} in {self.elapsed:.2f}s"
+
+
+class TransactionSweeper:
+    """Decides every transaction that is waiting for approval, not only the ones a webhook announced.
+
+    Lists pending transactions page by page, then runs `decide` on them with at
+    most `concurrency` in flight. Reconciles webhooks that were missed while the
+    service was down (or given up on by Fordefi), and clears a large backlog far
+    faster than one-by-one webhook retries. `decide` gets the listed transaction,
+    so no per-transaction fetch is needed; it returns the webhook response body.
+    """
+
+    def __init__(
+        self,
+        api: TransactionLister,
+        decide: Callable[[Dict], Awaitable[Dict]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        max_transactions: int = DEFAULT_MAX_TRANSACTIONS,
+    ):
+        self._api = api
+        self._decide = decide
+        self._concurrency = concurrency
+        self._page_size = page_size
+        self._max_transactions = max_transactions
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def list_pending(self) -> List[Dict]:
+        # Collect every page before deciding anything: each decision moves a
+        # transaction out of the pending list and would shift later pages.
+        transactions: List[Dict] = []
+        seen = set()
+        page = 1
+        while len(transactions) < self._max_transactions:
+            body = await self._api.list_transactions(states=[PENDING_STATE], page=page, size=self._page_size)
+            batch = body.get("transactions") or []
+            for transaction in batch:
+                if transaction.get("id") not in seen:
+                    seen.add(transaction.get("id"))
+                    transactions.append(transaction)
+            total = body.get("total")
+            if len(batch) < self._page_size or (total is not None and page * self._page_size >= total):
+                break
+            page += 1
+        if len(transactions) >= self._max_transactions:
+            logger.warning("Sweep capped at %d pending transactions; the rest wait for the next sweep", self._max_transactions)
+        return transactions[:self._max_transactions]
+
+    async def sweep(self) -> SweepResult:
+        """One pass: list everything pending, decide it all, and report what happened."""
+        started = time.perf_counter()
+        result = SweepResult()
+        transactions = await self.list_pending()
+        result.pending = len(transactions)
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def decide(transaction: Dict) -> None:
+            async with semaphore:
+                try:
+                    response = await self._decide(transaction)
+                except Exception as error:
+                    # One bad transaction must not stop the sweep; the next pass retries it.
+                    logger.error("Sweep failed on transaction %s: %s", transaction.get("id"), getattr(error, "detail", error))
+                    result.outcomes["failed"] += 1
+                    return
+                result.outcomes[(response or {}).get("decision") or "no_decision"] += 1
+
+        await asyncio.gather(*(decide(transaction) for transaction in transactions))
+        result.elapsed = time.perf_counter() - started
+        logger.info("Sweep done: %s", result.summary())
+        return result
+
+    def start(self, interval: float) -> None:
+        """Sweep now and then every `interval` seconds, in the background."""
+        self._task = asyncio.create_task(self._run(interval), name="transaction-sweeper")
+        logger.info("Sweeping pending transactions every %ss", interval)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception("Sweep failed")
+            await asyncio.sleep(interval)
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Set
+
+logger = logging.getLogger("cosigner.workers")
+
+DEFAULT_WORKERS = 8
+DEFAULT_QUEUE_DEPTH = 1000
+DEFAULT_DRAIN_TIMEOUT_SECONDS = 30.0
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class DecisionWorkerPool:
+    """Bounded queue of transaction IDs drained by a pool of async workers.
+
+    Lets the webhook handler acknowledge Fordefi as soon as the delivery is
+    verified and enqueued, so ingress latency no longer depends on Fordefi API
+    latency. submit() raises QueueFullError when the queue is at capacity (or the
+    pool is shutting down) so the caller can answer non-2xx and have Fordefi retry.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str], Awaitable[object]],
+        workers: int = DEFAULT_WORKERS,
+        max_queue_depth: int = DEFAULT_QUEUE_DEPTH,
+    ):
+        self._handler = handler
+        self._worker_count = workers
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=max_queue_depth)
+        self._queued: Set[str] = set()
+        self._workers: List["asyncio.Task[None]"] = []
+        self._accepting = False
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        self._accepting = True
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"decision-worker-{index}")
+            for index in range(self._worker_count)
+        ]
+        logger.info("Started %d decision workers", self._worker_count)
+
+    def submit(self, transaction_id: str) -> bool:
+        """Enqueue a transaction; returns False if it is already waiting in the queue."""
+        if not self._accepting:
+            raise QueueFullError("decision queue is shutting down")
+        if transaction_id in self._queued:
+            return False
+        try:
+            self._queue.put_nowait(transaction_id)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"decision queue is full ({self._queue.maxsize} pending)")
+        self._queued.add(transaction_id)
+        return True
+
+    async def drain(self, timeout: float = DEFAULT_DRAIN_TIMEOUT_SECONDS) -> None:
+        """Stop accepting work, let workers finish what is queued, then stop them."""
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                "Decision queue did not drain within %ss, dropping %d transactions: %s",
+                timeout, self._queue.qsize(), sorted(self._queued),
+            )
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _work(self) -> None:
+        while True:
+            transaction_id = await self._queue.get()
+            self._queued.discard(transaction_id)
+            try:
+                await self._handler(transaction_id)
+            except Exception:
+                logger.exception("Decision worker failed on transaction %s", transaction_id)
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,160 @@
+import asyncio
+
+import httpx
+import pytest
+
+from fordefi import AsyncFordefiAPI, CircuitBreaker, CircuitOpenError, FordefiAPIError, RetryPolicy
+
+BASE_URL = "https://api.fordefi.test/api/v1"
+NO_DELAY = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+
+
+def make_api(handler, breaker: CircuitBreaker = None) -> AsyncFordefiAPI:
+    return AsyncFordefiAPI(
+        BASE_URL, "token", transport=httpx.MockTransport(handler), retry=NO_DELAY, breaker=breaker,
+    )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestAsyncFordefiAPI:
+    def test_fetch_transaction_sends_bearer_token(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.headers["Authorization"] == "Bearer token"
+            assert request.url.path == "/api/v1/transactions/tx_1"
+            return httpx.Response(200, json={"id": "tx_1", "state": "waiting_for_approval"})
+
+        transaction = asyncio.run(make_api(handler).fetch_transaction("tx_1"))
+        assert transaction["state"] == "waiting_for_approval"
+
+    def test_fetch_failure_raises_api_error(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(503, headers={"x-request-id": "req_1"}, text="unavailable")
+
+        with pytest.raises(FordefiAPIError, match="req_1"):
+            asyncio.run(make_api(handler).fetch_transaction("tx_1"))
+
+    def test_non_json_success_raises_api_error(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, text="<html>maintenance</html>")
+
+        api = make_api(handler)
+        with pytest.raises(FordefiAPIError, match="not JSON"):
+            asyncio.run(api.fetch_transaction("tx_1"))
+        with pytest.raises(FordefiAPIError, match="not JSON"):
+            asyncio.run(api.list_vaults())
+
+    def test_decision_on_already_decided_transaction_is_a_no_op(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(400, text="transaction is not waiting for approval")
+
+        asyncio.run(make_api(handler).approve_transaction("tx_1"))
+
+    def test_decision_server_error_raises(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.path == "/api/v1/transactions/tx_1/abort"
+            return httpx.Response(500)
+
+        with pytest.raises(FordefiAPIError):
+            asyncio.run(make_api(handler).abort_transaction("tx_1", "nope"))
+
+
+class TestRetries:
+    def test_transient_errors_are_retried(self):
+        responses = iter([httpx.Response(503), httpx.Response(502), httpx.Response(200, json={"id": "tx_1"})])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return next(responses)
+
+        assert asyncio.run(make_api(handler).fetch_transaction("tx_1")) == {"id": "tx_1"}
+
+    def test_connection_errors_are_retried(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            if len(calls) == 1:
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(200)
+
+        asyncio.run(make_api(handler).approve_transaction("tx_1"))
+        assert len(calls) == 2
+
+    def test_gives_up_after_max_attempts(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(500)
+
+        with pytest.raises(FordefiAPIError):
+            asyncio.run(make_api(handler).fetch_transaction("tx_1"))
+        assert len(calls) == 3
+
+    def test_client_errors_are_not_retried(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(404)
+
+        with pytest.raises(FordefiAPIError):
+            asyncio.run(make_api(handler).fetch_transaction("tx_1"))
+        assert len(calls) == 1
+
+    def test_backoff_is_jittered_and_capped(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=0.5)
+        delays = [policy.delay(attempt) for attempt in range(10) for _ in range(20)]
+        assert all(0 <= delay <= 0.5 for delay in delays)
+        assert len(set(delays)) > 1
+        assert policy.delay(0, retry_after=10) == 0.5  # Retry-After honoured up to max_delay
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures_and_fails_fast(self):
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(503)
+
+        api = make_api(handler, CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=FakeClock()))
+        with pytest.raises(FordefiAPIError):
+            asyncio.run(api.fetch_transaction("tx_1"))
+        assert api.breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(api.fetch_transaction("tx_2"))
+        assert len(calls) == 3  # the second fetch never reached the API
+
+    def test_half_open_trial_closes_or_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.retry_in() == 30
+
+        clock.now = 30
+        assert breaker.state == "half_open"
+        breaker.record_failure()
+        assert breaker.state == "open"  # one failed trial reopens it
+
+        clock.now = 60
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_client_errors_do_not_count_as_failures(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(404)
+
+        api = make_api(handler, CircuitBreaker(failure_threshold=1))
+        with pytest.raises(FordefiAPIError):
+            asyncio.run(api.fetch_transaction("tx_1"))
+        assert api.breaker.state == "closed"
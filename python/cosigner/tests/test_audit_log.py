@@ -0,0 +1,113 @@
+import json
+import logging
+import threading
+
+from service import JsonLinesFormatter, QueueLogHandler
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, gate: threading.Event = None):
+        super().__init__()
+        self.gate = gate
+        self.lines = []
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait()
+        self.lines.append(self.format(record))
+
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+
+class TestJsonLinesFormatter:
+    def test_formats_one_json_object_per_record(self):
+        target = ListHandler()
+        target.setFormatter(JsonLinesFormatter())
+        logger = make_logger("test.audit.json", target)
+
+        logger.info("Decision tx=%s decision=%s", "tx_1", "approved", extra={"rules_version": "v1"})
+
+        entry = json.loads(target.lines[0])
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "test.audit.json"
+        assert entry["message"] == "Decision tx=tx_1 decision=approved"
+        assert entry["rules_version"] == "v1"
+        assert entry["ts"].endswith("+00:00")
+
+    def test_includes_traceback(self):
+        target = ListHandler()
+        target.setFormatter(JsonLinesFormatter())
+        logger = make_logger("test.audit.exc", target)
+        try:
+            raise KeyError("boom")
+        except KeyError:
+            logger.exception("rule raised")
+
+        entry = json.loads(target.lines[0])
+        assert "KeyError: 'boom'" in entry["exc"]
+
+
+class TestQueueLogHandler:
+    def test_caller_does_not_wait_for_slow_writer(self):
+        gate = threading.Event()  # the writer is stuck until this is set
+        target = ListHandler(gate)
+        handler = QueueLogHandler([target], max_records=100)
+        handler.start()
+        logger = make_logger("test.audit.slow", handler)
+
+        for index in range(10):
+            logger.info("line %d", index)
+        assert target.lines == []  # all ten calls returned while the writer was blocked
+
+        gate.set()
+        handler.close()
+        assert target.lines == [f"line {index}" for index in range(10)]
+
+    def test_full_queue_blocks_instead_of_dropping(self):
+        gate = threading.Event()
+        target = ListHandler(gate)
+        handler = QueueLogHandler([target], max_records=2)
+        handler.start()
+        logger = make_logger("test.audit.full", handler)
+
+        timer = threading.Timer(0.05, gate.set)
+        timer.start()
+        for index in range(20):
+            logger.info("line %d", index)
+        handler.close()
+        timer.join()
+
+        assert target.lines == [f"line {index}" for index in range(20)]
+        assert handler.blocked > 0
+
+    def test_records_after_close_are_written_synchronously(self):
+        target = ListHandler()
+        handler = QueueLogHandler([target])
+        handler.start()
+        logger = make_logger("test.audit.closed", handler)
+        handler.close()
+
+        logger.warning("late line")
+        assert target.lines == ["late line"]
+
+    def test_traceback_survives_the_queue(self):
+        target = ListHandler()
+        target.setFormatter(JsonLinesFormatter())
+        handler = QueueLogHandler([target])
+        handler.start()
+        logger = make_logger("test.audit.queued_exc", handler)
+        try:
+            raise ValueError("bad")
+        except ValueError:
+            logger.exception("failed")
+        handler.close()
+
+        entry = json.loads(target.lines[0])
+        assert entry["message"] == "failed"
+        assert "ValueError: bad" in entry["exc"]
@@ -0,0 +1,162 @@
+import json
+from types import SimpleNamespace
+
+import eth_abi
+import pytest
+
+from rules import RuleContext, RuleDefinitionError, RuleIndex, Verdict, compile_rules, decode_calldata, load_rules
+from rules.calldata import ABI_REGISTRY, ONEINCH_SWAP_V6_SELECTOR
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+VAULT = "0x8BFCF9e2764BC84DE4BBd0a0f5AAF19F47027A73"
+OTHER_ADDRESS = "0x1111111111111111111111111111111111111111"
+MULTICALL_BLOCKHASH_SELECTOR = "0x1f0464d1"  # multicall(bytes32 previousBlockhash, bytes[] data)
+
+CONFIG = SimpleNamespace(origin_vault=VAULT, ZERO_ADDRESS=ZERO_ADDRESS)
+
+
+def compile_one(rule: dict, allowlists: dict = None):
+    document = {"rules": [rule]}
+    if allowlists:
+        document["allowlists"] = allowlists
+    return compile_rules([document], CONFIG)[0]
+
+
+def make_context(transaction: dict) -> RuleContext:
+    decoded_call, decode_error = decode_calldata(transaction.get("hex_data") or "")
+    return RuleContext(transaction, CONFIG, decoded_call, decode_error)
+
+
+def swap_transaction(dst_receiver: str, initiator: str = VAULT) -> dict:
+    abi = ABI_REGISTRY[ONEINCH_SWAP_V6_SELECTOR]
+    desc = (OTHER_ADDRESS, OTHER_ADDRESS, OTHER_ADDRESS, dst_receiver, 10**18, 10**17, 0)
+    calldata = ONEINCH_SWAP_V6_SELECTOR + eth_abi.encode(list(abi.arg_types), [OTHER_ADDRESS, desc, b""]).hex()
+    return {"type": "evm_transaction", "hex_data": calldata, "from": {"address": initiator}}
+
+
+SWAP_RECEIVER_RULE = {
+    "name": "swap_receiver_is_initiator",
+    "match": {"selectors": [ONEINCH_SWAP_V6_SELECTOR.upper().replace("X", "x")]},
+    "checks": [{"path": "calldata.args.desc.3", "equals_path": "transaction.from.address"}],
+}
+
+
+class TestCompiledRules:
+    def test_equals_path_compares_across_the_transaction(self):
+        rule = compile_one(SWAP_RECEIVER_RULE)
+        assert rule.__name__ == "swap_receiver_is_initiator"
+        assert rule(make_context(swap_transaction(VAULT.lower()))).verdict is Verdict.PASSED
+        result = rule(make_context(swap_transaction(OTHER_ADDRESS)))
+        assert result.verdict is Verdict.ABORT
+        assert "calldata.args.desc.3" in result.reason
+
+    def test_allowlists_resolve_names_and_placeholders_case_insensitively(self):
+        rule = compile_one(
+            {"name": "receiver", "checks": [{"path": "calldata.args.desc.3", "in": ["@treasury", "$origin_vault"]}]},
+            allowlists={"treasury": [OTHER_ADDRESS.upper().replace("X", "x")]},
+        )
+        assert rule(make_context(swap_transaction(OTHER_ADDRESS))).verdict is Verdict.PASSED
+        assert rule(make_context(swap_transaction(VAULT))).verdict is Verdict.PASSED
+        assert rule(make_context(swap_transaction("0x" + "22" * 20))).verdict is Verdict.ABORT
+
+    def test_bytes_arguments_match_hex_allowlist_entries(self):
+        blockhash = bytes.fromhex("ab" * 32)
+        calldata = MULTICALL_BLOCKHASH_SELECTOR + eth_abi.encode(["bytes32", "bytes[]"], [blockhash, []]).hex()
+        rule = compile_one({
+            "name": "known_blockhash",
+            "checks": [{"path": "calldata.args.previousBlockhash", "equals": "0x" + "AB" * 32}],
+        })
+        assert rule(make_context({"hex_data": calldata})).verdict is Verdict.PASSED
+
+    def test_wildcard_requires_every_element_and_solana_addresses_stay_case_sensitive(self):
+        rule = compile_one({
+            "name": "no_blocked_recipients",
+            "checks": [{"path": "eip712.message.recipients.*", "not_in": ["EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"]}],
+        })
+
+        def typed(recipients):
+            return make_context({"raw_data": json.dumps({"message": {"recipients": recipients}})})
+
+        assert rule(typed(["epjfwdd5aufqssqem2qn1xzybapc8g4wegGkzwytdt1v", "other"])).verdict is Verdict.PASSED
+        assert rule(typed(["other", "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"])).verdict is Verdict.ABORT
+
+    def test_missing_values_abort_unless_skipped_and_decode_errors_abort(self):
+        check = [{"path": "eip712.message.receiver", "equals": "$zero_address"}]
+        strict = compile_one({"name": "strict", "checks": check})
+        lenient = compile_one({"name": "lenient", "checks": check, "on_missing": "skip"})
+        assert strict(make_context({})).verdict is Verdict.ABORT
+        assert lenient(make_context({})).verdict is Verdict.SKIPPED
+
+        decoding = compile_one({"name": "decoding", "checks": [{"path": "calldata.function", "equals": "swap"}]})
+        truncated = {"hex_data": ONEINCH_SWAP_V6_SELECTOR + "00" * 8}
+        result = decoding(make_context(truncated))
+        assert result.verdict is Verdict.ABORT
+        assert "failed to decode" in result.reason
+
+    def test_match_is_used_for_dispatch(self):
+        index = RuleIndex([compile_one(SWAP_RECEIVER_RULE)])
+        assert len(index.select(make_context(swap_transaction(VAULT)))) == 1
+        assert index.select(make_context({"hex_data": "0xdeadbeef"})) == []
+
+
+class TestDefinitionErrors:
+    @pytest.mark.parametrize("rule, message", [
+        ({"name": "r", "checks": [{"path": "transaction.to", "in": ["$nobody"]}]}, "unknown placeholder"),
+        ({"name": "r", "checks": [{"path": "transaction.to", "in": ["@missing"]}]}, "unknown allowlist"),
+        ({"name": "r", "checks": [{"path": "transaction.to", "in": [], "equals": "x"}]}, "exactly one of"),
+        ({"name": "r", "checks": [{"path": "vault.address", "equals": "x"}]}, "must start with"),
+        ({"name": "r", "checks": [{"path": "calldata.to", "equals": "x"}]}, "calldata paths"),
+        ({"name": "r", "match": {"chains": ["evm"]}, "checks": [{"path": "transaction.to", "equals": "x"}]}, "match keys"),
+        ({"name": "r", "checks": [{"path": "transaction.to", "not_in": [0x1111]}]}, "must be strings"),
+        ({"name": "r", "checks": [{"path": "transaction.value", "equals": 0}]}, "must be strings"),
+        ({"name": "bad name", "checks": []}, "needs a name"),
+        ({"name": "r", "checks": []}, "non-empty list"),
+    ])
+    def test_invalid_rules_are_rejected(self, rule, message):
+        with pytest.raises(RuleDefinitionError, match=message):
+            compile_one(rule)
+
+    def test_non_string_allowlist_entries_are_rejected(self):
+        rule = {"name": "r", "checks": [{"path": "transaction.to", "in": ["@treasury"]}]}
+        with pytest.raises(RuleDefinitionError, match="allowlist @treasury: values must be strings"):
+            compile_one(rule, {"treasury": [OTHER_ADDRESS, True]})
+
+    def test_duplicate_rule_names_are_rejected(self):
+        rule = {"name": "r", "checks": [{"path": "transaction.to", "equals": "x"}]}
+        with pytest.raises(RuleDefinitionError, match="used twice"):
+            compile_rules([{"rules": [rule]}, {"rules": [rule]}], CONFIG)
+
+
+def test_load_rules_shares_allowlists_across_files(tmp_path):
+    pytest.importorskip("yaml")
+    (tmp_path / "allowlists.json").write_text(json.dumps({"allowlists": {"treasury": [OTHER_ADDRESS]}}))
+    (tmp_path / "rules.yaml").write_text(
+        "rules:\n"
+        "  - name: swap_to_treasury\n"
+        "    match: {selectors: ['" + ONEINCH_SWAP_V6_SELECTOR + "']}\n"
+        "    checks:\n"
+        "      - {path: calldata.args.desc.3, in: ['@treasury']}\n"
+    )
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    rules = load_rules(tmp_path, CONFIG)
+    assert [rule.__name__ for rule in rules] == ["swap_to_treasury"]
+    assert rules[0](make_context(swap_transaction(OTHER_ADDRESS))).verdict is Verdict.PASSED
+
+
+def test_unquoted_hex_addresses_in_yaml_still_block(tmp_path):
+    pytest.importorskip("yaml")
+    (tmp_path / "rules.yaml").write_text(
+        "allowlists:\n"
+        "  blocked:\n"
+        "    - " + OTHER_ADDRESS + "\n"
+        "rules:\n"
+        "  - name: swap_not_to_blocked\n"
+        "    match: {selectors: [" + ONEINCH_SWAP_V6_SELECTOR + "]}\n"
+        "    checks:\n"
+        "      - {path: calldata.args.desc.3, not_in: ['@blocked']}\n"
+    )
+
+    rule = load_rules(tmp_path, CONFIG)[0]
+    assert rule(make_context(swap_transaction(OTHER_ADDRESS))).verdict is Verdict.ABORT
+    assert rule(make_context(swap_transaction(VAULT))).verdict is Verdict.PASSED
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from service import InMemoryDecisionStore, WebhookDeduplicator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestWebhookDeduplicator:
+    def test_concurrent_deliveries_share_one_evaluation(self):
+        calls = []
+
+        async def evaluate():
+            calls.append("evaluate")
+            await asyncio.sleep(0.01)
+            return {"decision": "approved"}
+
+        async def deliver_three_times():
+            deduplicator = WebhookDeduplicator()
+            return await asyncio.gather(*(deduplicator.run("tx_1", evaluate) for _ in range(3)))
+
+        results = asyncio.run(deliver_three_times())
+        assert results == [{"decision": "approved"}] * 3
+        assert calls == ["evaluate"]
+
+    def test_retry_within_ttl_returns_cached_decision(self):
+        clock = FakeClock()
+        calls = []
+
+        async def evaluate():
+            calls.append("evaluate")
+            return {"decision": "aborted", "reason": "nope"}
+
+        async def deliver(deduplicator):
+            first = await deduplicator.run("tx_1", evaluate)
+            clock.now = 10
+            second = await deduplicator.run("tx_1", evaluate)
+            clock.now = 100
+            third = await deduplicator.run("tx_1", evaluate)
+            return first, second, third
+
+        deduplicator = WebhookDeduplicator(InMemoryDecisionStore(clock=clock), ttl=60)
+        first, second, third = asyncio.run(deliver(deduplicator))
+        assert first == second == third
+        assert calls == ["evaluate", "evaluate"]  # the third delivery arrived after the TTL
+
+    def test_failures_are_not_cached(self):
+        attempts = []
+
+        async def evaluate():
+            attempts.append("evaluate")
+            if len(attempts) == 1:
+                raise RuntimeError("API blip")
+            return {"decision": "approved"}
+
+        async def deliver_twice():
+            deduplicator = WebhookDeduplicator()
+            with pytest.raises(RuntimeError):
+                await deduplicator.run("tx_1", evaluate)
+            return await deduplicator.run("tx_1", evaluate)
+
+        assert asyncio.run(deliver_twice()) == {"decision": "approved"}
+        assert len(attempts) == 2
+
+    def test_store_evicts_oldest_entries_beyond_bound(self):
+        async def fill():
+            store = InMemoryDecisionStore(max_entries=2)
+            for key in ("a", "b", "c"):
+                await store.set(key, {"decision": key}, ttl=60)
+            return [await store.get(key) for key in ("a", "b", "c")]
+
+        assert asyncio.run(fill()) == [None, {"decision": "b"}, {"decision": "c"}]
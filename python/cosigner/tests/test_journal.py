@@ -0,0 +1,195 @@
+import asyncio
+import csv
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from service import DecisionJournal
+from service.journal import STALE_LOCK_SECONDS
+
+DAY_1 = datetime(2026, 7, 3, 12, 0, tzinfo=timezone.utc).timestamp()
+DAY_2 = datetime(2026, 7, 4, 9, 30, tzinfo=timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now: float = DAY_1):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def decision(transaction_id: str, outcome: str = "approved", verdicts: dict = None, version: str = "builtin") -> dict:
+    verdicts = verdicts or {"eip712_receiver": "passed"}
+    return {
+        "transaction_id": transaction_id,
+        "decision": outcome,
+        "reason": "",
+        "rules_version": version,
+        "rules": [{"rule": rule, "verdict": verdict, "reason": "", "duration_ms": 0.01} for rule, verdict in verdicts.items()],
+    }
+
+
+def read_lines(path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_records_are_batched_into_one_file_per_utc_day(tmp_path):
+    clock = FakeClock()
+
+    async def scenario():
+        journal = DecisionJournal(tmp_path, clock=clock)
+        journal.record(decision("tx_1"))
+        clock.now = DAY_2
+        journal.record(decision("tx_2"))
+        assert not list(tmp_path.iterdir())  # nothing written until the flush
+        assert await journal.flush() == 2
+        assert await journal.flush() == 0
+
+    asyncio.run(scenario())
+    (first,) = read_lines(tmp_path / "decisions-2026-07-03.jsonl")
+    (second,) = read_lines(tmp_path / "decisions-2026-07-04.jsonl")
+    assert (first["transaction_id"], second["transaction_id"]) == ("tx_1", "tx_2")
+    assert first["ts"] == "2026-07-03T12:00:00.000+00:00"
+
+
+def test_a_full_batch_is_written_without_waiting_for_the_interval(tmp_path):
+    async def scenario():
+        journal = DecisionJournal(tmp_path, rollup="none", batch_size=3, flush_interval=60)
+        journal.start()
+        for index in range(3):
+            journal.record(decision(f"tx_{index}"))
+        for _ in range(100):
+            if journal.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        written = sum(len(path.read_text().splitlines()) for path in tmp_path.glob("*.jsonl"))
+        journal.record(decision("tx_late"))
+        await journal.stop()  # flushes what is left
+        return written
+
+    assert asyncio.run(scenario()) == 3
+    assert sum(len(path.read_text().splitlines()) for path in tmp_path.glob("*.jsonl")) == 4
+
+
+def test_failed_writes_are_retried_and_overflow_drops_the_oldest(tmp_path, monkeypatch):
+    journal = DecisionJournal(tmp_path, max_buffered=3, clock=FakeClock())
+    original_append = journal._append
+    failures = iter([True])
+
+    def flaky_append(batch):
+        if next(failures, False):
+            raise OSError("disk full")
+        original_append(batch)
+
+    monkeypatch.setattr(journal, "_append", flaky_append)
+
+    async def scenario():
+        journal.record(decision("tx_1"))
+        assert await journal.flush() == 0
+        for transaction_id in ("tx_2", "tx_3", "tx_4"):
+            journal.record(decision(transaction_id))
+        return await journal.flush()
+
+    assert asyncio.run(scenario()) == 3
+    assert journal.dropped == 1
+    assert [record["transaction_id"] for record in journal.query()] == ["tx_2", "tx_3", "tx_4"]
+
+
+def test_finished_days_are_rolled_up_to_csv_once(tmp_path):
+    clock = FakeClock()
+    journal = DecisionJournal(tmp_path, clock=clock)
+
+    async def write(*transaction_ids):
+        for transaction_id in transaction_ids:
+            journal.record(decision(transaction_id, verdicts={"a": "passed", "b": "abort"}))
+        await journal.flush()
+
+    asyncio.run(write("tx_1", "tx_2"))
+    assert journal.rollup() == []  # the day isn't over yet
+    clock.now = DAY_2
+    (rollup,) = journal.rollup()
+    assert rollup.name == "decisions-2026-07-03.csv"
+    assert journal.rollup() == []  # up to date
+
+    with open(rollup, newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["transaction_id"] for row in rows] == ["tx_1", "tx_2"]
+    assert [outcome["verdict"] for outcome in json.loads(rows[0]["rules"])] == ["passed", "abort"]
+
+    # A late append to a finished day (e.g. another worker flushing just after midnight) redoes its rollup.
+    clock.now = DAY_1
+    asyncio.run(write("tx_3"))
+    source = tmp_path / "decisions-2026-07-03.jsonl"
+    os.utime(source, (rollup.stat().st_mtime + 1, rollup.stat().st_mtime + 1))
+    clock.now = DAY_2
+    assert journal.rollup() == [rollup]
+
+
+def test_a_rollup_locked_by_another_worker_is_skipped(tmp_path):
+    clock = FakeClock()
+    journal = DecisionJournal(tmp_path, clock=clock)
+    journal.record(decision("tx_1"))
+    asyncio.run(journal.flush())
+    clock.now = DAY_2
+
+    lock = tmp_path / "decisions-2026-07-03.csv.lock"
+    lock.touch()
+    assert journal.rollup() == []
+    assert lock.exists()  # still held by the other worker
+
+    # A lock left by a worker that died mid-rollup is taken over.
+    stale = time.time() - STALE_LOCK_SECONDS - 1
+    os.utime(lock, (stale, stale))
+    (rollup,) = journal.rollup()
+    assert rollup.name == "decisions-2026-07-03.csv"
+    assert not lock.exists()
+    assert [path.name for path in tmp_path.iterdir() if path.name.endswith(".partial")] == []
+
+
+def test_parquet_rollups(tmp_path):
+    parquet = pytest.importorskip("pyarrow.parquet")
+    clock = FakeClock()
+    journal = DecisionJournal(tmp_path, rollup="parquet", clock=clock)
+    journal.record(decision("tx_1", verdicts={"a": "abort"}))
+    asyncio.run(journal.flush())
+    clock.now = DAY_2
+    (rollup,) = journal.rollup()
+    table = parquet.read_table(rollup).to_pylist()
+    assert table[0]["transaction_id"] == "tx_1"
+    assert table[0]["rules"][0]["verdict"] == "abort"
+
+
+def test_query_filters_and_streams_in_order(tmp_path):
+    clock = FakeClock()
+    journal = DecisionJournal(tmp_path, clock=clock)
+    journal.record(decision("tx_1", verdicts={"cctp": "passed"}))
+    journal.record(decision("tx_2", "aborted", verdicts={"cctp": "abort"}, version="abc123"))
+    clock.now = DAY_2
+    journal.record(decision("tx_3", "aborted", verdicts={"oneinch": "abort", "cctp": "skipped"}))
+    asyncio.run(journal.flush())
+    with open(tmp_path / "decisions-2026-07-04.jsonl", "a") as file:
+        file.write('{"ts": "2026-07-04T10:00')  # torn line from a crash mid-write
+
+    def ids(**filters):
+        return [record["transaction_id"] for record in journal.query(**filters)]
+
+    assert ids() == ["tx_1", "tx_2", "tx_3"]
+    assert ids(decision="aborted") == ["tx_2", "tx_3"]
+    assert ids(transaction_id="tx_2") == ["tx_2"]
+    assert ids(rules_version="abc123") == ["tx_2"]
+    assert ids(rule="cctp", verdict="abort") == ["tx_2"]
+    assert ids(rule="cctp") == ["tx_1", "tx_2", "tx_3"]
+    assert ids(verdict="abort") == ["tx_2", "tx_3"]
+    assert ids(since=datetime(2026, 7, 4)) == ["tx_3"]
+    assert ids(until=datetime(2026, 7, 3, 12, 0, 0, 1000)) == ["tx_1", "tx_2"]
+    assert ids(limit=2) == ["tx_1", "tx_2"]
+    assert list(journal.query_lines(transaction_id="tx_3"))[0].endswith("\n")
+
+
+def test_invalid_rollup_format_fails_at_startup(tmp_path):
+    with pytest.raises(ValueError, match="rollup"):
+        DecisionJournal(tmp_path, rollup="xlsx")
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from fordefi import AsyncFordefiAPI, FordefiAPIError, RetryPolicy, SignatureVerifier
+from loadtest.mock_api import API_PREFIX, MockFordefiAPI, create_app
+from loadtest.webhooks import WebhookSigner, generate_key_pair
+
+TEMPLATE = {"id": "template", "type": "evm_transaction", "state": "completed", "hex_data": "0x"}
+
+
+def make_api(mock: MockFordefiAPI) -> AsyncFordefiAPI:
+    transport = httpx.ASGITransport(app=create_app(mock))
+    retry = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+    return AsyncFordefiAPI(f"http://mock{API_PREFIX}", "test", transport=transport, retry=retry)
+
+
+def test_generated_key_signs_webhooks_the_cosigner_accepts(tmp_path):
+    private_key_path, public_key_path = generate_key_pair(tmp_path)
+    body, signature = WebhookSigner.from_file(private_key_path).signed_webhook("tx_1")
+
+    assert json.loads(body)["event"] == {"id": "tx_1", "state": "waiting_for_approval"}
+    assert SignatureVerifier(public_key_path.read_text()).is_valid_signature(signature, body)
+    assert not SignatureVerifier(public_key_path.read_text()).is_valid_signature(signature, body + b" ")
+
+
+def test_mock_api_serves_template_and_tracks_decisions():
+    mock = MockFordefiAPI([TEMPLATE])
+
+    async def scenario():
+        api = make_api(mock)
+        transaction = await api.fetch_transaction("tx_1")
+        await api.approve_transaction("tx_1")
+        await api.abort_transaction("tx_1", "too late")  # 400 from the mock, a no-op for the client
+        await api.aclose()
+        return transaction
+
+    transaction = asyncio.run(scenario())
+    assert transaction["id"] == "tx_1"
+    assert transaction["state"] == "waiting_for_approval"
+    assert mock.stats()["states"] == {"approved": 1}
+    assert mock.stats()["requests"] == {"get_transaction": 1, "approve": 1, "abort": 1}
+
+
+def test_mock_api_injects_errors():
+    mock = MockFordefiAPI([TEMPLATE], error_rate=1.0)
+
+    async def scenario():
+        api = make_api(mock)
+        try:
+            await api.fetch_transaction("tx_1")
+        finally:
+            await api.aclose()
+
+    with pytest.raises(FordefiAPIError, match="503"):
+        asyncio.run(scenario())
+    assert mock.stats()["requests"]["injected_errors"] == 3  # every retry failed too
@@ -0,0 +1,181 @@
+import asyncio
+
+import httpx
+import pytest
+
+from fordefi import AsyncFordefiAPI, FordefiAPIError, FordefiLookups, LookupCache, RetryPolicy
+from rules import RuleContext, RuleResult, Verdict, run_rules_async
+
+BASE_URL = "https://api.fordefi.test/api/v1"
+VAULT = "0x8BFCF9e2764BC84DE4BBd0a0f5AAF19F47027A73"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingLoader:
+    def __init__(self, values: dict = None, delay: float = 0.0):
+        self.values = values or {}
+        self.delay = delay
+        self.calls = []
+        self.fail = False
+
+    async def __call__(self, key):
+        self.calls.append(key)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("lookup backend down")
+        return self.values.get(key)
+
+
+class TestLookupCache:
+    def test_concurrent_misses_share_one_load_and_hits_skip_it(self):
+        loader = CountingLoader({"a": 1}, delay=0.01)
+
+        async def scenario():
+            cache = LookupCache(loader)
+            results = await asyncio.gather(*(cache.get("a") for _ in range(10)))
+            assert await cache.get("a") == 1
+            return results, cache
+
+        results, cache = asyncio.run(scenario())
+        assert results == [1] * 10
+        assert loader.calls == ["a"]
+        assert cache.hits == 1
+
+    def test_not_found_is_cached_for_the_negative_ttl(self):
+        clock = FakeClock()
+        loader = CountingLoader()
+
+        async def scenario():
+            cache = LookupCache(loader, ttl=300, negative_ttl=30, clock=clock)
+            assert await cache.get("unknown") is None
+            clock.now = 20
+            assert await cache.get("unknown") is None
+            clock.now = 31
+            assert await cache.get("unknown") is None
+
+        asyncio.run(scenario())
+        assert loader.calls == ["unknown", "unknown"]
+
+    def test_entries_near_expiry_are_refreshed_in_the_background(self):
+        clock = FakeClock()
+        loader = CountingLoader({"a": "old"})
+
+        async def scenario():
+            cache = LookupCache(loader, ttl=100, refresh_ahead=0.8, clock=clock)
+            await cache.get("a")
+            loader.values["a"] = "new"
+            clock.now = 85
+            assert await cache.get("a") == "old"  # served at once, reloaded behind it
+            await asyncio.sleep(0.01)
+            assert await cache.get("a") == "new"
+
+        asyncio.run(scenario())
+        assert loader.calls == ["a", "a"]
+
+    def test_failures_are_not_cached_and_a_failed_refresh_keeps_the_old_value(self):
+        clock = FakeClock()
+        loader = CountingLoader({"a": 1})
+
+        async def scenario():
+            cache = LookupCache(loader, ttl=100, clock=clock)
+            loader.fail = True
+            with pytest.raises(ConnectionError):
+                await cache.get("a")
+            loader.fail = False
+            assert await cache.get("a") == 1
+
+            loader.fail = True
+            clock.now = 90
+            assert await cache.get("a") == 1
+            await asyncio.sleep(0.01)
+            assert await cache.get("a") == 1
+
+        asyncio.run(scenario())
+        assert len(loader.calls) == 4  # each access past the refresh point retries the refresh
+
+    def test_least_recently_used_entries_are_evicted(self):
+        loader = CountingLoader({"a": 1, "b": 2, "c": 3})
+
+        async def scenario():
+            cache = LookupCache(loader, max_entries=2)
+            for key in ("a", "b", "a", "c"):
+                await cache.get(key)
+            await cache.get("a")
+            await cache.get("b")
+
+        asyncio.run(scenario())
+        assert loader.calls == ["a", "b", "c", "b"]
+
+    def test_cancelled_caller_does_not_cancel_the_shared_load(self):
+        loader = CountingLoader({"a": 1}, delay=0.05)
+
+        async def scenario():
+            cache = LookupCache(loader)
+            impatient = asyncio.create_task(cache.get("a"))
+            patient = asyncio.create_task(cache.get("a"))
+            await asyncio.sleep(0.01)
+            impatient.cancel()
+            return await patient
+
+        assert asyncio.run(scenario()) == 1
+        assert loader.calls == ["a"]
+
+
+def make_lookups(handler, page_size: int = 2) -> FordefiLookups:
+    retry = RetryPolicy(max_attempts=1, base_delay=0, max_delay=0)
+    api = AsyncFordefiAPI(BASE_URL, "token", transport=httpx.MockTransport(handler), retry=retry)
+    return FordefiLookups(api, page_size=page_size)
+
+
+class TestFordefiLookups:
+    def test_vaults_and_contacts_are_paged_once_and_indexed_by_address(self):
+        vaults = [{"id": f"v{index}", "address": f"0x{index:040x}"} for index in range(3)] + [{"id": "v_sol", "address": "SoLAddr"}]
+        contacts = [{"id": "c1", "address": {"address": VAULT, "chain": "evm_ethereum_mainnet"}}]
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append((request.url.path, request.url.params["page"]))
+            page, size = int(request.url.params["page"]), int(request.url.params["size"])
+            if request.url.path.endswith("/vaults"):
+                return httpx.Response(200, json={"total": len(vaults), "vaults": vaults[(page - 1) * size:page * size]})
+            return httpx.Response(200, json={"total": len(contacts), "contacts": contacts})
+
+        async def scenario():
+            lookups = make_lookups(handler)
+            found = await asyncio.gather(lookups.vault("0x" + "0" * 39 + "2"), lookups.vault("0X" + "0" * 40))
+            assert await lookups.vault("soladdr") is None  # base58 is case-sensitive
+            assert (await lookups.vault("SoLAddr"))["id"] == "v_sol"
+            assert (await lookups.contact(VAULT.lower()))["id"] == "c1"
+            return [vault["id"] for vault in found]
+
+        assert asyncio.run(scenario()) == ["v2", "v0"]
+        assert requests == [
+            ("/api/v1/vaults", "1"), ("/api/v1/vaults", "2"), ("/api/v1/addressbook/contacts", "1"),
+        ]
+
+    def test_lookup_failures_fail_the_rule_closed(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(403, json={"title": "Forbidden"})
+
+        async def destination_is_own_vault(context):
+            if await context.lookups.vault(VAULT) is None:
+                return RuleResult.abort("destination is not one of our vaults")
+            return RuleResult.passed()
+
+        async def scenario():
+            lookups = make_lookups(handler)
+            with pytest.raises(FordefiAPIError, match="vaults"):
+                await lookups.vault(VAULT)
+            context = RuleContext({}, None, None, None, view=object(), lookups=lookups)
+            return await run_rules_async([destination_is_own_vault], context, deadline=1)
+
+        result = asyncio.run(scenario())
+        assert result.verdict is Verdict.ABORT
+        assert "raised" in result.reason
@@ -0,0 +1,49 @@
+import pytest
+
+from service import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    def test_counter_renders_total_per_label_set(self):
+        metrics = MetricsRegistry()
+        decisions = metrics.counter("cosigner_decisions", "Decisions", ["decision"])
+        decisions.inc(decision="approved")
+        decisions.inc(decision="approved")
+        decisions.inc(decision="aborted")
+
+        lines = metrics.render().splitlines()
+        assert lines[:2] == ["# HELP cosigner_decisions_total Decisions", "# TYPE cosigner_decisions_total counter"]
+        assert 'cosigner_decisions_total{decision="approved"} 2' in lines
+        assert 'cosigner_decisions_total{decision="aborted"} 1' in lines
+        assert decisions.value(decision="approved") == 2
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = MetricsRegistry()
+        latency = metrics.histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value, stage="fetch")
+
+        lines = metrics.render().splitlines()
+        assert 'latency_seconds_bucket{stage="fetch",le="0.1"} 1' in lines
+        assert 'latency_seconds_bucket{stage="fetch",le="1"} 2' in lines
+        assert 'latency_seconds_bucket{stage="fetch",le="+Inf"} 3' in lines
+        assert 'latency_seconds_sum{stage="fetch"} 5.55' in lines
+        assert 'latency_seconds_count{stage="fetch"} 3' in lines
+
+    def test_histogram_time_observes_even_when_block_raises(self):
+        latency = MetricsRegistry().histogram("latency_seconds", "Latency", ["stage"])
+        with pytest.raises(RuntimeError):
+            with latency.time(stage="approve"):
+                raise RuntimeError("boom")
+        assert latency.count(stage="approve") == 1
+
+    def test_wrong_labels_are_rejected(self):
+        counter = MetricsRegistry().counter("rejected", "Rejected", ["reason"])
+        with pytest.raises(ValueError):
+            counter.inc(cause="forbidden_ip")
+
+    def test_duplicate_registration_is_rejected(self):
+        metrics = MetricsRegistry()
+        metrics.gauge("queue_depth", "Depth")
+        with pytest.raises(ValueError):
+            metrics.gauge("queue_depth", "Depth")
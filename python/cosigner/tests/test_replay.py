@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.replay import load_transactions, percentile, replay, report
+
+FIXTURES = Path(__file__).parent / "fixtures"
+VAULT = "0x8BFCF9e2764BC84DE4BBd0a0f5AAF19F47027A73"
+
+
+@pytest.fixture
+def contract_call_transaction() -> dict:
+    with open(FIXTURES / "transaction_contract_call.json") as file:
+        return json.load(file)
+
+
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.50) == 0.0
+
+
+def test_loads_directory_and_jsonl(tmp_path, contract_call_transaction):
+    directory = tmp_path / "captured"
+    directory.mkdir()
+    (directory / "a.json").write_text(json.dumps(contract_call_transaction))
+    (directory / "b.json").write_text(json.dumps({"event": contract_call_transaction}))  # webhook body
+    jsonl = tmp_path / "captured.jsonl"
+    jsonl.write_text(json.dumps(contract_call_transaction) + "\n\n" + json.dumps({"id": "tx_2"}) + "\n")
+
+    assert [tx["id"] for tx in load_transactions(directory)] == [contract_call_transaction["id"]] * 2
+    assert [tx["id"] for tx in load_transactions(jsonl)] == [contract_call_transaction["id"], "tx_2"]
+
+
+def test_replay_reports_verdicts_per_rule(contract_call_transaction):
+    aborting = {"id": "tx_bad", "type": "evm_transaction", "hex_data": "0x095ea7b3" + "00" * 64}
+    stats = replay([contract_call_transaction, aborting], VAULT)
+    summary = report(stats, elapsed=1.0)
+
+    assert summary["transactions"] == 2
+    assert summary["decisions"] == {"approved": 1, "aborted": 1}
+    vault_rule = summary["rules"]["validate_calldata_contains_vault"]["verdicts"]
+    assert vault_rule == {"passed": 1, "abort": 1}
+    cctp_rule = summary["rules"]["validate_cctp_bridge_recipient"]
+    assert cctp_rule["verdicts"] == {"not_applicable": 2}
+    assert cctp_rule["p50_us"] is None
+
+
+def test_replay_adds_declarative_rules(tmp_path, contract_call_transaction):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps({"rules": [{
+        "name": "blocked_target",
+        "checks": [{"path": "transaction.to.address", "not_in": [contract_call_transaction["to"]["address"]]}],
+    }]}))
+    summary = report(replay([contract_call_transaction], VAULT, rules_path=str(rules_file)), elapsed=1.0)
+
+    assert summary["decisions"] == {"aborted": 1}
+    assert summary["rules"]["blocked_target"]["verdicts"] == {"abort": 1}
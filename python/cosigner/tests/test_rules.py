@@ -1,6 +1,8 @@
+import asyncio
 import base64
 import hashlib
 import json
+import time
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -10,23 +12,24 @@ from eth_utils import function_signature_to_4byte_selector
 
 from rules import (
     ALL_RULES,
+    RULE_INDEX,
     RuleContext,
+    RuleIndex,
     RuleResult,
+    TransactionView,
     Verdict,
+    applies_to,
     decode_calldata,
     run_rules,
+    run_rules_async,
     validate_calldata_contains_vault,
     validate_cctp_bridge_recipient,
     validate_eip712_receiver,
     validate_oneinch_swap_receiver,
 )
-from rules.calldata import ABI_REGISTRY, ONEINCH_SWAP_V6_SELECTOR
-from rules.cctp_bridge_recipient import (
-    BURN_TOKEN_MINT_INDEX,
-    CCTP_V2_TOKEN_MESSENGER,
-    DEPOSIT_FOR_BURN_DISCRIMINATOR,
-    USDC_MINT_SOLANA,
-)
+from rules.calldata import ABI_REGISTRY, MAX_NESTING_DEPTH, ONEINCH_SWAP_V6_SELECTOR, AbiRegistry, compile_decoder
+from rules.cctp_bridge_recipient import USDC_MINT_SOLANA
+from rules.solana import CCTP_V2_TOKEN_MESSENGER, DEPOSIT_FOR_BURN_DISCRIMINATOR
 
 FIXTURES = Path(__file__).parent / "fixtures"
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
@@ -107,6 +110,8 @@ class TestOneinchSwap:
         assert validate_oneinch_swap_receiver(context).verdict is Verdict.ABORT
 
 
+# Position of burn_token_mint in the depositForBurn accounts (DepositForBurnContext order).
+BURN_TOKEN_MINT_INDEX = 10
 # Account pubkeys from the real bridge tx
 # 5irhZRWPbzXzMY5tKpF36161uSYhrU7rPQqHw5prjytoqnTKjgrLvY4uTCCwBufeuwxEvTGTEtREvPD3awnKEP41
 # (index 10 = burn_token_mint = USDC).
@@ -180,6 +185,12 @@ class TestCctpBridge:
         )
         assert result.verdict is Verdict.ABORT
 
+    def test_trailing_data_fails_closed(self):
+        result = validate_cctp_bridge_recipient(
+            make_context(cctp_transaction(deposit_for_burn_data(VAULT) + b"\x00"))
+        )
+        assert result.verdict is Verdict.ABORT
+
     def test_unknown_cctp_instruction_fails_closed(self):
         data = b"\xff" * 8 + deposit_for_burn_data(VAULT)[8:]
         result = validate_cctp_bridge_recipient(make_context(cctp_transaction(data)))
@@ -247,3 +258,318 @@ class TestRunner:
         result = run_rules([aborting_rule, later_rule], make_context({}))
         assert result.verdict is Verdict.ABORT
         assert calls == ["abort"]
+
+    def test_trace_records_each_rule_that_ran(self):
+        def passing_rule(context):
+            return RuleResult.passed("ok")
+
+        def aborting_rule(context):
+            return RuleResult.abort("nope")
+
+        trace = []
+        run_rules([passing_rule, aborting_rule], make_context({}), trace)
+        assert [(outcome.rule, outcome.result.verdict) for outcome in trace] == [
+            ("passing_rule", Verdict.PASSED),
+            ("aborting_rule", Verdict.ABORT),
+        ]
+        assert all(outcome.duration >= 0 for outcome in trace)
+
+    def test_trace_reports_rules_that_do_not_apply_as_skipped(self):
+        @applies_to(transaction_types=["solana_transaction"])
+        def solana_rule(context):
+            return RuleResult.abort("should not run")
+
+        def passing_rule(context):
+            return RuleResult.passed("ok")
+
+        trace = []
+        result = run_rules([solana_rule, passing_rule], make_context({"type": "evm_transaction"}), trace)
+        assert result.verdict is Verdict.PASSED
+        assert [(outcome.rule, outcome.result.verdict, outcome.applicable) for outcome in trace] == [
+            ("solana_rule", Verdict.SKIPPED, False),
+            ("passing_rule", Verdict.PASSED, True),
+        ]
+
+    def test_io_bound_rule_fails_closed_in_the_sync_runner(self):
+        async def lookup_rule(context):
+            return RuleResult.passed()
+
+        result = run_rules([lookup_rule], make_context({}))
+        assert result.verdict is Verdict.ABORT
+        assert "run_rules_async" in result.reason
+
+
+class TestAsyncRunner:
+    def test_io_bound_rules_run_concurrently(self):
+        async def slow_lookup_a(context):
+            await asyncio.sleep(0.2)
+            return RuleResult.passed("a")
+
+        async def slow_lookup_b(context):
+            await asyncio.sleep(0.2)
+            return RuleResult.passed("b")
+
+        def pure_rule(context):
+            return RuleResult.passed()
+
+        trace = []
+        started = time.perf_counter()
+        result = asyncio.run(run_rules_async([slow_lookup_a, pure_rule, slow_lookup_b], make_context({}), trace))
+        assert result.verdict is Verdict.PASSED
+        assert time.perf_counter() - started < 0.35  # not 0.4: they overlapped
+        assert [outcome.rule for outcome in trace] == ["pure_rule", "slow_lookup_a", "slow_lookup_b"]
+
+    def test_pure_abort_starts_no_io(self):
+        started = []
+
+        async def lookup(context):
+            started.append("lookup")
+            return RuleResult.passed()
+
+        def aborting_rule(context):
+            return RuleResult.abort("nope")
+
+        result = asyncio.run(run_rules_async([lookup, aborting_rule], make_context({})))
+        assert result.reason == "nope"
+        assert started == []
+
+    def test_first_abort_cancels_the_rest(self):
+        cancelled = []
+
+        async def fast_abort(context):
+            await asyncio.sleep(0.01)
+            return RuleResult.abort("denylisted")
+
+        async def hanging_lookup(context):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append("hanging_lookup")
+                raise
+            return RuleResult.passed()
+
+        async def scenario():
+            result = await run_rules_async([hanging_lookup, fast_abort], make_context({}), deadline=5)
+            await asyncio.sleep(0)  # let the cancellation land
+            return result
+
+        result = asyncio.run(scenario())
+        assert result.reason == "denylisted"
+        assert cancelled == ["hanging_lookup"]
+
+    def test_missed_deadline_fails_closed(self):
+        async def hanging_lookup(context):
+            await asyncio.sleep(10)
+            return RuleResult.passed()
+
+        async def raising_lookup(context):
+            raise ConnectionError("oracle down")
+
+        trace = []
+        started = time.perf_counter()
+        result = asyncio.run(run_rules_async([hanging_lookup], make_context({}), trace, deadline=0.05))
+        assert time.perf_counter() - started < 1
+        assert result.verdict is Verdict.ABORT
+        assert "hanging_lookup did not finish within the 0.05s deadline" in result.reason
+        assert trace[0].result.verdict is Verdict.ABORT
+
+        result = asyncio.run(run_rules_async([raising_lookup], make_context({}), deadline=1))
+        assert result.verdict is Verdict.ABORT
+        assert "oracle down" in result.reason
+
+
+class TestDispatch:
+    def test_index_only_selects_matching_rules(self, contract_call_transaction):
+        selected = RULE_INDEX.select(make_context(contract_call_transaction))
+        assert validate_oneinch_swap_receiver not in selected
+        assert validate_cctp_bridge_recipient not in selected
+        assert validate_calldata_contains_vault in selected
+
+    def test_selector_rule_runs_only_for_its_selector(self):
+        calls = []
+
+        @applies_to(selectors=["0xA9059CBB"])
+        def transfer_rule(context):
+            calls.append(context.transaction["hex_data"][:10])
+            return RuleResult.passed()
+
+        index = RuleIndex([transfer_rule])
+        run_rules(index, make_context({"hex_data": "0x095ea7b3" + "00" * 64}))
+        run_rules(index, make_context({"hex_data": "0xa9059cbb" + "00" * 64}))
+        assert calls == ["0xa9059cbb"]
+
+    def test_all_declared_dimensions_must_match(self):
+        @applies_to(transaction_types=["solana_transaction"], programs=[CCTP_V2_TOKEN_MESSENGER])
+        def solana_cctp_rule(context):
+            return RuleResult.abort("should only run on CCTP instructions")
+
+        index = RuleIndex([solana_cctp_rule])
+        other_program = {
+            "type": "solana_transaction",
+            "instructions": [{"program": {"address": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"}}],
+        }
+        assert index.select(make_context(other_program)) == []
+        assert index.select(make_context(cctp_transaction(deposit_for_burn_data(VAULT)))) == [solana_cctp_rule]
+
+    def test_eip712_rules_match_primary_type_and_domain(self):
+        @applies_to(eip712_primary_types=["Order"], eip712_domains=["0xABCDEF0000000000000000000000000000000000"])
+        def order_rule(context):
+            return RuleResult.passed()
+
+        def typed_message(primary_type, verifying_contract):
+            raw_data = {"primaryType": primary_type, "domain": {"verifyingContract": verifying_contract}}
+            return make_context({"raw_data": json.dumps(raw_data)})
+
+        index = RuleIndex([order_rule])
+        assert index.select(typed_message("Order", "0xabcdef0000000000000000000000000000000000")) == [order_rule]
+        assert index.select(typed_message("Permit", "0xabcdef0000000000000000000000000000000000")) == []
+        assert index.select(typed_message("Order", OTHER_ADDRESS)) == []
+
+    def test_selection_preserves_registration_order(self):
+        @applies_to(transaction_types=["evm_transaction"])
+        def first(context):
+            return RuleResult.passed()
+
+        def second(context):
+            return RuleResult.passed()
+
+        @applies_to(transaction_types=["evm_transaction"])
+        def third(context):
+            return RuleResult.passed()
+
+        index = RuleIndex([first, second, third])
+        assert index.select(make_context({"type": "evm_transaction"})) == [first, second, third]
+        assert index.select(make_context({"type": "solana_transaction"})) == [second]
+
+
+class TestTransactionView:
+    def test_typed_message_is_parsed_once(self):
+        context = make_context({"raw_data": json.dumps({"message": {"receiver": VAULT}})})
+        assert context.parsed_raw_data() is context.parsed_raw_data()
+        assert context.view.typed_message["message"]["receiver"] == VAULT
+
+    def test_view_is_read_only(self):
+        view = TransactionView({"hex_data": "0x"}, VAULT)
+        with pytest.raises(AttributeError):
+            view.transaction = {}
+
+    def test_calldata_and_vault_bytes(self, contract_call_transaction):
+        view = make_context(contract_call_transaction).view
+        assert view.calldata == bytes.fromhex(contract_call_transaction["hex_data"][2:])
+        assert view.selector == contract_call_transaction["hex_data"][:10].lower()
+        assert view.vault_address_bytes == bytes.fromhex(VAULT[2:])
+        assert view.origin_vault_bytes == bytes.fromhex(VAULT[2:])
+
+    def test_solana_instructions_are_decoded(self):
+        data = deposit_for_burn_data(VAULT)
+        view = make_context(cctp_transaction(data)).view
+        (instruction,) = view.solana_instructions
+        assert instruction.program == CCTP_V2_TOKEN_MESSENGER
+        assert instruction.data == data
+        assert view.account_addresses[instruction.account_indexes[BURN_TOKEN_MINT_INDEX]] == USDC_MINT_SOLANA
+
+    def test_invalid_hex_calldata_fails_closed(self):
+        result = validate_calldata_contains_vault(make_context({"hex_data": "0xnothex"}))
+        assert result.verdict is Verdict.ABORT
+
+    def test_decode_calldata_accepts_bytes(self):
+        hex_data = oneinch_swap_calldata(VAULT)
+        from_hex, _ = decode_calldata(hex_data)
+        from_bytes, _ = decode_calldata(bytes.fromhex(hex_data[2:]))
+        assert from_hex == from_bytes
+
+
+ERC20_TRANSFER_SELECTOR = "0xa9059cbb"
+ERC20_ABI = [
+    {
+        "type": "function",
+        "name": "transfer",
+        "inputs": [{"name": "to", "type": "address"}, {"name": "amount", "type": "uint256"}],
+    },
+    {"type": "event", "name": "Transfer", "inputs": []},
+]
+
+
+def encode_call(selector: str, arg_types: list, values: list) -> bytes:
+    return bytes.fromhex(selector[2:]) + eth_abi.encode(arg_types, values)
+
+
+class TestAbiRegistry:
+    @pytest.mark.parametrize("selector", ["0xac9650d8", "0x5ae401dc", "0x1f0464d1", "0x6a761202"])
+    def test_builtin_selectors_match_signatures(self, selector):
+        abi = ABI_REGISTRY[selector]
+        assert "0x" + function_signature_to_4byte_selector(abi.signature).hex() == selector
+
+    def test_decoders_are_compiled_once_per_type_list(self):
+        assert compile_decoder(("address", "uint256")) is compile_decoder(("address", "uint256"))
+
+    def test_warm_up_runs_every_decoder(self):
+        registry = AbiRegistry()
+        registry.load_abi(ERC20_ABI)
+        for selector in ("0x07ed2379", "0xac9650d8", "0x6a761202"):  # structs, bytes[], bytes
+            registry[selector] = ABI_REGISTRY[selector]
+        assert registry.warm_up() == len(registry) == 4
+
+    def test_load_abi_computes_selectors_including_structs(self, tmp_path):
+        abi = ERC20_ABI + [{
+            "type": "function",
+            "name": "swap",
+            "inputs": [
+                {"name": "executor", "type": "address"},
+                {"name": "desc", "type": "tuple", "components": [
+                    {"name": name, "type": "address"} for name in ("a", "b", "c", "d")
+                ] + [{"name": name, "type": "uint256"} for name in ("e", "f", "g")]},
+                {"name": "data", "type": "bytes"},
+            ],
+        }]
+        (tmp_path / "router.json").write_text(json.dumps({"abi": abi}))
+        registry = AbiRegistry()
+        assert registry.load_abi_directory(tmp_path) == 2
+        assert ERC20_TRANSFER_SELECTOR in registry
+        assert ONEINCH_SWAP_V6_SELECTOR in registry
+
+    def test_multicall_inner_calls_are_decoded(self):
+        registry = AbiRegistry()
+        registry.load_abi(ERC20_ABI)
+        registry["0xac9650d8"] = ABI_REGISTRY["0xac9650d8"]
+        transfer = encode_call(ERC20_TRANSFER_SELECTOR, ["address", "uint256"], [VAULT, 5])
+        unknown = bytes.fromhex("deadbeef") + b"\x00" * 32
+        decoded, error = registry.decode(encode_call("0xac9650d8", ["bytes[]"], [[transfer, unknown]]))
+        assert error is None
+        (inner,) = decoded.inner_calls
+        assert inner.function_name == "transfer"
+        assert inner.args["to"] == VAULT.lower()
+        assert decoded.unknown_inner_selectors == ("0xdeadbeef",)
+        assert [call.function_name for call in decoded.walk()] == ["multicall", "transfer"]
+
+    def test_safe_exec_transaction_wrapping_a_multicall(self):
+        swap = bytes.fromhex(oneinch_swap_calldata(OTHER_ADDRESS)[2:])
+        multicall = encode_call("0xac9650d8", ["bytes[]"], [[swap]])
+        exec_transaction = encode_call(
+            "0x6a761202",
+            list(ABI_REGISTRY["0x6a761202"].arg_types),
+            [OTHER_ADDRESS, 0, multicall, 0, 0, 0, 0, ZERO_ADDRESS, ZERO_ADDRESS, b""],
+        )
+        decoded, error = decode_calldata(exec_transaction)
+        assert error is None
+        selectors = [call.selector for call in decoded.walk()]
+        assert selectors == ["0x6a761202", "0xac9650d8", ONEINCH_SWAP_V6_SELECTOR]
+
+    def test_calls_nested_too_deep_fail_the_whole_decode(self):
+        calldata = bytes.fromhex(oneinch_swap_calldata(OTHER_ADDRESS)[2:])
+        for _ in range(MAX_NESTING_DEPTH):
+            calldata = encode_call("0xac9650d8", ["bytes[]"], [[calldata]])
+        decoded, error = decode_calldata(calldata)
+        assert error is None
+        assert [call.selector for call in decoded.walk()][-1] == ONEINCH_SWAP_V6_SELECTOR
+
+        # One more wrapper (five levels of nesting) must not hide the swap from rules.
+        decoded, error = decode_calldata(encode_call("0xac9650d8", ["bytes[]"], [[calldata]]))
+        assert decoded is None
+        assert f"nested deeper than {MAX_NESTING_DEPTH} levels" in error
+
+    def test_undecodable_inner_call_fails_the_whole_decode(self):
+        truncated_swap = bytes.fromhex(oneinch_swap_calldata(VAULT)[2:100])
+        decoded, error = decode_calldata(encode_call("0xac9650d8", ["bytes[]"], [[truncated_swap]]))
+        assert decoded is None
+        assert "inner call" in error
@@ -0,0 +1,82 @@
+import asyncio
+
+from service import SqliteDecisionStore, WebhookDeduplicator
+
+
+class TestSqliteDecisionStore:
+    def test_decisions_expire(self, tmp_path):
+        store = SqliteDecisionStore(tmp_path / "state.db")
+
+        async def scenario():
+            await store.set("tx_1", {"decision": "approved"}, ttl=60)
+            await store.set("tx_2", {"decision": "aborted"}, ttl=-1)
+            return await store.get("tx_1"), await store.get("tx_2"), await store.get("tx_3")
+
+        assert asyncio.run(scenario()) == ({"decision": "approved"}, None, None)
+
+    def test_lease_is_exclusive_across_processes(self, tmp_path):
+        # Two store instances on one file stand in for two worker processes.
+        first = SqliteDecisionStore(tmp_path / "state.db")
+        second = SqliteDecisionStore(tmp_path / "state.db")
+
+        async def scenario():
+            results = [
+                await first.claim("tx_1", "worker-a", lease=60),
+                await second.claim("tx_1", "worker-b", lease=60),
+                await first.claim("tx_1", "worker-a", lease=60),  # re-entrant for the holder
+            ]
+            await second.release("tx_1", "worker-b")  # not the holder: no effect
+            results.append(await second.claim("tx_1", "worker-b", lease=60))
+            await first.release("tx_1", "worker-a")
+            results.append(await second.claim("tx_1", "worker-b", lease=60))
+            return results
+
+        assert asyncio.run(scenario()) == [True, False, True, False, True]
+
+    def test_expired_lease_can_be_taken_over(self, tmp_path):
+        store = SqliteDecisionStore(tmp_path / "state.db")
+
+        async def scenario():
+            await store.claim("tx_1", "crashed-worker", lease=-1)
+            return await store.claim("tx_1", "worker-b", lease=60)
+
+        assert asyncio.run(scenario()) is True
+
+
+class TestSharedDeduplication:
+    def test_workers_sharing_a_store_evaluate_once(self, tmp_path):
+        calls = []
+
+        async def evaluate():
+            calls.append("evaluate")
+            await asyncio.sleep(0.1)
+            return {"decision": "approved"}
+
+        async def scenario():
+            workers = [
+                WebhookDeduplicator(SqliteDecisionStore(tmp_path / "state.db"), poll_interval=0.01)
+                for _ in range(3)
+            ]
+            return await asyncio.gather(*(worker.run("tx_1", evaluate) for worker in workers))
+
+        assert asyncio.run(scenario()) == [{"decision": "approved"}] * 3
+        assert calls == ["evaluate"]
+
+    def test_failed_evaluation_releases_the_lease(self, tmp_path):
+        async def fail():
+            raise RuntimeError("fordefi down")
+
+        async def succeed():
+            return {"decision": "approved"}
+
+        async def scenario():
+            first = WebhookDeduplicator(SqliteDecisionStore(tmp_path / "state.db"))
+            second = WebhookDeduplicator(SqliteDecisionStore(tmp_path / "state.db"))
+            try:
+                await first.run("tx_1", fail)
+            except RuntimeError:
+                pass
+            # Without the release, the retry on another worker would wait out the lease.
+            return await asyncio.wait_for(second.run("tx_1", succeed), timeout=1)
+
+        assert asyncio.run(scenario()) == {"decision": "approved"}
@@ -0,0 +1,69 @@
+import base64
+import hashlib
+
+import ecdsa
+import pytest
+from ecdsa.util import sigencode_der
+
+from fordefi import SignatureVerifier
+from fordefi.signature import BACKENDS, default_backend_name
+
+BODY = b'{"event": {"id": "tx_1", "state": "waiting_for_approval"}}'
+
+
+def make_key_pair():
+    signing_key = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
+    return signing_key, signing_key.get_verifying_key().to_pem().decode()
+
+
+def sign(signing_key, body: bytes = BODY) -> str:
+    return base64.b64encode(signing_key.sign(body, hashfunc=hashlib.sha256, sigencode=sigencode_der)).decode()
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request):
+    if request.param == "cryptography":
+        pytest.importorskip("cryptography")
+    return request.param
+
+
+class TestSignatureVerifier:
+    def test_valid_signature_is_accepted(self, backend):
+        signing_key, public_key = make_key_pair()
+        assert SignatureVerifier(public_key, backend=backend).is_valid_signature(sign(signing_key), BODY)
+
+    def test_verification_is_unchanged_after_warm_up(self, backend):
+        signing_key, public_key = make_key_pair()
+        verifier = SignatureVerifier(public_key, backend=backend)
+        verifier.warm_up()
+        assert verifier.is_valid_signature(sign(signing_key), BODY)
+        assert not verifier.is_valid_signature(sign(signing_key), BODY + b" ")
+
+    def test_tampered_body_is_rejected(self, backend):
+        signing_key, public_key = make_key_pair()
+        verifier = SignatureVerifier(public_key, backend=backend)
+        assert not verifier.is_valid_signature(sign(signing_key), BODY.replace(b"tx_1", b"tx_2"))
+
+    def test_garbage_signature_is_rejected(self, backend):
+        _, public_key = make_key_pair()
+        verifier = SignatureVerifier(public_key, backend=backend)
+        assert not verifier.is_valid_signature(base64.b64encode(b"not a DER signature").decode(), BODY)
+        assert not verifier.is_valid_signature("%%% not base64 %%%", BODY)
+
+    def test_any_configured_key_is_accepted_for_rotation(self, backend):
+        old_key, old_public_key = make_key_pair()
+        new_key, new_public_key = make_key_pair()
+        unknown_key, _ = make_key_pair()
+        verifier = SignatureVerifier([new_public_key, old_public_key], backend=backend)
+        assert verifier.is_valid_signature(sign(new_key), BODY)
+        assert verifier.is_valid_signature(sign(old_key), BODY)
+        assert not verifier.is_valid_signature(sign(unknown_key), BODY)
+
+    def test_default_backend_prefers_native(self):
+        _, public_key = make_key_pair()
+        assert SignatureVerifier(public_key).backend_name == default_backend_name()
+
+    def test_unknown_backend_is_rejected(self):
+        _, public_key = make_key_pair()
+        with pytest.raises(ValueError):
+            SignatureVerifier(public_key, backend="nope")
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+from rules import ALL_RULES, RuleContext, RuleReloader, Verdict, build_snapshot, run_rules
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+VAULT = "0x8BFCF9e2764BC84DE4BBd0a0f5AAF19F47027A73"
+NEW_VAULT = "0x2222222222222222222222222222222222222222"
+
+
+def make_config() -> SimpleNamespace:
+    return SimpleNamespace(origin_vault=VAULT, ZERO_ADDRESS=ZERO_ADDRESS)
+
+
+def receiver_rules(allowed: list, settings: dict = None) -> str:
+    document = {"rules": [{
+        "name": "eip712_receiver_allowlist",
+        "checks": [{"path": "eip712.message.receiver", "in": allowed}],
+        "on_missing": "skip",
+    }]}
+    if settings:
+        document["settings"] = settings
+    return json.dumps(document)
+
+
+def write(path, text: str) -> None:
+    path.write_text(text)
+    # Bump the mtime explicitly: two writes within the filesystem's timestamp granularity look unchanged.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def evaluate(snapshot, receiver: str) -> Verdict:
+    transaction = {"raw_data": json.dumps({"message": {"receiver": receiver}})}
+    return run_rules(snapshot.index, RuleContext(transaction, snapshot.config, None, None)).verdict
+
+
+def test_without_rule_files_the_snapshot_holds_the_builtin_rules():
+    snapshot = build_snapshot(ALL_RULES, make_config())
+    assert snapshot.version == "builtin"
+    assert snapshot.index.rules == ALL_RULES
+
+
+def test_changed_files_swap_in_a_new_snapshot_and_old_ones_stay_intact(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    write(rules_file, receiver_rules(["$origin_vault"]))
+    reloader = RuleReloader([], make_config(), rules_file)
+    first = reloader.current
+    assert reloader.check() is False  # nothing changed
+
+    write(rules_file, receiver_rules(["$origin_vault", NEW_VAULT]))
+    assert reloader.check() is True
+    assert reloader.current.version != first.version
+    # An evaluation that took the old snapshot keeps the old rules.
+    assert evaluate(first, NEW_VAULT) is Verdict.ABORT
+    assert evaluate(reloader.current, NEW_VAULT) is Verdict.PASSED
+
+
+def test_invalid_files_are_rejected_and_the_current_snapshot_kept(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    write(rules_file, receiver_rules(["$origin_vault"]))
+    reloader = RuleReloader([], make_config(), rules_file)
+    version = reloader.current.version
+
+    write(rules_file, receiver_rules(["@no_such_allowlist"]))
+    assert reloader.check() is False
+    write(rules_file, "{not json")
+    assert reloader.check() is False
+    assert reloader.current.version == version
+
+
+def test_a_list_shaped_document_is_rejected_and_retried_until_fixed(tmp_path, caplog):
+    rules_file = tmp_path / "rules.json"
+    write(rules_file, receiver_rules(["$origin_vault"]))
+    reloader = RuleReloader([], make_config(), rules_file)
+    version = reloader.current.version
+
+    write(rules_file, json.dumps([{"name": "not_a_document"}]))
+    assert reloader.check() is False
+    assert reloader.check() is False  # the failed file is tried again, not marked as loaded
+    assert [record.message for record in caplog.records].count(
+        f"Rejected rule reload, keeping version {version}: {rules_file}: "
+        "expected a mapping with 'allowlists', 'rules' and/or 'settings'"
+    ) == 2
+    assert reloader.current.version == version
+
+    write(rules_file, receiver_rules([NEW_VAULT]))
+    assert reloader.check() is True
+    assert evaluate(reloader.current, NEW_VAULT) is Verdict.PASSED
+
+
+def test_settings_override_the_origin_vault_for_the_snapshot_only(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    config = make_config()
+    write(rules_file, receiver_rules(["$origin_vault"], settings={"origin_vault": NEW_VAULT}))
+    reloader = RuleReloader([], config, rules_file)
+
+    assert reloader.current.config.origin_vault == NEW_VAULT
+    assert config.origin_vault == VAULT
+    assert evaluate(reloader.current, NEW_VAULT) is Verdict.PASSED
+
+    write(rules_file, receiver_rules(["$origin_vault"], settings={"origin_vault": "not-an-address"}))
+    assert reloader.check() is False
+    assert reloader.current.config.origin_vault == NEW_VAULT
+
+
+def test_watcher_picks_up_edits_in_the_background(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    write(rules_file, receiver_rules(["$origin_vault"]))
+
+    async def scenario():
+        reloader = RuleReloader([], make_config(), tmp_path)
+        first = reloader.current.version
+        reloader.start(interval=0.01)
+        write(rules_file, receiver_rules([NEW_VAULT]))
+        for _ in range(200):
+            if reloader.current.version != first:
+                break
+            await asyncio.sleep(0.01)
+        await reloader.stop()
+        return first, reloader.current.version
+
+    first, current = asyncio.run(scenario())
+    assert current != first
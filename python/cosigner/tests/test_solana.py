@@ -0,0 +1,177 @@
+import base64
+import json
+import struct
+
+import pytest
+
+from rules import (
+    SOLANA_REGISTRY,
+    IdlError,
+    InstructionLayout,
+    SolanaRegistry,
+    TransactionView,
+    anchor_discriminator,
+    b58encode,
+)
+from rules.solana import CCTP_V2_TOKEN_MESSENGER, DEPOSIT_FOR_BURN_DISCRIMINATOR
+from rules.view import SolanaInstruction
+
+PROGRAM = "Stak1ngProgram11111111111111111111111111111"
+SYSTEM_PROGRAM = "11111111111111111111111111111111"
+VAULT = "0x8BFCF9e2764BC84DE4BBd0a0f5AAF19F47027A73"
+
+# Anchor 0.30+ IDL: explicit discriminators, snake_case names, "pubkey", {"defined": {"name": ...}}.
+STAKING_IDL = {
+    "address": PROGRAM,
+    "instructions": [{
+        "name": "stake",
+        "discriminator": list(anchor_discriminator("stake")),
+        "accounts": [
+            {"name": "owner"},
+            {"name": "pool", "accounts": [{"name": "state"}, {"name": "vault"}]},
+        ],
+        "args": [
+            {"name": "amount", "type": "u128"},
+            {"name": "beneficiary", "type": "pubkey"},
+            {"name": "memo", "type": {"option": "string"}},
+            {"name": "lockup", "type": {"defined": {"name": "Lockup"}}},
+            {"name": "tags", "type": {"vec": {"array": ["u8", 4]}}},
+        ],
+    }],
+    "types": [
+        {"name": "Lockup", "type": {"kind": "struct", "fields": [
+            {"name": "kind", "type": {"defined": {"name": "LockupKind"}}},
+            {"name": "seconds", "type": "i64"},
+        ]}},
+        {"name": "LockupKind", "type": {"kind": "enum", "variants": [
+            {"name": "None"},
+            {"name": "Cliff", "fields": [{"name": "at", "type": "u32"}]},
+        ]}},
+    ],
+}
+
+
+def stake_data(memo=None, trailing: bytes = b"") -> bytes:
+    memo_bytes = b"\x00" if memo is None else b"\x01" + struct.pack("<I", len(memo)) + memo.encode()
+    return (
+        anchor_discriminator("stake")
+        + (2**100).to_bytes(16, "little")
+        + bytes(range(32))
+        + memo_bytes
+        + b"\x01" + struct.pack("<I", 7) + struct.pack("<q", -1)   # Cliff { at: 7 }, seconds -1
+        + struct.pack("<I", 2) + b"abcdwxyz"
+        + trailing
+    )
+
+
+def make_registry() -> SolanaRegistry:
+    registry = SolanaRegistry()
+    assert registry.load_idl(STAKING_IDL) == 1
+    return registry
+
+
+def instruction(data: bytes, account_indexes=(0, 1, 2, 3), program: str = PROGRAM) -> SolanaInstruction:
+    return SolanaInstruction(program=program, data=data, account_indexes=tuple(account_indexes))
+
+
+ADDRESSES = ("Owner1111", "State1111", "Vault1111", "Extra1111")
+
+
+class TestSolanaRegistry:
+    def test_idl_instruction_is_decoded_with_named_accounts(self):
+        decoded = make_registry().decode(instruction(stake_data(memo="hi")), ADDRESSES, index=2)
+        assert decoded.error is None
+        assert (decoded.index, decoded.name) == (2, "stake")
+        assert decoded.args["amount"] == 2**100
+        assert decoded.args["beneficiary"] == bytes(range(32))
+        assert decoded.args["memo"] == "hi"
+        assert decoded.args["lockup"] == {"kind": {"Cliff": {"at": 7}}, "seconds": -1}
+        assert [bytes(tag) for tag in decoded.args["tags"]] == [b"abcd", b"wxyz"]
+        assert decoded.accounts == {"owner": "Owner1111", "pool.state": "State1111", "pool.vault": "Vault1111"}
+        assert decoded.remaining_accounts == ("Extra1111",)
+
+    def test_byte_fields_are_views_of_the_instruction_data(self):
+        data = stake_data()
+        decoded = make_registry().decode(instruction(data), ADDRESSES)
+        beneficiary = decoded.args["beneficiary"]
+        assert isinstance(beneficiary, memoryview)
+        assert beneficiary.obj is data
+        assert decoded.args["memo"] is None
+
+    @pytest.mark.parametrize("data, error", [
+        (stake_data()[:30], "failed to decode stake"),
+        (stake_data(trailing=b"\x00"), "1 trailing bytes"),
+        (b"\xff" * 8 + stake_data()[8:], "unknown instruction"),
+        (anchor_discriminator("stake") + b"\x00" * 48 + b"\x02", "invalid option tag"),
+    ])
+    def test_undecodable_data_is_reported_not_raised(self, data, error):
+        decoded = make_registry().decode(instruction(data), ADDRESSES)
+        assert error in decoded.error
+        assert decoded.args == {}
+
+    def test_account_index_out_of_range_is_an_error(self):
+        decoded = make_registry().decode(instruction(stake_data(), account_indexes=(0, 9)), ADDRESSES)
+        assert "account index 9" in decoded.error
+
+    def test_unregistered_programs_are_not_decoded(self):
+        assert make_registry().decode(instruction(b"", program=SYSTEM_PROGRAM), ADDRESSES) is None
+
+    def test_legacy_idl_derives_discriminators_from_camel_case_names(self):
+        registry = SolanaRegistry()
+        registry.load_idl({
+            "metadata": {"address": PROGRAM},
+            "instructions": [{
+                "name": "setAuthority",
+                "accounts": [{"name": "authority", "isMut": False, "isSigner": True}],
+                "args": [{"name": "newAuthority", "type": "publicKey"}],
+            }],
+        })
+        layout = registry.get(PROGRAM, "setAuthority")
+        assert layout.discriminator == anchor_discriminator("set_authority")
+        decoded = registry.decode(instruction(layout.discriminator + bytes(32), (0,)), ADDRESSES)
+        assert b58encode(decoded.args["newAuthority"]) == SYSTEM_PROGRAM
+
+    def test_hand_registered_layouts_with_a_custom_discriminator(self, tmp_path):
+        registry = SolanaRegistry()
+        registry.register(PROGRAM, InstructionLayout("ping", b"\x07", args=(("nonce", "u16"),)))
+        (tmp_path / "staking.json").write_text(json.dumps(STAKING_IDL))
+        assert registry.load_idl_directory(tmp_path) == 1
+        assert registry.decode(instruction(b"\x07\x01\x00", ()), ()).args == {"nonce": 1}
+        assert registry.decode(instruction(stake_data()), ADDRESSES).name == "stake"
+
+    @pytest.mark.parametrize("arg_type, message", [
+        ("u256", "unsupported type"),
+        ({"defined": {"name": "Missing"}}, "not defined"),
+        ({"defined": {"name": "Wrapper", "generics": [{"kind": "type", "type": "u8"}]}}, "generic"),
+    ])
+    def test_unsupported_layouts_fail_at_load(self, arg_type, message):
+        idl = {"address": PROGRAM, "instructions": [{"name": "bad", "args": [{"name": "value", "type": arg_type}]}]}
+        with pytest.raises(IdlError, match=message):
+            SolanaRegistry().load_idl(idl)
+
+    def test_b58encode_keeps_leading_zero_bytes(self):
+        assert b58encode(bytes(32)) == SYSTEM_PROGRAM
+        assert b58encode(b"\x00\x00\x01") == "112"
+
+
+def test_view_decodes_registered_instructions_once():
+    data = (
+        DEPOSIT_FOR_BURN_DISCRIMINATOR + bytes(8) + bytes(4) + bytes(12) + bytes.fromhex(VAULT[2:])
+        + bytes(32) + bytes(8) + bytes(4)
+    )
+    transaction = {
+        "type": "solana_transaction",
+        "accounts": [{"address": {"address": SYSTEM_PROGRAM}}],
+        "instructions": [
+            {"program": {"address": SYSTEM_PROGRAM}, "data": "", "account_indexes": [0]},
+            {"program": {"address": CCTP_V2_TOKEN_MESSENGER}, "data": base64.b64encode(data).decode(),
+             "account_indexes": [0]},
+        ],
+    }
+    view = TransactionView(transaction, VAULT)
+    (decoded,) = view.decoded_instructions
+    assert view.decoded_instructions is view.decoded_instructions
+    assert (decoded.index, decoded.name) == (1, "deposit_for_burn")
+    assert decoded.args["params"]["mint_recipient"][12:] == bytes.fromhex(VAULT[2:])
+    assert decoded.accounts == {"owner": SYSTEM_PROGRAM}
+    assert SOLANA_REGISTRY.get(CCTP_V2_TOKEN_MESSENGER, "deposit_for_burn").accounts[10] == "burn_token_mint"
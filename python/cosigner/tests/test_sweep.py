@@ -0,0 +1,84 @@
+import asyncio
+
+import httpx
+
+from fordefi import AsyncFordefiAPI, RetryPolicy
+from loadtest.mock_api import API_PREFIX, MockFordefiAPI, create_app
+from service import TransactionSweeper
+
+TEMPLATE = {"id": "template", "type": "evm_transaction", "state": "completed", "hex_data": "0x"}
+
+
+def make_api(mock: MockFordefiAPI) -> AsyncFordefiAPI:
+    transport = httpx.ASGITransport(app=create_app(mock))
+    retry = RetryPolicy(max_attempts=1, base_delay=0, max_delay=0)
+    return AsyncFordefiAPI(f"http://mock{API_PREFIX}", "test", transport=transport, retry=retry)
+
+
+class TestTransactionSweeper:
+    def test_lists_every_page_before_deciding(self):
+        mock = MockFordefiAPI([TEMPLATE])
+        mock.seed(25)
+        mock.decide("pending-3", "aborted")  # not pending, must not be listed
+
+        async def scenario():
+            api = make_api(mock)
+            try:
+                return await TransactionSweeper(api, None, page_size=10).list_pending()
+            finally:
+                await api.aclose()
+
+        transactions = asyncio.run(scenario())
+        assert len(transactions) == 24
+        assert mock.stats()["requests"]["list_transactions"] == 3
+        assert all(transaction["state"] == "waiting_for_approval" for transaction in transactions)
+
+    def test_decides_the_backlog_with_bounded_concurrency(self):
+        mock = MockFordefiAPI([TEMPLATE])
+        mock.seed(40)
+        in_flight = 0
+        peak = 0
+
+        async def scenario():
+            api = make_api(mock)
+
+            async def decide(transaction):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.001)
+                in_flight -= 1
+                if transaction["id"] == "pending-7":
+                    raise RuntimeError("rules blew up")
+                await api.approve_transaction(transaction["id"])
+                return {"decision": "approved"}
+
+            try:
+                return await TransactionSweeper(api, decide, concurrency=4, page_size=15).sweep()
+            finally:
+                await api.aclose()
+
+        result = asyncio.run(scenario())
+        assert result.pending == 40
+        assert result.outcomes == {"approved": 39, "failed": 1}
+        assert peak == 4
+        assert mock.stats()["states"] == {"approved": 39, "waiting_for_approval": 1}
+
+    def test_periodic_sweep_survives_failures_and_stops(self):
+        calls = []
+
+        class FlakyLister:
+            async def list_transactions(self, states=(), page=1, size=100):
+                calls.append(page)
+                if len(calls) == 1:
+                    raise RuntimeError("API down")
+                return {"total": 0, "transactions": []}
+
+        async def scenario():
+            sweeper = TransactionSweeper(FlakyLister(), None)
+            sweeper.start(interval=0.01)
+            await asyncio.sleep(0.05)
+            await sweeper.stop()
+
+        asyncio.run(scenario())
+        assert len(calls) >= 2
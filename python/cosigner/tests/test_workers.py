@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from service import DecisionWorkerPool, QueueFullError
+
+
+class TestDecisionWorkerPool:
+    def test_full_queue_rejects_submissions(self):
+        async def scenario():
+            release = asyncio.Event()
+
+            async def handler(transaction_id):
+                await release.wait()
+
+            pool = DecisionWorkerPool(handler, workers=1, max_queue_depth=1)
+            pool.start()
+            pool.submit("tx_1")
+            await asyncio.sleep(0)  # the worker picks up tx_1
+            pool.submit("tx_2")     # fills the queue
+            with pytest.raises(QueueFullError):
+                pool.submit("tx_3")
+            release.set()
+            await pool.drain(timeout=1)
+
+        asyncio.run(scenario())
+
+    def test_duplicate_pending_transaction_is_not_enqueued_twice(self):
+        async def scenario():
+            pool = DecisionWorkerPool(lambda transaction_id: asyncio.sleep(0), workers=1)
+            pool.start()
+            assert pool.submit("tx_1") is True
+            assert pool.submit("tx_1") is False
+            assert pool.depth == 1
+            await pool.drain(timeout=1)
+
+        asyncio.run(scenario())
+
+    def test_drain_finishes_queued_work_and_stops_accepting(self):
+        handled = []
+
+        async def handler(transaction_id):
+            await asyncio.sleep(0.01)
+            handled.append(transaction_id)
+
+        async def scenario():
+            pool = DecisionWorkerPool(handler, workers=2)
+            pool.start()
+            for index in range(5):
+                pool.submit(f"tx_{index}")
+            await pool.drain(timeout=1)
+            with pytest.raises(QueueFullError):
+                pool.submit("tx_late")
+
+        asyncio.run(scenario())
+        assert sorted(handled) == [f"tx_{index}" for index in range(5)]
+
+    def test_failing_handler_does_not_kill_worker(self):
+        handled = []
+
+        async def handler(transaction_id):
+            if transaction_id == "tx_bad":
+                raise RuntimeError("boom")
+            handled.append(transaction_id)
+
+        async def scenario():
+            pool = DecisionWorkerPool(handler, workers=1)
+            pool.start()
+            pool.submit("tx_bad")
+            pool.submit("tx_good")
+            await pool.drain(timeout=1)
+
+        asyncio.run(scenario())
+        assert handled == ["tx_good"]
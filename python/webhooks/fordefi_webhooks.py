@@ -20,6 +20,17 @@ with open(public_key_path, "r") as f:
     FORDEFI_PUBLIC_KEY = f.read()
 signature_pub_key = ecdsa.VerifyingKey.from_pem(FORDEFI_PUBLIC_KEY)
 
+# Verify with OpenSSL through `cryptography` when it's installed (~20x faster than
+# the pure-Python ecdsa package); fall back to ecdsa otherwise.
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.serialization import load_pem_public_key
+    native_pub_key = load_pem_public_key(FORDEFI_PUBLIC_KEY.encode())
+except ImportError:
+    native_pub_key = None
+
 app = FastAPI()
 
 events_file_lock = Lock()
@@ -42,6 +53,15 @@ def log_fordefi_event_to_file(event_data: dict):
             json.dump(events, f, indent=2)
 
 def verify_signature(signature: str, body: bytes) -> bool:
+    if native_pub_key is not None:
+        try:
+            native_pub_key.verify(base64.b64decode(signature), body, ec.ECDSA(hashes.SHA256()))
+            return True
+        except InvalidSignature:
+            return False
+        except Exception as e:
+            print(f"Signature verification error: {e}")
+            return False
     try:
         return signature_pub_key.verify(
             signature=base64.b64decode(signature),